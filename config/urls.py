@@ -18,9 +18,14 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 
-from core.views import health_check
+from core.views import export, health_check, latest_lab_results, liveness, metrics
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", health_check, name="health_check"),
+    path("health/live", liveness, name="liveness"),
+    path("health/ready", health_check, name="readiness"),
+    path("metrics", metrics, name="metrics"),
+    path("export/<str:content_type>", export, name="export"),
+    path("patients/<str:patient_id>/latest-lab-results", latest_lab_results, name="latest_lab_results"),
 ]
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from core.models import Artifact, AuditRecord, LabResult, PharmacyClaim, RawData
+from core.models import Artifact, AuditRecord, ExportWatermark, LabResult, LatestLabResult, PharmacyClaim, RawData
 
 
 @admin.register(AuditRecord)
@@ -28,3 +28,13 @@ class ArtifactAdmin(admin.ModelAdmin):
 class RawDataAdmin(admin.ModelAdmin):
     list_display = ("artifact", "row_index", "status")
     list_filter = ("status", "artifact")
+
+
+@admin.register(ExportWatermark)
+class ExportWatermarkAdmin(admin.ModelAdmin):
+    list_display = ("content_type", "destination", "high_water_mark", "exported_at")
+
+
+@admin.register(LatestLabResult)
+class LatestLabResultAdmin(admin.ModelAdmin):
+    list_display = ("patient_id", "test_code", "result_value", "result_unit", "performed_at")
@@ -0,0 +1,3 @@
+from .clients import get_client, reset_clients
+
+__all__ = ["get_client", "reset_clients"]
@@ -0,0 +1,61 @@
+import os
+import threading
+from typing import Any
+
+import boto3
+from botocore.config import Config
+from django.conf import settings
+
+from .memory import MEMORY_CLIENTS
+
+_clients: dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def get_client(service_name: str) -> Any:
+    """
+    Returns the process-wide boto3 client for a service, creating it on first use.
+
+    Clients are thread-safe and hold a urllib3 connection pool, so sharing one per service
+    avoids paying for client construction, endpoint resolution and a fresh TLS handshake on
+    every task. Pool size, retries and TCP keep-alive come from the AWS_* settings.
+    """
+    client = _clients.get(service_name)
+    if client is None:
+        with _lock:
+            client = _clients.get(service_name)
+            if client is None:
+                client = _create_client(service_name)
+                _clients[service_name] = client
+    return client
+
+
+def reset_clients():
+    """
+    Drops all cached clients. Runs automatically in forked children (e.g. Celery prefork
+    pool processes), which must not share the parent's sockets.
+    """
+    _clients.clear()
+
+
+def _create_client(service_name: str) -> Any:
+    if settings.AWS_CLIENT_BACKEND == "memory":
+        # Cached like a boto3 client, so every caller in the process shares one in-memory store
+        return MEMORY_CLIENTS[service_name]()
+
+    config = Config(
+        max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS,
+        retries={"max_attempts": settings.AWS_MAX_RETRIES, "mode": "standard"},
+        tcp_keepalive=settings.AWS_TCP_KEEPALIVE,
+    )
+    return boto3.client(
+        service_name,
+        endpoint_url=settings.AWS_ENDPOINT_URL,
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_DEFAULT_REGION,
+        config=config,
+    )
+
+
+os.register_at_fork(after_in_child=reset_clients)
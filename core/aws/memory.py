@@ -0,0 +1,204 @@
+import hashlib
+import io
+import threading
+import time
+import uuid
+from typing import Any
+
+from botocore.exceptions import ClientError
+
+# SQS default for queues created without a VisibilityTimeout attribute
+DEFAULT_VISIBILITY_TIMEOUT = 30
+
+
+def _client_error(code: str, message: str, operation: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": message}}, operation)
+
+
+class MemoryS3:
+    """
+    In-process stand-in for the S3 client calls the pipeline makes (put_object, get_object with Range).
+    Buckets are created implicitly. Errors are raised as botocore ClientErrors, like the real client.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._objects: dict[tuple[str, str], tuple[bytes, str]] = {}
+
+    def put_object(self, Bucket: str, Key: str, Body: Any = b"", **kwargs) -> dict[str, Any]:
+        data = Body.read() if hasattr(Body, "read") else Body
+        data = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+        etag = f'"{hashlib.md5(data, usedforsecurity=False).hexdigest()}"'
+
+        with self._lock:
+            self._objects[(Bucket, Key)] = (data, etag)
+        return {"ETag": etag}
+
+    def get_object(self, Bucket: str, Key: str, Range: str | None = None, **kwargs) -> dict[str, Any]:
+        with self._lock:
+            stored = self._objects.get((Bucket, Key))
+        if stored is None:
+            raise _client_error("NoSuchKey", "The specified key does not exist.", "GetObject")
+
+        data, etag = stored
+        response = {"ETag": etag, "ContentLength": len(data)}
+        if Range:
+            start, end = _parse_range(Range, len(data))
+            response.update(ContentLength=end - start + 1, ContentRange=f"bytes {start}-{end}/{len(data)}")
+            data = data[start : end + 1]
+
+        response["Body"] = io.BytesIO(data)
+        return response
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int]:
+    """
+    Resolves a single "bytes=start-end", "bytes=start-" or "bytes=-suffix" range to inclusive offsets.
+    """
+    unit, _, spec = header.partition("=")
+    first, _, last = spec.partition("-")
+    if unit != "bytes" or "," in spec or not (first or last):
+        raise _client_error("InvalidRange", f"Unsupported range: {header}", "GetObject")
+
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+
+    if start >= size or start > end:
+        raise _client_error("InvalidRange", "The requested range is not satisfiable", "GetObject")
+    return start, end
+
+
+class _Queue:
+    def __init__(self):
+        self.messages: dict[str, dict[str, Any]] = {}
+        self.available = threading.Condition()
+
+
+class MemorySQS:
+    """
+    In-process stand-in for the SQS client calls the pipeline makes. Queues are keyed by URL and
+    created implicitly. Received messages stay invisible for their visibility timeout and are
+    redelivered with a new receipt handle unless deleted with the latest one; long polling
+    blocks for up to WaitTimeSeconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queues: dict[str, _Queue] = {}
+
+    def send_message(self, QueueUrl: str, MessageBody: str, **kwargs) -> dict[str, Any]:
+        queue = self._queue(QueueUrl)
+        message_id = str(uuid.uuid4())
+
+        with queue.available:
+            queue.messages[message_id] = {
+                "MessageId": message_id,
+                "Body": MessageBody,
+                "SentTimestamp": str(int(time.time() * 1000)),
+                "ReceiptHandle": None,
+                "visible_at": 0.0,
+            }
+            queue.available.notify()
+        return {"MessageId": message_id}
+
+    def receive_message(  # noqa: PLR0913
+        self,
+        QueueUrl: str,
+        MaxNumberOfMessages: int = 1,
+        WaitTimeSeconds: int = 0,
+        VisibilityTimeout: int = DEFAULT_VISIBILITY_TIMEOUT,
+        AttributeNames: list[str] | None = None,
+        **kwargs,
+    ) -> dict[str, Any]:
+        queue = self._queue(QueueUrl)
+        deadline = time.monotonic() + WaitTimeSeconds
+
+        with queue.available:
+            while True:
+                now = time.monotonic()
+                visible = [message for message in queue.messages.values() if message["visible_at"] <= now]
+                if visible or now >= deadline:
+                    break
+                # Also wake up when an invisible message's timeout lapses
+                queue.available.wait(timeout=min(deadline - now, 0.1))
+
+            received = []
+            for message in visible[:MaxNumberOfMessages]:
+                message["ReceiptHandle"] = str(uuid.uuid4())
+                message["visible_at"] = now + VisibilityTimeout
+                received.append(
+                    {
+                        "MessageId": message["MessageId"],
+                        "ReceiptHandle": message["ReceiptHandle"],
+                        "Body": message["Body"],
+                        "Attributes": {"SentTimestamp": message["SentTimestamp"]},
+                    }
+                )
+
+        return {"Messages": received} if received else {}
+
+    def delete_message(self, QueueUrl: str, ReceiptHandle: str, **kwargs) -> dict[str, Any]:
+        queue = self._queue(QueueUrl)
+        with queue.available:
+            self._delete(queue, ReceiptHandle)
+        return {}
+
+    def delete_message_batch(self, QueueUrl: str, Entries: list[dict[str, Any]], **kwargs) -> dict[str, Any]:
+        queue = self._queue(QueueUrl)
+        with queue.available:
+            for entry in Entries:
+                self._delete(queue, entry["ReceiptHandle"])
+        return {"Successful": [{"Id": entry["Id"]} for entry in Entries], "Failed": []}
+
+    def change_message_visibility_batch(
+        self,
+        QueueUrl: str,
+        Entries: list[dict[str, Any]],
+        **kwargs,
+    ) -> dict[str, Any]:
+        queue = self._queue(QueueUrl)
+        successful, failed = [], []
+
+        with queue.available:
+            by_handle = {message["ReceiptHandle"]: message for message in queue.messages.values()}
+            for entry in Entries:
+                message = by_handle.get(entry["ReceiptHandle"])
+                if message is None:
+                    failed.append({"Id": entry["Id"], "Code": "ReceiptHandleIsInvalid", "SenderFault": True})
+                    continue
+                message["visible_at"] = time.monotonic() + entry["VisibilityTimeout"]
+                successful.append({"Id": entry["Id"]})
+            queue.available.notify_all()
+
+        return {"Successful": successful, "Failed": failed}
+
+    def get_queue_attributes(self, QueueUrl: str, AttributeNames: list[str], **kwargs) -> dict[str, Any]:
+        queue = self._queue(QueueUrl)
+        with queue.available:
+            now = time.monotonic()
+            visible = sum(1 for message in queue.messages.values() if message["visible_at"] <= now)
+            in_flight = len(queue.messages) - visible
+
+        return {
+            "Attributes": {
+                "ApproximateNumberOfMessages": str(visible),
+                "ApproximateNumberOfMessagesNotVisible": str(in_flight),
+            }
+        }
+
+    def _queue(self, queue_url: str) -> _Queue:
+        with self._lock:
+            return self._queues.setdefault(queue_url, _Queue())
+
+    @staticmethod
+    def _delete(queue: _Queue, receipt_handle: str):
+        # Like SQS, a stale receipt handle "succeeds" without deleting the redelivered message
+        for message_id, message in queue.messages.items():
+            if message["ReceiptHandle"] == receipt_handle:
+                del queue.messages[message_id]
+                return
+
+
+MEMORY_CLIENTS = {"s3": MemoryS3, "sqs": MemorySQS}
@@ -0,0 +1,17 @@
+from .generators import GENERATORS, generate_csv, generate_rows
+from .load import InlineS3EventConsumer, drain_events, publish_events
+from .runner import compare_to_baseline, load_baseline, run_benchmark, run_benchmarks, save_baseline
+
+__all__ = [
+    "GENERATORS",
+    "generate_csv",
+    "generate_rows",
+    "InlineS3EventConsumer",
+    "drain_events",
+    "publish_events",
+    "run_benchmark",
+    "run_benchmarks",
+    "compare_to_baseline",
+    "load_baseline",
+    "save_baseline",
+]
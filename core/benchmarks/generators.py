@@ -0,0 +1,95 @@
+import csv
+import io
+import random
+from collections.abc import Callable, Iterator
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+
+BASE_DATE = date(2024, 1, 1)
+BASE_TIMESTAMP = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+def _pharmacy_row(rng: random.Random, i: int) -> dict[str, str]:
+    return {
+        "claim_id": f"BENCH-{i:09d}",
+        "ncpdp_id": f"NCP{rng.randrange(500):04d}",
+        "bin_number": f"BIN{rng.randrange(50):03d}",
+        "service_date": (BASE_DATE + timedelta(days=rng.randrange(365))).isoformat(),
+        "total_amount_paid": f"{rng.uniform(1, 500):.2f}",
+        "transaction_code": rng.choice(["B1", "B2", "B3"]),
+    }
+
+
+def _audit_row(rng: random.Random, i: int) -> dict[str, str]:
+    return {
+        # Unique NPI per row keeps (provider_npi, service_date, billing_amount) unique within a file
+        "provider_npi": f"{1_000_000_000 + i}",
+        "billing_amount": f"{rng.uniform(10, 5000):.2f}",
+        "service_date": (BASE_DATE + timedelta(days=rng.randrange(365))).isoformat(),
+        "status": rng.choice(["submitted", "approved", "denied"]),
+    }
+
+
+def _lab_result_row(rng: random.Random, i: int) -> dict[str, str]:
+    test_code, test_name, unit, reference_range, low, high = rng.choice(
+        [
+            ("L001", "Glucose", "mg/dL", "70-100", 50, 200),
+            ("L001", "Glucose", "mmol/L", "3.9-5.6", 2, 12),
+            ("L002", "Potassium", "mmol/L", "3.5-5.1", 2, 7),
+            ("L003", "Hemoglobin", "g/dL", "12-17.5", 8, 20),
+        ]
+    )
+    return {
+        "patient_id": f"P{rng.randrange(100_000):06d}",
+        "test_code": test_code,
+        "test_name": test_name,
+        "result_value": f"{rng.uniform(low, high):.2f}",
+        "result_unit": unit,
+        "reference_range": reference_range,
+        # One minute apart keeps (patient_id, test_code, performed_at) unique within a file
+        "performed_at": (BASE_TIMESTAMP + timedelta(minutes=i)).isoformat(),
+    }
+
+
+# content_type -> (valid row factory, (field, invalid value) corruptions picked for error rows)
+GENERATORS: dict[str, tuple[Callable[[random.Random, int], dict[str, str]], list[tuple[str, str]]]] = {
+    "pharmacy": (_pharmacy_row, [("service_date", "not-a-date"), ("total_amount_paid", "-1.00")]),
+    "audit": (_audit_row, [("provider_npi", "12AB"), ("billing_amount", "0")]),
+    "lab_result": (_lab_result_row, [("result_value", "-5000"), ("performed_at", "yesterday")]),
+}
+
+
+def generate_rows(
+    content_type: str, rows: int, error_rate: float = 0.0, seed: int = 0, start: int = 0
+) -> Iterator[dict[str, Any]]:
+    """
+    Yields rows of synthetic data for a strategy. The same seed always yields the same rows;
+    roughly error_rate of them carry one invalid field. Row numbers begin at start, so files
+    generated with disjoint ranges do not share unique keys.
+    """
+    try:
+        row_factory, corruptions = GENERATORS[content_type]
+    except KeyError:
+        raise ValueError(f"No generator for content_type: {content_type}") from None
+
+    rng = random.Random(seed)
+    for i in range(start, start + rows):
+        row = row_factory(rng, i)
+        if rng.random() < error_rate:
+            field, invalid_value = rng.choice(corruptions)
+            row[field] = invalid_value
+        yield row
+
+
+def generate_csv(content_type: str, rows: int, error_rate: float = 0.0, seed: int = 0, start: int = 0) -> bytes:
+    """
+    Renders generate_rows as CSV bytes, as they would arrive from S3.
+    """
+    buffer = io.StringIO()
+    writer = None
+    for row in generate_rows(content_type, rows, error_rate, seed, start):
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(row))
+            writer.writeheader()
+        writer.writerow(row)
+    return buffer.getvalue().encode("utf-8")
@@ -0,0 +1,154 @@
+import json
+import threading
+import time
+from contextlib import nullcontext
+from queue import Queue
+from typing import Any
+
+from celery import current_app
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from core.aws import get_client
+from core.benchmarks.generators import generate_csv
+from core.tasks.consumers import S3EventConsumer
+
+BUCKET = "healthcare-ingestion-drop-zone"
+KEY_PREFIXES = {"pharmacy": "pharmacy/", "audit": "audit/", "lab_result": "labs/"}
+
+
+def event_queue_url() -> str:
+    return f"{settings.AWS_ENDPOINT_URL}/000000000000/s3-event-queue"
+
+
+class InlineS3EventConsumer(S3EventConsumer):
+    """
+    S3EventConsumer whose dispatched tasks run on local worker threads instead of being published,
+    so the whole event flow (poll, de-duplicate, route, download, ingest, process, acknowledge)
+    runs in one process against the in-memory S3/SQS backends.
+    """
+
+    def __init__(self):
+        super().__init__(worker=None)
+        self.jobs: Queue = Queue()
+        self.completed: list[tuple[int, dict[str, Any] | None]] = []
+        self._completed_lock = threading.Lock()
+
+    def objects_done(self) -> int:
+        with self._completed_lock:
+            return sum(objects for objects, _ in self.completed)
+
+    def work(self):
+        """
+        Runs queued tasks until it receives None. Keeps its DB connection between tasks, like a worker.
+        """
+        try:
+            while (job := self.jobs.get()) is not None:
+                objects, task_name, kwargs = job
+                result = _run_task(task_name, kwargs)
+                with self._completed_lock:
+                    self.completed.append((objects, result))
+        finally:
+            connections.close_all()
+
+    def _producer(self) -> Any:
+        return nullcontext()
+
+    def _send_task(self, task_name: str, kwargs: dict[str, Any], queue: str, producer: Any):
+        objects = len(kwargs["objects"]) if "objects" in kwargs else 1
+        self.jobs.put((objects, task_name, kwargs))
+
+    def _receive_messages(self, wait_seconds: int) -> list[dict[str, Any]]:
+        # Short polls, so pollers notice the end of the run promptly
+        return super()._receive_messages(wait_seconds=min(wait_seconds, 1))
+
+
+def _run_task(task_name: str, kwargs: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    Runs a task eagerly, as a worker would, and returns its result (None if it failed).
+    """
+    try:
+        result = current_app.tasks[task_name].apply(kwargs=kwargs)
+        return None if result.failed() else result.result
+    finally:
+        close_old_connections()
+
+
+def publish_events(content_type: str, events: int, rows_per_file: int, error_rate: float = 0.0, seed: int = 0) -> int:
+    """
+    Uploads events synthetic CSV files to the in-memory S3 bucket and sends one S3 notification
+    per file to the event queue. Files cover disjoint row ranges, so their unique keys never collide.
+    Returns the number of rows published.
+    """
+    s3, sqs = get_client("s3"), get_client("sqs")
+    prefix = KEY_PREFIXES[content_type]
+
+    for i in range(events):
+        key = f"{prefix}load-{i:06d}.csv"
+        body = generate_csv(content_type, rows_per_file, error_rate, seed + i, start=i * rows_per_file)
+        etag = s3.put_object(Bucket=BUCKET, Key=key, Body=body)["ETag"]
+        record = {
+            "s3": {
+                "bucket": {"name": BUCKET},
+                "object": {"key": key, "size": len(body), "eTag": etag.strip('"'), "sequencer": f"{i + 1:016X}"},
+            }
+        }
+        sqs.send_message(QueueUrl=event_queue_url(), MessageBody=json.dumps({"Records": [record]}))
+
+    return events * rows_per_file
+
+
+def drain_events(expected_objects: int, pollers: int = 4, workers: int = 4, timeout: float = 300) -> dict[str, Any]:
+    """
+    Runs the S3 event consumer with inline task execution until expected_objects were ingested
+    and processed, or timeout seconds passed. Returns timings, file outcomes and consumer metrics.
+    """
+    app_conf = current_app.conf
+    was_eager = app_conf.task_always_eager
+    # Tasks chained with apply_async (e.g. process_artifact_task) then run inline in the same worker thread
+    app_conf.task_always_eager = True
+
+    consumer = InlineS3EventConsumer()
+    consumer.sqs = get_client("sqs")
+    consumer.queue_url = event_queue_url()
+    poller_threads = [threading.Thread(target=consumer.run, name=f"LoadTestPoller-{i}") for i in range(pollers)]
+    worker_threads = [threading.Thread(target=consumer.work, name=f"LoadTestWorker-{i}") for i in range(workers)]
+
+    started_at = time.perf_counter()
+    for thread in poller_threads + worker_threads:
+        thread.start()
+
+    try:
+        deadline = time.monotonic() + timeout
+        while consumer.objects_done() < expected_objects and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        consumer.enabled = False
+        for thread in poller_threads:
+            thread.join()
+        # On timeout, drop tasks that have not started yet
+        with consumer.jobs.mutex:
+            consumer.jobs.queue.clear()
+        for _ in worker_threads:
+            consumer.jobs.put(None)
+        for thread in worker_threads:
+            thread.join()
+        app_conf.task_always_eager = was_eager
+
+    seconds = time.perf_counter() - started_at
+    results = consumer.completed
+    objects_done = sum(objects for objects, _ in results)
+    failed_tasks = sum(objects for objects, result in results if result is None)
+    attributes = consumer.sqs.get_queue_attributes(
+        QueueUrl=consumer.queue_url, AttributeNames=["ApproximateNumberOfMessages"]
+    )["Attributes"]
+
+    return {
+        "seconds": seconds,
+        "objects": objects_done,
+        "files_ok": sum(result.get("success", 0) for _, result in results if result),
+        "files_failed": failed_tasks + sum(result.get("failed", 0) for _, result in results if result),
+        "timed_out": objects_done < expected_objects,
+        "events_left": int(attributes["ApproximateNumberOfMessages"]),
+        "consumer": consumer.metrics(),
+    }
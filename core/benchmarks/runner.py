@@ -0,0 +1,141 @@
+import json
+import platform
+import resource
+import time
+from contextlib import contextmanager
+from itertools import batched
+from pathlib import Path
+from typing import Any
+
+import django
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.benchmarks.generators import generate_csv
+from core.models import RawData
+from core.services.processing_service import (
+    BATCH_SIZE,
+    _flush_batch,
+    _prepare_batch,
+    get_update_fields,
+    process_artifact,
+)
+from core.services.raw_ingestion_service import ingest_file_to_raw
+from core.strategies import get_strategy
+
+STAGES = ("ingest_file_to_raw", "prepare_batch", "flush_batch", "process_artifact")
+
+
+class StageMeter:
+    """
+    Accumulates wall time and DB round-trips over one or more measured blocks of a stage.
+    """
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.queries = 0
+
+    @contextmanager
+    def measure(self):
+        with CaptureQueriesContext(connection) as captured:
+            started_at = time.perf_counter()
+            yield
+            self.seconds += time.perf_counter() - started_at
+        self.queries += len(captured.captured_queries)
+
+    def result(self, rows: int) -> dict[str, Any]:
+        return {
+            "seconds": round(self.seconds, 4),
+            "rows_per_second": round(rows / self.seconds) if self.seconds > 0 else rows,
+            "queries": self.queries,
+            # Process high-water mark after the stage (ru_maxrss is in kilobytes on Linux)
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        }
+
+
+def run_benchmark(content_type: str, rows: int, error_rate: float = 0.0, seed: int = 0) -> dict[str, Any]:
+    """
+    Runs one strategy's pipeline on a synthetic file and measures every stage separately.
+    Everything runs inside a transaction that is rolled back, so the database is left untouched;
+    the staged prepare/flush pass is itself rolled back before the full process_artifact pass.
+    """
+    strategy = get_strategy(content_type)
+    content = generate_csv(content_type, rows, error_rate, seed)
+    meters = {stage: StageMeter() for stage in STAGES}
+
+    with transaction.atomic():
+        with meters["ingest_file_to_raw"].measure():
+            artifact = ingest_file_to_raw(ContentFile(content, name="bench.csv"), "bench.csv", content_type)
+
+        savepoint = transaction.savepoint()
+        update_fields = get_update_fields(strategy)
+        pending_rows = RawData.objects.filter(artifact=artifact, status=RawData.PENDING)
+        for batch in batched(pending_rows.iterator(), BATCH_SIZE):
+            with meters["prepare_batch"].measure():
+                instances, success_rows, failed_rows = _prepare_batch(strategy, batch)
+            with meters["flush_batch"].measure():
+                _flush_batch(strategy, instances, success_rows, failed_rows, update_fields)
+        transaction.savepoint_rollback(savepoint)
+
+        with meters["process_artifact"].measure():
+            process_artifact(artifact.id)
+
+        transaction.set_rollback(True)
+
+    return {stage: meter.result(rows) for stage, meter in meters.items()}
+
+
+def run_benchmarks(content_types: list[str], rows: int, error_rate: float = 0.0, seed: int = 0) -> dict[str, Any]:
+    """
+    Benchmarks several strategies and wraps the results with the parameters and environment.
+    """
+    return {
+        "meta": {
+            "rows": rows,
+            "error_rate": error_rate,
+            "seed": seed,
+            "batch_size": BATCH_SIZE,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "created_at": timezone.now().isoformat(),
+        },
+        "results": {
+            content_type: run_benchmark(content_type, rows, error_rate, seed) for content_type in content_types
+        },
+    }
+
+
+def save_baseline(report: dict[str, Any], path: str):
+    Path(path).write_text(json.dumps(report, indent=2) + "\n")
+
+
+def load_baseline(path: str) -> dict[str, Any]:
+    return json.loads(Path(path).read_text())
+
+
+def compare_to_baseline(report: dict[str, Any], baseline: dict[str, Any], tolerance: float = 0.2) -> list[str]:
+    """
+    Returns the regressions of report against baseline: throughput more than tolerance below
+    the baseline, or any extra DB round-trip (query counts are deterministic for a given seed).
+    Strategies or stages missing from the baseline are skipped.
+    """
+    regressions = []
+    for content_type, stages in report["results"].items():
+        for stage, current in stages.items():
+            previous = baseline.get("results", {}).get(content_type, {}).get(stage)
+            if not previous:
+                continue
+
+            floor = previous["rows_per_second"] * (1 - tolerance)
+            if current["rows_per_second"] < floor:
+                regressions.append(
+                    f"{content_type}.{stage}: {current['rows_per_second']} rows/s "
+                    f"(baseline {previous['rows_per_second']}, -{tolerance:.0%} allowed)"
+                )
+            if current["queries"] > previous["queries"]:
+                regressions.append(
+                    f"{content_type}.{stage}: {current['queries']} queries (baseline {previous['queries']})"
+                )
+    return regressions
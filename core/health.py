@@ -0,0 +1,99 @@
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from celery import current_app
+from django.conf import settings
+from django.db import connection, connections
+
+logger = logging.getLogger(__name__)
+
+
+def check_database():
+    connection.ensure_connection()
+
+
+def check_broker():
+    # Check connection to the broker (SQS)
+    with current_app.connection_or_acquire() as conn:
+        conn.ensure_connection(max_retries=1)
+
+
+class ReadinessProbe:
+    """
+    Caches the outcome of the dependency checks so probes don't open a DB and broker connection
+    on every hit. The first call checks synchronously; afterwards a result older than
+    HEALTH_CHECK_TTL is served as-is while one background thread refreshes it. A result older than
+    HEALTH_CHECK_MAX_AGE (e.g. because the refresh hangs) is reported as unhealthy.
+    """
+
+    def __init__(self, checks: dict[str, Callable[[], None]]):
+        self.checks = checks
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()
+        self._result: dict[str, Any] | None = None
+        self._refreshing = False
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            result = self._result
+            expired = result is not None and time.monotonic() - result["checked_at"] >= settings.HEALTH_CHECK_TTL
+            refresh = expired and not self._refreshing
+            if refresh:
+                self._refreshing = True
+
+        if refresh:
+            threading.Thread(target=self._refresh_in_background, name="ReadinessProbe", daemon=True).start()
+
+        if result is None:
+            # Concurrent first probes wait for one check instead of each running their own
+            with self._check_lock:
+                result = self._result or self._run_checks()
+                with self._lock:
+                    self._result = result
+
+        return self._report(result)
+
+    def reset(self):
+        with self._lock:
+            self._result = None
+
+    def _refresh_in_background(self):
+        try:
+            with self._check_lock:
+                result = self._run_checks()
+            with self._lock:
+                self._result = result
+        finally:
+            with self._lock:
+                self._refreshing = False
+            # This thread's DB connection would otherwise stay open until the thread is collected
+            connections.close_all()
+
+    def _run_checks(self) -> dict[str, Any]:
+        components = {}
+        for name, check in self.checks.items():
+            started_at = time.perf_counter()
+            try:
+                check()
+                status = "ok"
+            except Exception as e:
+                status = f"error: {str(e)}"
+                logger.warning(f"Readiness check {name} failed: {e}")
+            latency_ms = round((time.perf_counter() - started_at) * 1000, 2)
+            components[name] = {"status": status, "latency_ms": latency_ms}
+
+        return {"components": components, "checked_at": time.monotonic()}
+
+    @staticmethod
+    def _report(result: dict[str, Any]) -> dict[str, Any]:
+        age = time.monotonic() - result["checked_at"]
+        healthy = age < settings.HEALTH_CHECK_MAX_AGE and all(
+            component["status"] == "ok" for component in result["components"].values()
+        )
+        return {"healthy": healthy, "components": result["components"], "age_seconds": round(age, 3)}
+
+
+readiness = ReadinessProbe({"database": check_database, "celery": check_broker})
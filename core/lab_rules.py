@@ -0,0 +1,99 @@
+import re
+from dataclasses import dataclass
+from decimal import Decimal
+from functools import lru_cache
+
+from core.models.lab_result import LabResult
+
+# Distinct reference range strings kept parsed; real feeds use a few hundred at most
+RANGE_CACHE_SIZE = 4096
+
+_NUMBER = r"[-+]?(?:\d+(?:\.\d*)?|\.\d+)"
+_BETWEEN = re.compile(rf"({_NUMBER})\s*-\s*({_NUMBER})")
+_BOUND = re.compile(rf"(<=|>=|≤|≥|<|>)\s*({_NUMBER})")
+
+
+@dataclass(frozen=True)
+class Conversion:
+    """
+    Converts a result reported in one unit to the unit stored for its test: value * factor.
+    """
+
+    to_unit: str
+    factor: Decimal
+
+
+# test_code -> reported unit (lower case) -> conversion, so a row needs two dict lookups
+UNIT_CONVERSIONS: dict[str, dict[str, Conversion]] = {}
+
+
+def register_conversion(test_code: str, from_unit: str, to_unit: str, factor: Decimal | str):
+    """
+    Registers the conversion of test_code results reported in from_unit (case-insensitive).
+    """
+    UNIT_CONVERSIONS.setdefault(test_code, {})[from_unit.lower()] = Conversion(to_unit, Decimal(factor))
+
+
+def convert(test_code: str, value: Decimal, unit: str) -> tuple[Decimal, str]:
+    """
+    Returns the (value, unit) stored for a result, converted if a conversion is registered.
+    """
+    plan = UNIT_CONVERSIONS.get(test_code)
+    if plan:
+        conversion = plan.get(unit.lower())
+        if conversion:
+            return value * conversion.factor, conversion.to_unit
+    return value, unit
+
+
+@dataclass(frozen=True)
+class ReferenceRange:
+    """
+    Normal interval of a result. Either bound may be open (None) or exclusive.
+    """
+
+    low: Decimal | None = None
+    high: Decimal | None = None
+    low_inclusive: bool = True
+    high_inclusive: bool = True
+
+    def flag(self, value: Decimal) -> str | None:
+        """
+        LabResult.LOW or LabResult.HIGH for a value outside the range, None inside it.
+        """
+        if self.low is not None and (value < self.low or (value == self.low and not self.low_inclusive)):
+            return LabResult.LOW
+        if self.high is not None and (value > self.high or (value == self.high and not self.high_inclusive)):
+            return LabResult.HIGH
+        return None
+
+
+@lru_cache(maxsize=RANGE_CACHE_SIZE)
+def parse_reference_range(text: str | None) -> ReferenceRange | None:
+    """
+    Parses "a-b", "<x", ">x", "<=x"/"≤x" and ">=x"/"≥x". Returns None for empty or unrecognized
+    ranges (including "a-b" with a > b), which are not flagged. Cached, since the same few range
+    strings repeat across every file.
+    """
+    text = (text or "").strip()
+
+    if match := _BETWEEN.fullmatch(text):
+        low, high = Decimal(match[1]), Decimal(match[2])
+        return ReferenceRange(low=low, high=high) if low <= high else None
+
+    if match := _BOUND.fullmatch(text):
+        operator, bound = match[1], Decimal(match[2])
+        return {
+            "<": ReferenceRange(high=bound, high_inclusive=False),
+            "<=": ReferenceRange(high=bound),
+            "≤": ReferenceRange(high=bound),
+            ">": ReferenceRange(low=bound, low_inclusive=False),
+            ">=": ReferenceRange(low=bound),
+            "≥": ReferenceRange(low=bound),
+        }[operator]
+
+    return None
+
+
+# Glucose: 1 mmol/L = 18.0182 mg/dL
+register_conversion("L001", "mmol/L", "mg/dL", "18.0182")
@@ -0,0 +1,69 @@
+import logging
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import GENERATORS, compare_to_baseline, load_baseline, run_benchmarks, save_baseline
+
+
+class Command(BaseCommand):
+    help = "Benchmarks each pipeline stage on seeded synthetic data inside a rolled-back transaction"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--types",
+            nargs="+",
+            default=list(GENERATORS),
+            choices=list(GENERATORS),
+            help="Strategies to benchmark. Defaults to all of them.",
+        )
+        parser.add_argument("--rows", type=int, default=10_000, help="Rows per synthetic file.")
+        parser.add_argument("--error-rate", type=float, default=0.05, help="Fraction of rows with an invalid field.")
+        parser.add_argument("--seed", type=int, default=42, help="Seed of the synthetic data generators.")
+        parser.add_argument("--output", type=str, default=None, help="Write the results as a JSON baseline here.")
+        parser.add_argument("--baseline", type=str, default=None, help="JSON baseline to compare the results against.")
+        parser.add_argument(
+            "--tolerance", type=float, default=0.2, help="Allowed throughput drop against the baseline (0.2 = 20%%)."
+        )
+        parser.add_argument(
+            "--fail-on-regression", action="store_true", help="Exit with an error if any regression is found."
+        )
+        parser.add_argument(
+            "--with-logs",
+            action="store_true",
+            help="Keep application logging (e.g. per-row failures) enabled and inside the measurements.",
+        )
+
+    def handle(self, *args: "Any", **options: "Any"):
+        if not options["with_logs"]:
+            logging.disable(logging.CRITICAL)
+
+        try:
+            report = run_benchmarks(options["types"], options["rows"], options["error_rate"], options["seed"])
+        finally:
+            logging.disable(logging.NOTSET)
+
+        for content_type, stages in report["results"].items():
+            self.stdout.write(f"{content_type} ({options['rows']} rows)")
+            for stage, result in stages.items():
+                self.stdout.write(
+                    f"  {stage:<20} {result['rows_per_second']:>10} rows/s {result['queries']:>6} queries "
+                    f"{result['peak_rss_mb']:>8} MB peak RSS"
+                )
+
+        if options["output"]:
+            save_baseline(report, options["output"])
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if not options["baseline"]:
+            return
+
+        regressions = compare_to_baseline(report, load_baseline(options["baseline"]), options["tolerance"])
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
+            return
+
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(f"Regression: {regression}"))
+        if options["fail_on_regression"]:
+            raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}")
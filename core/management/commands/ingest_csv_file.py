@@ -1,29 +1,51 @@
+import glob
+import multiprocessing
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import Any
 
+import django
 from django.core.files.base import ContentFile
 from django.core.management.base import BaseCommand
 
 from core.models import Artifact
 from core.services.processing_service import process_artifact
 from core.services.raw_ingestion_service import ingest_file_to_raw
+from core.services.validation_service import validate_csv_file
 from core.strategies import get_strategy
 
 
 class Command(BaseCommand):
-    help = "Ingests a CSV file into the database using a specified strategy (audit, pharmacy, etc.)"
+    help = "Ingests CSV files into the database using a specified strategy (audit, pharmacy, etc.)"
 
     def add_arguments(self, parser):
-        parser.add_argument("csv_file", type=str, help="Path to the CSV file to ingest")
+        parser.add_argument(
+            "csv_files",
+            nargs="+",
+            type=str,
+            metavar="csv_file",
+            help="CSV files, directories (all *.csv below them) or glob patterns to ingest",
+        )
         parser.add_argument(
             "--type",
             type=str,
             default="audit",
             help='Type of data to ingest (e.g., audit, pharmacy). Defaults to "audit".',
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of worker processes ingesting files in parallel. Defaults to 1 (in-process).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only validate and transform rows, without touching the database, and report throughput.",
+        )
 
     def handle(self, *args: "Any", **options: "Any"):
-        csv_file_path = options["csv_file"]
         data_type = options["type"]
 
         strategy = get_strategy(data_type)
@@ -31,35 +53,149 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f"Unknown data type: {data_type}"))
             return
 
-        self.stdout.write(f"Starting ingestion of {data_type} from {csv_file_path}...")
-
-        try:
-            # Check file exists first
-            if not os.path.exists(csv_file_path):
-                self.stdout.write(self.style.ERROR(f"File not found: {csv_file_path}"))
-                return
-
-            with open(csv_file_path, "rb") as f:
-                content = f.read()
-
-            filename = os.path.basename(csv_file_path)
-            file_obj = ContentFile(content, name=filename)
-
-            # 1. Ingest to Raw
-            artifact = ingest_file_to_raw(file_obj, filename, data_type)
-
-            if artifact.status == Artifact.FAILED:
-                self.stdout.write(self.style.ERROR("Raw ingestion failed. Check logs."))
-                return
-
-            # 2. Process Artifact/Raw rows
-            success_count, failure_count = process_artifact(artifact.id)
-
-        except OSError as os_err:
-            self.stdout.write(self.style.ERROR(f"Error opening/reading file: {str(os_err)}"))
-            return
-        except Exception as unexpected_error:
-            self.stdout.write(self.style.ERROR(f"Fatal error: {str(unexpected_error)}"))
+        paths = expand_paths(options["csv_files"])
+        if not paths:
+            self.stdout.write(self.style.ERROR(f"No CSV files matched: {' '.join(options['csv_files'])}"))
             return
 
-        self.stdout.write(self.style.SUCCESS(f"Ingestion complete. Success: {success_count}, Failed: {failure_count}"))
+        workers = min(options["workers"], len(paths))
+        run_path = dry_run_path if options["dry_run"] else ingest_path
+        mode = "dry run" if options["dry_run"] else "ingestion"
+        self.stdout.write(f"Starting {mode} of {data_type} from {len(paths)} file(s) with {workers} worker(s)...")
+
+        started_at = time.perf_counter()
+        if workers <= 1:
+            results = [self.report(run_path(path, data_type)) for path in paths]
+        else:
+            # Spawned workers each set up Django, so each gets its own DB connection and strategy instances
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=django.setup
+            ) as executor:
+                futures = [executor.submit(run_path, path, data_type) for path in paths]
+                results = [self.report(future.result()) for future in as_completed(futures)]
+
+        if len(paths) > 1:
+            elapsed = time.perf_counter() - started_at
+            success = sum(result["success"] for result in results)
+            failed = sum(result["failed"] for result in results)
+            errors = sum(1 for result in results if result["error"])
+            ok_label, failed_label = ("Valid", "Invalid") if options["dry_run"] else ("Success", "Failed")
+            self.stdout.write(
+                f"Total: {len(paths)} files ({errors} with errors). {ok_label}: {success}, {failed_label}: {failed}, "
+                f"{_rate(success + failed, elapsed)} rows/s over {elapsed:.1f}s"
+            )
+
+    def report(self, result: dict[str, Any]) -> dict[str, Any]:
+        """
+        Writes the outcome of one file and passes the result through.
+        """
+        prefix = f"{result['path']}: "
+        rows = result["success"] + result["failed"]
+        if result["error"]:
+            self.stdout.write(self.style.ERROR(f"{prefix}{result['error']}"))
+        elif "failures" in result:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{prefix}Dry run complete. Valid: {result['success']}, Invalid: {result['failed']} "
+                    f"({_rate(rows, result['seconds'])} rows/s, peak memory {result['peak_memory_mb']} MB)"
+                )
+            )
+            for failure in result["failures"]:
+                self.stdout.write(f"    {failure['field']}: {failure['error_type']} x{failure['count']}")
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{prefix}Ingestion complete. Success: {result['success']}, Failed: {result['failed']} "
+                    f"({_rate(rows, result['seconds'])} rows/s)"
+                )
+            )
+        return result
+
+
+def expand_paths(patterns: list[str]) -> list[str]:
+    """
+    Resolves directories to the *.csv files below them and glob patterns to their matches.
+    Plain paths are kept as-is, so missing files are reported rather than dropped.
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(sorted(glob.glob(os.path.join(pattern, "**", "*.csv"), recursive=True)))
+        elif glob.has_magic(pattern):
+            paths.extend(sorted(glob.glob(pattern, recursive=True)))
+        else:
+            paths.append(pattern)
+    return list(dict.fromkeys(paths))
+
+
+def ingest_path(csv_file_path: str, data_type: str) -> dict[str, Any]:
+    """
+    Ingests and processes one CSV file. Runs in-process or in a worker process, so it returns
+    a picklable result instead of raising.
+    """
+    result = {"path": csv_file_path, "success": 0, "failed": 0, "seconds": 0.0, "error": None}
+    started_at = time.perf_counter()
+
+    try:
+        # Check file exists first
+        if not os.path.exists(csv_file_path):
+            result["error"] = f"File not found: {csv_file_path}"
+            return result
+
+        with open(csv_file_path, "rb") as f:
+            content = f.read()
+
+        filename = os.path.basename(csv_file_path)
+        file_obj = ContentFile(content, name=filename)
+
+        # 1. Ingest to Raw
+        artifact = ingest_file_to_raw(file_obj, filename, data_type)
+
+        if artifact.status == Artifact.FAILED:
+            result["error"] = "Raw ingestion failed. Check logs."
+            return result
+
+        # 2. Process Artifact/Raw rows
+        result["success"], result["failed"] = process_artifact(artifact.id)
+
+    except OSError as os_err:
+        result["error"] = f"Error opening/reading file: {str(os_err)}"
+    except Exception as unexpected_error:
+        result["error"] = f"Fatal error: {str(unexpected_error)}"
+
+    result["seconds"] = time.perf_counter() - started_at
+    return result
+
+
+def dry_run_path(csv_file_path: str, data_type: str) -> dict[str, Any]:
+    """
+    Validates one CSV file without touching the database; same result shape as ingest_path,
+    plus the failure histogram and peak memory.
+    """
+    result = {"path": csv_file_path, "success": 0, "failed": 0, "seconds": 0.0, "error": None}
+
+    if not os.path.exists(csv_file_path):
+        result["error"] = f"File not found: {csv_file_path}"
+        return result
+
+    try:
+        report = validate_csv_file(csv_file_path, data_type)
+    except OSError as os_err:
+        result["error"] = f"Error opening/reading file: {str(os_err)}"
+        return result
+    except Exception as unexpected_error:
+        result["error"] = f"Fatal error: {str(unexpected_error)}"
+        return result
+
+    result.update(
+        success=report["valid"],
+        failed=report["invalid"],
+        seconds=report["seconds"],
+        failures=report["failures"],
+        peak_memory_mb=report["peak_memory_mb"],
+    )
+    return result
+
+
+def _rate(rows: int, seconds: float) -> int:
+    return round(rows / seconds) if seconds > 0 else rows
@@ -0,0 +1,62 @@
+import logging
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import drain_events, publish_events
+from core.benchmarks.load import KEY_PREFIXES
+
+
+class Command(BaseCommand):
+    help = "Floods the in-memory S3 event queue with synthetic files and drains it through the event consumer"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=1000, help="Number of S3 objects (and events) to publish.")
+        parser.add_argument("--type", type=str, default="pharmacy", choices=list(KEY_PREFIXES), help="Data type.")
+        parser.add_argument("--rows-per-file", type=int, default=100, help="Rows per synthetic file.")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of rows with an invalid field.")
+        parser.add_argument("--seed", type=int, default=42, help="Seed of the synthetic data generators.")
+        parser.add_argument("--pollers", type=int, default=4, help="Consumer poller threads.")
+        parser.add_argument("--workers", type=int, default=4, help="Threads running the dispatched tasks.")
+        parser.add_argument("--timeout", type=float, default=300, help="Give up after this many seconds.")
+        parser.add_argument(
+            "--with-logs",
+            action="store_true",
+            help="Keep application logging (per-event and per-row messages) enabled during the run.",
+        )
+
+    def handle(self, *args: "Any", **options: "Any"):
+        if settings.AWS_CLIENT_BACKEND != "memory":
+            raise CommandError("Load tests only run against the in-memory backends. Set AWS_CLIENT_BACKEND=memory.")
+
+        events, rows_per_file = options["events"], options["rows_per_file"]
+        self.stdout.write(f"Publishing {events} {options['type']} events of {rows_per_file} rows...")
+        rows = publish_events(options["type"], events, rows_per_file, options["error_rate"], options["seed"])
+
+        if not options["with_logs"]:
+            logging.disable(logging.CRITICAL)
+
+        try:
+            result = drain_events(events, options["pollers"], options["workers"], options["timeout"])
+        finally:
+            logging.disable(logging.NOTSET)
+
+        seconds = result["seconds"]
+        style = self.style.ERROR if result["timed_out"] else self.style.SUCCESS
+        self.stdout.write(
+            style(
+                f"{'Timed out' if result['timed_out'] else 'Drained'} after {seconds:.1f}s. "
+                f"Objects: {result['objects']}/{events}, Files ok: {result['files_ok']}, "
+                f"Files failed: {result['files_failed']}, Events left: {result['events_left']}"
+            )
+        )
+        self.stdout.write(
+            f"Throughput: {_rate(result['objects'], seconds)} events/s, "
+            f"{_rate(result['objects'] * rows // max(events, 1), seconds)} rows/s"
+        )
+        self.stdout.write(f"Consumer metrics: {result['consumer']}")
+
+
+def _rate(count: int, seconds: float) -> int:
+    return round(count / seconds) if seconds > 0 else count
@@ -0,0 +1,47 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from core.services.purge_service import CHUNK_SIZE, purge_processed_raw_data
+
+
+class Command(BaseCommand):
+    help = "Deletes (and optionally archives) PROCESSED RawData rows of fully processed artifacts in bounded chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--archive-to",
+            type=str,
+            default=None,
+            help="Local directory or s3://bucket/prefix receiving gzipped NDJSON archives of purged rows.",
+        )
+        parser.add_argument(
+            "--no-archive",
+            action="store_true",
+            help="Delete rows without archiving them. Required when --archive-to is not given.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows deleted per statement.")
+        parser.add_argument("--sleep", type=float, default=0.0, help="Seconds to pause between chunks (throttling).")
+        parser.add_argument("--max-chunks", type=int, default=None, help="Stop after this many chunks.")
+
+    def handle(self, *args: "Any", **options: "Any"):
+        archive_to = options["archive_to"]
+
+        if not archive_to and not options["no_archive"]:
+            self.stdout.write(
+                self.style.ERROR("Refusing to delete without an archive. Pass --archive-to or --no-archive.")
+            )
+            return
+
+        stats = purge_processed_raw_data(
+            chunk_size=options["chunk_size"],
+            archive_to=archive_to,
+            sleep_seconds=options["sleep"],
+            max_chunks=options["max_chunks"],
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Purge complete. Rows: {stats['rows']}, Chunks: {stats['chunks']}, Artifacts: {stats['artifacts']}"
+            )
+        )
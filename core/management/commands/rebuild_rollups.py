@@ -0,0 +1,34 @@
+from datetime import date
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from core.strategies import STRATEGY_REGISTRY
+
+
+class Command(BaseCommand):
+    help = "Recomputes the daily rollup tables from their source tables (backfills and repairs)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--type",
+            type=str,
+            default=None,
+            help="Only rebuild the rollup of this data type (e.g., audit, pharmacy). Defaults to all.",
+        )
+        parser.add_argument("--start", type=date.fromisoformat, default=None, help="First date (inclusive).")
+        parser.add_argument("--end", type=date.fromisoformat, default=None, help="Last date (inclusive).")
+
+    def handle(self, *args: "Any", **options: "Any"):
+        data_type = options["type"]
+        rollups = {name: strategy.rollup for name, strategy in STRATEGY_REGISTRY.items() if strategy.rollup}
+
+        if data_type:
+            if data_type not in rollups:
+                self.stdout.write(self.style.ERROR(f"No rollup for data type: {data_type}"))
+                return
+            rollups = {data_type: rollups[data_type]}
+
+        for name, rollup in rollups.items():
+            rows = rollup.rebuild(start=options["start"], end=options["end"])
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {rollup.model.__name__} from {name}: {rows} rollup rows"))
@@ -0,0 +1,47 @@
+import os
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram, multiprocess
+
+# In multiprocess mode (web server workers, Celery prefork children) every process writes its samples
+# to files in PROMETHEUS_MULTIPROC_DIR and collection aggregates them. The directory must be empty
+# when the server or worker starts and must not be shared between hosts or containers.
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+if MULTIPROC_DIR:
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+
+# Hot loops update these once per batch, never per row.
+ROWS_INGESTED = Counter("etl_rows_ingested_total", "Raw rows staged by ingest_file_to_raw", ["content_type"])
+ROWS_PROCESSED = Counter("etl_rows_processed_total", "Raw rows turned into domain records", ["content_type"])
+ROWS_FAILED = Counter("etl_rows_failed_total", "Raw rows that failed validation or transform", ["content_type"])
+FLUSH_SECONDS = Histogram("etl_batch_flush_seconds", "Duration of one processing batch flush", ["content_type"])
+
+S3_DOWNLOAD_BYTES = Counter("etl_s3_download_bytes_total", "Bytes downloaded from S3 by ingestion tasks")
+S3_DOWNLOAD_SECONDS = Histogram(
+    "etl_s3_download_seconds",
+    "Duration of one S3 object download",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+
+CONSUMER_POLLS = Counter("etl_consumer_polls_total", "ReceiveMessage calls made by the S3 event consumer")
+CONSUMER_MESSAGES = Counter("etl_consumer_messages_received_total", "S3 event messages received by the consumer")
+CONSUMER_DISPATCHES = Counter("etl_consumer_dispatches_total", "Tasks dispatched by the S3 event consumer", ["task"])
+
+TASK_QUEUE_WAIT_SECONDS = Histogram(
+    "etl_task_queue_wait_seconds",
+    "Time between publishing a task and a worker starting it (tasks without ETA/countdown)",
+    ["task"],
+    buckets=(0.1, 0.5, 1, 5, 15, 30, 60, 300, 900, 3600),
+)
+
+
+def get_registry() -> CollectorRegistry:
+    """
+    Returns the registry to expose: an aggregate over all processes in multiprocess mode,
+    otherwise this process's default registry.
+    """
+    if not MULTIPROC_DIR:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=MULTIPROC_DIR)
+    return registry
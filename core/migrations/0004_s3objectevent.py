@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_labresult'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='S3ObjectEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.CharField(max_length=255)),
+                ('object_key', models.CharField(max_length=1024)),
+                ('sequencer', models.CharField(blank=True, help_text='Zero-padded S3 event sequencer', max_length=64)),
+                ('etag', models.CharField(blank=True, max_length=255)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('bucket', 'object_key'), name='unique_s3_object_event')],
+            },
+        ),
+    ]
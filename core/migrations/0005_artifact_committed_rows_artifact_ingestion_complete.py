@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_s3objectevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artifact',
+            name='committed_rows',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='artifact',
+            name='ingestion_complete',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_artifact_committed_rows_artifact_ingestion_complete'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditrecord',
+            name='artifact',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.artifact'),
+        ),
+        migrations.AddField(
+            model_name='labresult',
+            name='artifact',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.artifact'),
+        ),
+        migrations.AddField(
+            model_name='pharmacyclaim',
+            name='artifact',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.artifact'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_auditrecord_artifact_labresult_artifact_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='auditrecord',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='labresult',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='pharmacyclaim',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name='ExportWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_type', models.CharField(max_length=50)),
+                ('destination', models.CharField(help_text='Local directory or s3://bucket/prefix', max_length=1024)),
+                ('high_water_mark', models.DateTimeField(blank=True, null=True)),
+                ('exported_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('content_type', 'destination'), name='unique_export_watermark')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_alter_auditrecord_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PharmacyDailyTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('service_date', models.DateField()),
+                ('ncpdp_id', models.CharField(max_length=20)),
+                ('record_count', models.IntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ncpdp_id', 'service_date'], name='pharmacy_total_by_pharmacy')],
+                'constraints': [models.UniqueConstraint(fields=('service_date', 'ncpdp_id'), name='unique_pharmacy_daily_total')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProviderDailyTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('service_date', models.DateField()),
+                ('provider_npi', models.CharField(max_length=15)),
+                ('record_count', models.IntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['provider_npi', 'service_date'], name='provider_total_by_provider')],
+                'constraints': [models.UniqueConstraint(fields=('service_date', 'provider_npi'), name='unique_provider_daily_total')],
+            },
+        ),
+    ]
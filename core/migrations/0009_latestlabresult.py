@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:33
+
+from django.db import migrations, models
+
+
+# Seed the table from the existing history: the newest row per (patient, test)
+BACKFILL_LATEST_LAB_RESULTS = '''
+INSERT INTO core_latestlabresult
+    (patient_id, test_code, test_name, result_value, result_unit, reference_range, performed_at, updated_at)
+SELECT DISTINCT ON (patient_id, test_code)
+    patient_id, test_code, test_name, result_value, result_unit, reference_range, performed_at, NOW()
+FROM core_labresult
+ORDER BY patient_id, test_code, performed_at DESC
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_pharmacydailytotal_providerdailytotal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatestLabResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('patient_id', models.CharField(max_length=50)),
+                ('test_code', models.CharField(max_length=50)),
+                ('test_name', models.CharField(max_length=255)),
+                ('result_value', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('result_unit', models.CharField(max_length=20)),
+                ('reference_range', models.CharField(blank=True, max_length=50, null=True)),
+                ('performed_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('patient_id', 'test_code'), name='unique_latest_lab_result')],
+            },
+        ),
+        migrations.RunSQL(BACKFILL_LATEST_LAB_RESULTS, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:35
+
+from django.db import migrations, models
+
+
+# Move the legacy " [HIGH]"/" [LOW]" test_name suffixes into abnormal_flag, in one pass per table
+SUFFIX_PATTERN = r" \[(HIGH|LOW)\]$"
+BACKFILL_ABNORMAL_FLAG = [
+    f"""
+    UPDATE {table}
+    SET abnormal_flag = substring(test_name FROM '{SUFFIX_PATTERN}'),
+        test_name = regexp_replace(test_name, '{SUFFIX_PATTERN}', '')
+    WHERE test_name ~ '{SUFFIX_PATTERN}'
+    """
+    for table in ("core_labresult", "core_latestlabresult")
+]
+
+RESTORE_TEST_NAME_SUFFIX = [
+    f"UPDATE {table} SET test_name = test_name || ' [' || abnormal_flag || ']' WHERE abnormal_flag IS NOT NULL"
+    for table in ("core_labresult", "core_latestlabresult")
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_latestlabresult'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='labresult',
+            name='abnormal_flag',
+            field=models.CharField(blank=True, choices=[('HIGH', 'High'), ('LOW', 'Low')], help_text='Set when the result lies outside its reference range', max_length=4, null=True),
+        ),
+        migrations.AddField(
+            model_name='latestlabresult',
+            name='abnormal_flag',
+            field=models.CharField(blank=True, choices=[('HIGH', 'High'), ('LOW', 'Low')], max_length=4, null=True),
+        ),
+        migrations.RunSQL(BACKFILL_ABNORMAL_FLAG, reverse_sql=RESTORE_TEST_NAME_SUFFIX),
+    ]
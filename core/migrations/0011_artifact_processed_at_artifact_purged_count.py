@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:52
+
+from django.db import migrations, models
+
+# Artifacts ingested before processed_at existed: COMPLETED with no pending rows left means processed
+BACKFILL_PROCESSED_AT = """
+UPDATE core_artifact SET processed_at = created_at
+WHERE status = 'COMPLETED'
+  AND NOT EXISTS (SELECT 1 FROM core_rawdata WHERE artifact_id = core_artifact.id AND status = 'PENDING')
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_labresult_abnormal_flag_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artifact',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='artifact',
+            name='purged_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunSQL(BACKFILL_PROCESSED_AT, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:11
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction; it lets lab results keep flowing in meanwhile
+    atomic = False
+
+    dependencies = [
+        ('core', '0011_artifact_processed_at_artifact_purged_count'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='labresult',
+            index=models.Index(condition=models.Q(('abnormal_flag__isnull', False)), fields=['performed_at'], include=('patient_id', 'test_code', 'abnormal_flag'), name='labresult_abnormal_idx'),
+        ),
+    ]
@@ -1,13 +1,23 @@
 from .artifact import Artifact
 from .audit_record import AuditRecord
+from .export_watermark import ExportWatermark
 from .lab_result import LabResult
+from .latest_lab_result import LatestLabResult
 from .pharmacy_claim import PharmacyClaim
+from .pharmacy_daily_total import PharmacyDailyTotal
+from .provider_daily_total import ProviderDailyTotal
 from .raw_data import RawData
+from .s3_object_event import S3ObjectEvent
 
 __all__ = [
     "AuditRecord",
     "PharmacyClaim",
+    "PharmacyDailyTotal",
+    "ProviderDailyTotal",
     "Artifact",
+    "ExportWatermark",
     "LabResult",
+    "LatestLabResult",
     "RawData",
+    "S3ObjectEvent",
 ]
@@ -23,6 +23,13 @@ class Artifact(models.Model):
     file = models.CharField(max_length=1024, help_text="S3 URI or Key")
     content_type = models.CharField(max_length=50)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    # Streaming handoff: raw rows 1..committed_rows are committed, and whether ingestion has finished
+    committed_rows = models.PositiveIntegerField(default=0)
+    ingestion_complete = models.BooleanField(default=False)
+    # Set once processing has drained every raw row; only then may RawData be purged
+    processed_at = models.DateTimeField(null=True, blank=True)
+    # PROCESSED raw rows removed by the staging purge, still counted by success_count
+    purged_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -31,9 +38,9 @@ class Artifact(models.Model):
     @property
     def success_count(self) -> int:
         """
-        Returns the number of successfully processed raw rows.
+        Returns the number of successfully processed raw rows, including purged ones.
         """
-        return self.raw_rows.filter(status=RawData.PROCESSED).count()
+        return self.raw_rows.filter(status=RawData.PROCESSED).count() + self.purged_count
 
     @property
     def failure_count(self) -> int:
@@ -44,4 +51,3 @@ class Artifact(models.Model):
 
     def __str__(self):
         return f"{self.file} ({self.status})"
-
@@ -6,8 +6,11 @@ class AuditRecord(models.Model):
     billing_amount = models.DecimalField(max_digits=10, decimal_places=2)
     service_date = models.DateField()
     status = models.CharField(max_length=50)
+    # Artifact that last wrote this record, for lineage and exports
+    artifact = models.ForeignKey("core.Artifact", on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         constraints = [
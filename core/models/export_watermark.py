@@ -0,0 +1,20 @@
+from django.db import models
+
+
+class ExportWatermark(models.Model):
+    """
+    High-water mark of an incremental export: the greatest updated_at already exported
+    for one data type to one destination.
+    """
+
+    content_type = models.CharField(max_length=50)
+    destination = models.CharField(max_length=1024, help_text="Local directory or s3://bucket/prefix")
+    high_water_mark = models.DateTimeField(null=True, blank=True)
+    exported_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = "core"
+        constraints = [models.UniqueConstraint(fields=["content_type", "destination"], name="unique_export_watermark")]
+
+    def __str__(self):
+        return f"{self.content_type} -> {self.destination} ({self.high_water_mark})"
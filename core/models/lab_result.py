@@ -7,6 +7,14 @@ class LabResult(models.Model):
     Example of a 'transformative' data set that might require unit conversion or normalization.
     """
 
+    HIGH = "HIGH"
+    LOW = "LOW"
+
+    ABNORMAL_FLAG_CHOICES = [
+        (HIGH, "High"),
+        (LOW, "Low"),
+    ]
+
     patient_id = models.CharField(max_length=50, help_text="External patient identifier")
     test_code = models.CharField(max_length=50, help_text="LOINC or internal test code")
     test_name = models.CharField(max_length=255, help_text="Human-readable test name")
@@ -18,9 +26,19 @@ class LabResult(models.Model):
         max_length=50, blank=True, null=True, help_text="Reference range (e.g., '70-100')"
     )
     performed_at = models.DateTimeField(help_text="When the test was performed")
+    abnormal_flag = models.CharField(
+        max_length=4,
+        choices=ABNORMAL_FLAG_CHOICES,
+        blank=True,
+        null=True,
+        help_text="Set when the result lies outside its reference range",
+    )
+
+    # Artifact that last wrote this record, for lineage and exports
+    artifact = models.ForeignKey("core.Artifact", on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
 
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         constraints = [
@@ -28,6 +46,15 @@ class LabResult(models.Model):
                 fields=["patient_id", "test_code", "performed_at"], name="unique_lab_result"
             )
         ]
+        indexes = [
+            # Covers "abnormal results in a period" with an index-only scan over the (few) abnormal rows
+            models.Index(
+                fields=["performed_at"],
+                include=["patient_id", "test_code", "abnormal_flag"],
+                condition=models.Q(abnormal_flag__isnull=False),
+                name="labresult_abnormal_idx",
+            )
+        ]
         app_label = "core"
         ordering = ["-performed_at"]
 
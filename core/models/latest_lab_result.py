@@ -0,0 +1,28 @@
+from django.db import models
+
+from .lab_result import LabResult
+
+
+class LatestLabResult(models.Model):
+    """
+    Most recent LabResult per patient and test, maintained by every LabResult flush
+    (see core.services.latest_lab_result_service). Answers "latest value of each test for
+    a patient" with one index range read, however long the patient's history is.
+    """
+
+    patient_id = models.CharField(max_length=50)
+    test_code = models.CharField(max_length=50)
+    test_name = models.CharField(max_length=255)
+    result_value = models.DecimalField(max_digits=10, decimal_places=2)
+    result_unit = models.CharField(max_length=20)
+    reference_range = models.CharField(max_length=50, blank=True, null=True)
+    performed_at = models.DateTimeField()
+    abnormal_flag = models.CharField(max_length=4, choices=LabResult.ABNORMAL_FLAG_CHOICES, blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = "core"
+        constraints = [models.UniqueConstraint(fields=["patient_id", "test_code"], name="unique_latest_lab_result")]
+
+    def __str__(self):
+        return f"{self.patient_id} - {self.test_code}: {self.result_value} {self.result_unit} ({self.performed_at})"
@@ -9,8 +9,11 @@ class PharmacyClaim(models.Model):
     total_amount_paid = models.DecimalField(max_digits=10, decimal_places=2)
     transaction_code = models.CharField(max_length=10)
 
+    # Artifact that last wrote this record, for lineage and exports
+    artifact = models.ForeignKey("core.Artifact", on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         app_label = "core"
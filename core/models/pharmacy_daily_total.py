@@ -0,0 +1,21 @@
+from django.db import models
+
+
+class PharmacyDailyTotal(models.Model):
+    """
+    Rollup of PharmacyClaim per service day and pharmacy (NCPDP id), maintained incrementally
+    by every processing flush (see core.rollups).
+    """
+
+    service_date = models.DateField()
+    ncpdp_id = models.CharField(max_length=20)
+    record_count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        app_label = "core"
+        constraints = [models.UniqueConstraint(fields=["service_date", "ncpdp_id"], name="unique_pharmacy_daily_total")]
+        indexes = [models.Index(fields=["ncpdp_id", "service_date"], name="pharmacy_total_by_pharmacy")]
+
+    def __str__(self):
+        return f"{self.ncpdp_id} {self.service_date}: {self.total_amount} ({self.record_count} claims)"
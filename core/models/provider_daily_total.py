@@ -0,0 +1,23 @@
+from django.db import models
+
+
+class ProviderDailyTotal(models.Model):
+    """
+    Rollup of AuditRecord billing per service day and provider (NPI), maintained incrementally
+    by every processing flush (see core.rollups).
+    """
+
+    service_date = models.DateField()
+    provider_npi = models.CharField(max_length=15)
+    record_count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        app_label = "core"
+        constraints = [
+            models.UniqueConstraint(fields=["service_date", "provider_npi"], name="unique_provider_daily_total")
+        ]
+        indexes = [models.Index(fields=["provider_npi", "service_date"], name="provider_total_by_provider")]
+
+    def __str__(self):
+        return f"{self.provider_npi} {self.service_date}: {self.total_amount} ({self.record_count} records)"
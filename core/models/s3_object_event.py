@@ -0,0 +1,21 @@
+from django.db import models
+
+
+class S3ObjectEvent(models.Model):
+    """
+    Latest S3 notification dispatched per object key.
+    Shared de-duplication state for event consumers running on different workers.
+    """
+
+    bucket = models.CharField(max_length=255)
+    object_key = models.CharField(max_length=1024)
+    sequencer = models.CharField(max_length=64, blank=True, help_text="Zero-padded S3 event sequencer")
+    etag = models.CharField(max_length=255, blank=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        app_label = "core"
+        constraints = [models.UniqueConstraint(fields=["bucket", "object_key"], name="unique_s3_object_event")]
+
+    def __str__(self):
+        return f"s3://{self.bucket}/{self.object_key} ({self.sequencer})"
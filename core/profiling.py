@@ -0,0 +1,160 @@
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+_active: ContextVar["StageProfiler | None"] = ContextVar("active_profiler", default=None)
+
+
+class StageProfiler:
+    """
+    Accumulates wall time, CPU time and DB queries per pipeline stage, and keeps one record per
+    call of each stage (e.g. per batch). Stages may nest; a query counts towards every open stage.
+    """
+
+    def __init__(self, label: str):
+        self.label = label
+        self.stages: dict[str, dict[str, Any]] = {}
+        self.batches: list[dict[str, Any]] = []
+        self._open: list[dict[str, Any]] = []
+
+    @contextmanager
+    def stage(self, name: str, rows: int | None = None) -> Iterator[None]:
+        record = {"stage": name, "rows": rows, "queries": 0, "query_bytes": 0, "query_rows": 0}
+        self._open.append(record)
+        started_at, cpu_started_at = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            record["wall_seconds"] = round(time.perf_counter() - started_at, 6)
+            record["cpu_seconds"] = round(time.thread_time() - cpu_started_at, 6)
+            self._open.remove(record)
+            self.batches.append(record)
+            self._accumulate(record)
+
+    def record_query(self, execute, sql, params, many, context):
+        """
+        connection.execute_wrapper hook. Sizes are approximate: SQL text plus the repr of its parameters.
+        """
+        result = execute(sql, params, many, context)
+        size = len(sql) + (len(repr(params)) if params else 0)
+        rows = max(context["cursor"].rowcount, 0)
+        for record in self._open:
+            record["queries"] += 1
+            record["query_bytes"] += size
+            record["query_rows"] += rows
+        return result
+
+    def report(self) -> dict[str, Any]:
+        return {"label": self.label, "stages": self.stages, "batches": self.batches}
+
+    def _accumulate(self, record: dict[str, Any]):
+        stats = self.stages.setdefault(
+            record["stage"],
+            {
+                "calls": 0,
+                "rows": 0,
+                "wall_seconds": 0.0,
+                "cpu_seconds": 0.0,
+                "max_wall_seconds": 0.0,
+                "queries": 0,
+                "query_bytes": 0,
+                "query_rows": 0,
+            },
+        )
+        stats["calls"] += 1
+        stats["rows"] += record["rows"] or 0
+        stats["max_wall_seconds"] = max(stats["max_wall_seconds"], record["wall_seconds"])
+        for key in ("wall_seconds", "cpu_seconds"):
+            stats[key] = round(stats[key] + record[key], 6)
+        for key in ("queries", "query_bytes", "query_rows"):
+            stats[key] += record[key]
+
+
+@contextmanager
+def profile(label: str, enabled: bool | None = None) -> Iterator[StageProfiler | None]:
+    """
+    Profiles the stages run inside the block and logs one summary line per stage at the end.
+    enabled defaults to PIPELINE_PROFILING. Work nested in an already profiled block (e.g. an eager
+    task) reports into the outer profiler. With PIPELINE_PROFILING_DUMP_DIR set, a sample of
+    PIPELINE_PROFILING_DUMP_SAMPLE_RATE of the profiled blocks also dumps the full per-batch report
+    and the PIPELINE_PROFILING_DUMPS captures (cProfile stats, tracemalloc snapshot) there.
+    """
+    if enabled is None:
+        enabled = settings.PIPELINE_PROFILING
+
+    outer = _active.get()
+    if not enabled or outer is not None:
+        yield outer
+        return
+
+    profiler = StageProfiler(label)
+    dump_dir = settings.PIPELINE_PROFILING_DUMP_DIR
+    dumping = bool(dump_dir) and random.random() < settings.PIPELINE_PROFILING_DUMP_SAMPLE_RATE
+    captures = settings.PIPELINE_PROFILING_DUMPS if dumping else []
+
+    cprofile = cProfile.Profile() if "cprofile" in captures else None
+    started_tracing = "tracemalloc" in captures and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if cprofile:
+        cprofile.enable()
+
+    token = _active.set(profiler)
+    try:
+        with connection.execute_wrapper(profiler.record_query):
+            yield profiler
+    finally:
+        _active.reset(token)
+        if cprofile:
+            cprofile.disable()
+
+        for name, stats in profiler.stages.items():
+            logger.info(f"Profile {label} [{name}]: {json.dumps(stats)}")
+
+        if dumping:
+            _dump(profiler, dump_dir, cprofile, "tracemalloc" in captures)
+        if started_tracing:
+            tracemalloc.stop()
+
+
+@contextmanager
+def stage(name: str, rows: int | None = None) -> Iterator[None]:
+    """
+    Measures a stage for the active profiler; a no-op outside profile().
+    """
+    profiler = _active.get()
+    if profiler is None:
+        yield
+        return
+
+    with profiler.stage(name, rows):
+        yield
+
+
+def _dump(profiler: StageProfiler, dump_dir: str, cprofile: cProfile.Profile | None, snapshot: bool):
+    os.makedirs(dump_dir, exist_ok=True)
+    slug = re.sub(r"[^\w.-]+", "_", profiler.label).strip("_")
+    base = os.path.join(dump_dir, f"{slug}.{os.getpid()}.{time.time_ns()}")
+
+    with open(f"{base}.json", "w") as f:
+        json.dump(profiler.report(), f, indent=2)
+    if cprofile:
+        cprofile.dump_stats(f"{base}.prof")
+    if snapshot and tracemalloc.is_tracing():
+        tracemalloc.take_snapshot().dump(f"{base}.tracemalloc")
+
+    logger.info(f"Profile {profiler.label} dumped to {base}.*")
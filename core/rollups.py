@@ -0,0 +1,156 @@
+import hashlib
+import json
+import operator
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+from decimal import ROUND_HALF_UP, Decimal
+from functools import reduce
+
+from django.db import connection, models, transaction
+from django.db.models import Q
+
+# Old contribution of a record about to be upserted: (date, key, amount)
+Contribution = tuple[date, str, Decimal]
+
+
+@dataclass(frozen=True)
+class Rollup:
+    """
+    Daily count and sum of one amount column of a source model per (date, key), kept in a rollup
+    model with the same date and key column names plus record_count and total_amount.
+
+    Maintained incrementally: before a batch is upserted, capture() locks the batch's unique keys
+    and reads the current values of the records the batch will overwrite; after the upsert, apply() adds the difference
+    between the new and the old values with one INSERT ... ON CONFLICT DO UPDATE increment. Both
+    must run in the flush transaction.
+    """
+
+    model: type[models.Model]
+    source: type[models.Model]
+    date_field: str
+    key_field: str
+    amount_field: str
+
+    def capture(self, instances: list[models.Model], unique_fields: list[str]) -> list[Contribution]:
+        if not instances or not unique_fields:
+            return []
+
+        # Row locks only cover records that already exist: two flushes inserting the same new record
+        # would both read "no old value" and both add it in full. A transaction-scoped advisory lock
+        # per unique key makes the second flush wait, then read the first one's committed row.
+        self._lock_keys(instances, unique_fields)
+
+        if len(unique_fields) == 1:
+            field = unique_fields[0]
+            condition = Q(**{f"{field}__in": [getattr(instance, field) for instance in instances]})
+        else:
+            condition = reduce(
+                operator.or_,
+                (Q(**{field: getattr(instance, field) for field in unique_fields}) for instance in instances),
+            )
+
+        existing = self.source.objects.filter(condition).select_for_update().order_by("pk")
+        return list(existing.values_list(self.date_field, self.key_field, self.amount_field))
+
+    def _lock_keys(self, instances: list[models.Model], unique_fields: list[str]):
+        fields = [self.source._meta.get_field(field) for field in unique_fields]
+        keys = {self._lock_key(instance, fields) for instance in instances}
+
+        # Sorted, so concurrent flushes take the locks in the same order
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(key) FROM unnest(%s::bigint[]) AS key ORDER BY key", [sorted(keys)]
+            )
+
+    def _lock_key(self, instance: models.Model, fields: list[models.Field]) -> int:
+        """
+        Advisory lock key of the row instance upserts. Values are normalized as the database stores
+        them, so 100.5 and 100.50, or one instant in two time zones, lock the same row.
+        """
+        identity = [self.source._meta.db_table]
+        for field in fields:
+            value = field.get_db_prep_value(getattr(instance, field.attname), connection)
+            if isinstance(value, Decimal):
+                value = value.quantize(Decimal(1).scaleb(-field.decimal_places), rounding=ROUND_HALF_UP)
+            elif isinstance(value, datetime) and value.tzinfo:
+                value = value.astimezone(UTC)
+            identity.append(value.isoformat() if isinstance(value, date) else value)
+
+        # Stable across processes (unlike hash()); collisions only serialize unrelated flushes
+        digest = hashlib.blake2b(json.dumps(identity, default=str).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big", signed=True)
+
+    def apply(self, instances: list[models.Model], previous: list[Contribution]) -> int:
+        """
+        Applies the batch's deltas to the rollup. Returns the number of (date, key) rows touched.
+        """
+        # New amounts rounded like the database stores them, so deltas match what rebuild() computes
+        exponent = Decimal(1).scaleb(-self.source._meta.get_field(self.amount_field).decimal_places)
+
+        deltas = defaultdict(lambda: [0, Decimal(0)])
+        for day, key, amount in previous:
+            deltas[(day, key)][0] -= 1
+            deltas[(day, key)][1] -= amount
+        for instance in instances:
+            delta = deltas[(getattr(instance, self.date_field), getattr(instance, self.key_field))]
+            delta[0] += 1
+            delta[1] += Decimal(getattr(instance, self.amount_field)).quantize(exponent, rounding=ROUND_HALF_UP)
+
+        # Sorted, so concurrent flushes lock rollup rows in the same order
+        rows = [(day, key, count, total) for (day, key), (count, total) in sorted(deltas.items()) if count or total]
+        if not rows:
+            return 0
+
+        table, date_column, key_column = self._columns()
+        values = ", ".join(["(%s, %s, %s, %s)"] * len(rows))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({date_column}, {key_column}, record_count, total_amount) VALUES {values} "
+                f"ON CONFLICT ({date_column}, {key_column}) DO UPDATE SET "
+                f"record_count = {table}.record_count + EXCLUDED.record_count, "
+                f"total_amount = {table}.total_amount + EXCLUDED.total_amount",
+                [value for row in rows for value in row],
+            )
+        return len(rows)
+
+    def rebuild(self, start: date | None = None, end: date | None = None) -> int:
+        """
+        Recomputes the rollup (optionally only an inclusive date range) from the source table.
+        Returns the number of rollup rows written.
+
+        The rollup table is locked against concurrent flushes for the duration, so a flush either
+        committed before the rebuild read the source or applies its delta on top of the result.
+        """
+        table, date_column, key_column = self._columns()
+        source_table = connection.ops.quote_name(self.source._meta.db_table)
+        amount_column = connection.ops.quote_name(self.source._meta.get_field(self.amount_field).column)
+
+        conditions, params = [], []
+        if start:
+            conditions.append(f"{date_column} >= %s")
+            params.append(start)
+        if end:
+            conditions.append(f"{date_column} <= %s")
+            params.append(end)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {table} IN EXCLUSIVE MODE")
+            cursor.execute(f"DELETE FROM {table} {where}", params)
+            cursor.execute(
+                f"INSERT INTO {table} ({date_column}, {key_column}, record_count, total_amount) "
+                f"SELECT {date_column}, {key_column}, COUNT(*), SUM({amount_column}) FROM {source_table} {where} "
+                f"GROUP BY {date_column}, {key_column}",
+                params,
+            )
+            return cursor.rowcount
+
+    def _columns(self) -> tuple[str, str, str]:
+        quote = connection.ops.quote_name
+        opts = self.model._meta
+        return (
+            quote(opts.db_table),
+            quote(opts.get_field(self.date_field).column),
+            quote(opts.get_field(self.key_field).column),
+        )
@@ -1,9 +1,10 @@
 import re
-from datetime import date
 from decimal import Decimal
 
 from pydantic import BaseModel, field_validator
 
+from core.schemas.types import CachedDate, CachedDecimal
+
 
 class AuditRecordSchema(BaseModel):
     """
@@ -11,8 +12,8 @@ class AuditRecordSchema(BaseModel):
     """
 
     provider_npi: str
-    billing_amount: Decimal
-    service_date: date
+    billing_amount: CachedDecimal
+    service_date: CachedDate
     status: str
 
     @field_validator("billing_amount")
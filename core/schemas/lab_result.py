@@ -1,8 +1,9 @@
-from datetime import datetime
 from decimal import Decimal
 
 from pydantic import BaseModel, Field, field_validator
 
+from core.schemas.types import CachedDatetime
+
 
 class LabResultSchema(BaseModel):
     """
@@ -15,7 +16,7 @@ class LabResultSchema(BaseModel):
     result_value: Decimal = Field(..., description="Numeric result value")
     result_unit: str = Field(..., min_length=1, description="Unit of measurement")
     reference_range: str | None = Field(None, description="Reference range string")
-    performed_at: datetime = Field(..., description="Timestamp of the test")
+    performed_at: CachedDatetime = Field(..., description="Timestamp of the test")
 
     @field_validator("result_value")
     @classmethod
@@ -1,8 +1,9 @@
-from datetime import date
 from decimal import Decimal
 
 from pydantic import BaseModel, field_validator
 
+from core.schemas.types import CachedDate, CachedDecimal
+
 
 class PharmacyClaimSchema(BaseModel):
     """
@@ -12,8 +13,8 @@ class PharmacyClaimSchema(BaseModel):
     claim_id: str
     ncpdp_id: str
     bin_number: str
-    service_date: date
-    total_amount_paid: Decimal
+    service_date: CachedDate
+    total_amount_paid: CachedDecimal
     transaction_code: str
 
     @field_validator("total_amount_paid")
@@ -0,0 +1,71 @@
+import re
+from collections.abc import Callable
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Annotated, Any
+
+from pydantic import BeforeValidator, TypeAdapter, ValidationError
+from pydantic_core import TzInfo
+
+# Distinct strings kept parsed per type. Feeds repeat a few hundred dates and amounts per file
+PARSE_CACHE_SIZE = 8192
+
+# Strict ISO shapes parsed without Pydantic; anything else takes Pydantic's own (lax) parser
+ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+ISO_DATETIME = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d{1,6})?(Z|[+-]\d{2}:\d{2})?")
+PLAIN_DECIMAL = re.compile(r"-?\d+(\.\d+)?")
+
+
+def _from_iso_datetime(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        return parsed
+    # Same tzinfo class as Pydantic returns, so results are indistinguishable
+    return parsed.replace(tzinfo=TzInfo(int(parsed.utcoffset().total_seconds())))
+
+
+def _cached_parser(type_: type, pattern: re.Pattern, fast_parse: Callable[[str], Any]) -> Callable[[str], Any]:
+    """
+    LRU-cached string parser for type_. Strings of the strict shape take fast_parse; the rest, and
+    fast-path failures (e.g. 2024-02-30), take Pydantic's parser, which raises its usual errors.
+    """
+    adapter = TypeAdapter(type_)
+
+    @lru_cache(maxsize=PARSE_CACHE_SIZE)
+    def parse(value: str):
+        if pattern.fullmatch(value):
+            try:
+                return fast_parse(value)
+            except ValueError:
+                pass
+        return adapter.validate_python(value)
+
+    return parse
+
+
+parse_date = _cached_parser(date, ISO_DATE, date.fromisoformat)
+parse_datetime = _cached_parser(datetime, ISO_DATETIME, _from_iso_datetime)
+parse_decimal = _cached_parser(Decimal, PLAIN_DECIMAL, Decimal)
+
+
+def _through(parse: Callable[[str], Any]) -> BeforeValidator:
+    """
+    Before-validator parsing strings with parse. Non-strings, and strings that fail to parse, are
+    passed on untouched for Pydantic's own validator, so validation results and errors are unchanged.
+    """
+
+    def validate(value: Any) -> Any:
+        if type(value) is not str:
+            return value
+        try:
+            return parse(value)
+        except ValidationError:
+            return value
+
+    return BeforeValidator(validate)
+
+
+CachedDate = Annotated[date, _through(parse_date)]
+CachedDatetime = Annotated[datetime, _through(parse_datetime)]
+CachedDecimal = Annotated[Decimal, _through(parse_decimal)]
@@ -0,0 +1,122 @@
+import csv
+import io
+import json
+import zlib
+from collections.abc import Iterator
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+from core.models import AuditRecord, LabResult, PharmacyClaim
+from core.strategies import get_strategy
+
+# Export configuration
+PAGE_SIZE = 5000
+FORMATS = ("csv", "ndjson")
+
+# Column filtered by the start/end date range, per exportable model
+DATE_FIELDS = {PharmacyClaim: "service_date", AuditRecord: "service_date", LabResult: "performed_at"}
+
+
+def build_export_queryset(
+    content_type: str, start: date | None = None, end: date | None = None, artifact_id: int | None = None
+) -> models.QuerySet:
+    """
+    Selects the domain records of a strategy, optionally restricted to an inclusive date range
+    (on the model's business date) and to the artifact that last wrote them.
+    """
+    strategy = get_strategy(content_type)
+    if not strategy or strategy.model_class not in DATE_FIELDS:
+        raise ValueError(f"Unknown data type: {content_type}")
+
+    model = strategy.model_class
+    date_field = DATE_FIELDS[model]
+    queryset = model.objects.all()
+
+    if isinstance(model._meta.get_field(date_field), models.DateTimeField):
+        # Whole days in the current time zone, as range conditions that can use an index
+        if start:
+            queryset = queryset.filter(**{f"{date_field}__gte": timezone.make_aware(datetime.combine(start, time.min))})
+        if end:
+            end_of_day = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
+            queryset = queryset.filter(**{f"{date_field}__lt": end_of_day})
+    else:
+        if start:
+            queryset = queryset.filter(**{f"{date_field}__gte": start})
+        if end:
+            queryset = queryset.filter(**{f"{date_field}__lte": end})
+
+    if artifact_id is not None:
+        queryset = queryset.filter(artifact_id=artifact_id)
+    return queryset
+
+
+def stream_export(
+    queryset: models.QuerySet, fmt: str = "csv", compress: bool = False, page_size: int = PAGE_SIZE
+) -> Iterator[bytes]:
+    """
+    Renders every record of the queryset as CSV or NDJSON chunks, optionally gzip-compressed.
+
+    Records are read in keyset-paginated pages (WHERE pk > last ORDER BY pk LIMIT page_size), so
+    memory stays bounded by one page and no long-lived cursor or transaction is held, however
+    large the result set is.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    fields = [field.attname for field in queryset.model._meta.concrete_fields]
+    pages = keyset_pages(queryset, fields, page_size)
+    chunks = _render_csv(fields, pages) if fmt == "csv" else _render_ndjson(fields, pages)
+    return _gzip(chunks) if compress else chunks
+
+
+def keyset_pages(queryset: models.QuerySet, fields: list[str], page_size: int) -> Iterator[list[tuple]]:
+    pk_index = fields.index(queryset.model._meta.pk.attname)
+    rows = queryset.order_by("pk").values_list(*fields)
+    last_pk = None
+
+    while True:
+        page = list((rows if last_pk is None else rows.filter(pk__gt=last_pk))[:page_size])
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        last_pk = page[-1][pk_index]
+
+
+def _render_csv(fields: list[str], pages: Iterator[list[tuple]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+
+    for page in pages:
+        writer.writerows([_csv_value(value) for value in row] for row in page)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+    # Header-only export when nothing matched
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _csv_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def _render_ndjson(fields: list[str], pages: Iterator[list[tuple]]) -> Iterator[bytes]:
+    for page in pages:
+        lines = [json.dumps(dict(zip(fields, row, strict=True)), cls=DjangoJSONEncoder) for row in page]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
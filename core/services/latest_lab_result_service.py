@@ -0,0 +1,67 @@
+from collections.abc import Iterable
+from datetime import datetime
+
+from django.db import connection, models
+from django.utils import timezone
+
+from core.models import LabResult, LatestLabResult
+
+# Columns copied from LabResult besides the (patient_id, test_code) key
+LATEST_FIELDS = ("test_name", "result_value", "result_unit", "reference_range", "performed_at", "abnormal_flag")
+
+
+def upsert_latest_results(results: Iterable[LabResult]) -> int:
+    """
+    Moves LatestLabResult forward for the given (just flushed) results. A stored row is only
+    replaced by a result performed at the same time or later, so out-of-order files never roll
+    the latest value back. Returns the number of rows inserted or replaced.
+    """
+    latest: dict[tuple[str, str], dict] = {}
+    for result in results:
+        key = (result.patient_id, result.test_code)
+        values = {field: getattr(result, field) for field in LATEST_FIELDS}
+        values["performed_at"] = _aware(result.performed_at)
+        # One candidate per key: ON CONFLICT can't touch the same row twice in one statement
+        if key not in latest or latest[key]["performed_at"] <= values["performed_at"]:
+            latest[key] = values
+
+    if not latest:
+        return 0
+
+    table = connection.ops.quote_name(LatestLabResult._meta.db_table)
+    key_columns = [_column("patient_id"), _column("test_code")]
+    value_columns = [_column(field) for field in [*LATEST_FIELDS, "updated_at"]]
+    columns = ", ".join([*key_columns, *value_columns])
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in value_columns)
+    placeholders = ", ".join(["(" + "%s, " * (len(key_columns) + len(LATEST_FIELDS)) + "NOW())"] * len(latest))
+    # Sorted, so concurrent flushes lock rows in the same order
+    params = [param for key, values in sorted(latest.items()) for param in (*key, *values.values())]
+
+    performed_at = _column("performed_at")
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) VALUES {placeholders} "
+            f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {updates} "
+            f"WHERE {table}.{performed_at} <= EXCLUDED.{performed_at}",
+            params,
+        )
+        return cursor.rowcount
+
+
+def get_latest_results(patient_id: str, test_codes: Iterable[str] | None = None) -> models.QuerySet:
+    """
+    Latest result of each test of a patient, ordered by test code.
+    """
+    queryset = LatestLabResult.objects.filter(patient_id=patient_id)
+    if test_codes:
+        queryset = queryset.filter(test_code__in=list(test_codes))
+    return queryset.order_by("test_code")
+
+
+def _column(field: str) -> str:
+    return connection.ops.quote_name(LatestLabResult._meta.get_field(field).column)
+
+
+def _aware(value: datetime) -> datetime:
+    # Naive timestamps are stored in the current time zone, as Django does on save
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
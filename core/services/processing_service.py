@@ -1,9 +1,15 @@
 import logging
+import time
 from itertools import batched
 
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 from pydantic import ValidationError as PydanticValidationError
 
+from core import metrics
 from core.models import Artifact, RawData
+from core.profiling import stage
 from core.strategies.factory import StrategyFactory
 
 logger = logging.getLogger(__name__)
@@ -11,9 +17,12 @@ logger = logging.getLogger(__name__)
 # Batch processing configuration
 BATCH_SIZE = 1000
 
-def process_artifact(artifact_id: int) -> tuple[int, int]:
+@stage("process_artifact")
+def process_artifact(artifact_id: int, follow_ingestion: bool = False) -> tuple[int, int]:
     """
     Step 2: Forward job. Processes RawData from an Artifact using the appropriate Strategy.
+    With follow_ingestion, runs alongside ingestion: committed row ranges are processed as the
+    watermark advances, and the artifact is marked COMPLETED once both stages have drained.
     """
     try:
         artifact = Artifact.objects.get(id=artifact_id)
@@ -33,35 +42,96 @@ def process_artifact(artifact_id: int) -> tuple[int, int]:
         return None
 
     # Process pending rows
-    pending_rows = RawData.objects.filter(artifact=artifact, status=RawData.PENDING)
+    if follow_ingestion:
+        row_batches = _follow_committed_rows(artifact)
+    else:
+        pending_rows = RawData.objects.filter(artifact=artifact, status=RawData.PENDING)
+        row_batches = batched(pending_rows.iterator(), BATCH_SIZE)
 
     success_count = 0
     failure_count = 0
     
-    # Static calculation of update_fields
-    update_fields = (
-        list(set(strategy.schema_class.model_fields.keys()) - set(strategy.unique_fields))
-        if strategy.unique_fields
-        else []
-    )
-
-    for batch in batched(pending_rows.iterator(), BATCH_SIZE):
-        instances, success_rows, failed_rows = _prepare_batch(strategy, batch)
-        
-        s_count, f_count = _flush_batch(
-            strategy, 
-            instances, 
-            success_rows, 
-            failed_rows, 
-            update_fields
-        )
+    update_fields = get_update_fields(strategy)
+    rows_processed = metrics.ROWS_PROCESSED.labels(artifact.content_type)
+    rows_failed = metrics.ROWS_FAILED.labels(artifact.content_type)
+    flush_seconds = metrics.FLUSH_SECONDS.labels(artifact.content_type)
+
+    row_batches = iter(row_batches)
+    while True:
+        with stage("fetch_rows"):
+            batch = next(row_batches, None)
+        if batch is None:
+            break
+
+        with stage("prepare_batch", rows=len(batch)):
+            instances, success_rows, failed_rows = _prepare_batch(strategy, batch)
+
+        with stage("flush_batch", rows=len(batch)), flush_seconds.time():
+            s_count, f_count = _flush_batch(
+                strategy, 
+                instances, 
+                success_rows, 
+                failed_rows, 
+                update_fields
+            )
         success_count += s_count
         failure_count += f_count
+        rows_processed.inc(s_count)
+        rows_failed.inc(f_count)
+
+    if follow_ingestion and artifact.ingestion_complete:
+        Artifact.objects.filter(id=artifact.id, status=Artifact.PROCESSING).update(status=Artifact.COMPLETED)
+    if not follow_ingestion or artifact.ingestion_complete:
+        # Every raw row has been handled: from now on the staging purge may remove them
+        Artifact.objects.filter(id=artifact.id).update(processed_at=timezone.now())
 
     logger.info(f"Artifact {artifact.id} processed: {success_count} success, {failure_count} failures")
     return success_count, failure_count
 
 
+def get_update_fields(strategy) -> list[str]:
+    """
+    The upsert update_fields, compiled into the strategy's plan at registration
+    (see core.strategies.base.compile_plan).
+    """
+    return list(strategy.plan.update_fields)
+
+
+def _follow_committed_rows(artifact):
+    """
+    Yields batches of pending rows as ingestion advances the artifact's committed_rows watermark.
+    Stops once ingestion has completed and every committed row was handed out, when ingestion fails,
+    or when the watermark stalls for STREAMING_HANDOFF_IDLE_TIMEOUT, which marks the artifact FAILED
+    (its rows are left PENDING for a rerun) instead of leaving it PROCESSING.
+    """
+    processed_upto = 0
+    idle_since = time.monotonic()
+
+    while True:
+        artifact.refresh_from_db(fields=["status", "committed_rows", "ingestion_complete"])
+
+        if artifact.status == Artifact.FAILED:
+            logger.error(f"Ingestion of artifact {artifact.id} failed; stopping streaming processing")
+            return
+
+        watermark = artifact.committed_rows
+        if watermark > processed_upto:
+            committed_rows = RawData.objects.filter(
+                artifact=artifact, status=RawData.PENDING, row_index__gt=processed_upto, row_index__lte=watermark
+            )
+            yield from batched(committed_rows.iterator(), BATCH_SIZE)
+            processed_upto = watermark
+            idle_since = time.monotonic()
+        elif artifact.ingestion_complete:
+            return
+        elif time.monotonic() - idle_since > settings.STREAMING_HANDOFF_IDLE_TIMEOUT:
+            logger.warning(f"Ingestion of artifact {artifact.id} stalled at row {watermark}; marking it failed")
+            Artifact.objects.filter(id=artifact.id, status=Artifact.PROCESSING).update(status=Artifact.FAILED)
+            return
+        else:
+            time.sleep(settings.STREAMING_HANDOFF_POLL_INTERVAL)
+
+
 def _prepare_batch(strategy, batch):
     """
     Processes a batch of raw rows into model instances.
@@ -70,6 +140,7 @@ def _prepare_batch(strategy, batch):
     instances = []
     success_rows = []
     failed_rows = []
+    build = strategy.plan.instance_builder()
 
     for raw_row in batch:
         try:
@@ -79,7 +150,7 @@ def _prepare_batch(strategy, batch):
             # 2. Transformation: Strategy converts Pydantic model to dict, handling domain logic (e.g. unit conversion)
             django_data = strategy.transform(schema_data)
             
-            instances.append(strategy.model_class(**django_data))
+            instances.append(build(django_data, artifact_id=raw_row.artifact_id))
             success_rows.append(raw_row)
             
         except (PydanticValidationError, Exception) as e:
@@ -99,9 +170,12 @@ def _prepare_batch(strategy, batch):
     return instances, success_rows, failed_rows
 
 
+@transaction.atomic
 def _flush_batch(strategy, instances, success_rows, failed_rows, update_fields):
     """
-    Helper to execute bulk operations.
+    Helper to execute bulk operations. Runs as one transaction, so the upsert, the strategy's
+    derived tables (e.g. rollups) and the RawData statuses are committed together and a retried
+    batch is never applied twice.
     """
     # 1. Bulk Upsert Domain Models
     if instances:
@@ -115,7 +189,9 @@ def _flush_batch(strategy, instances, success_rows, failed_rows, update_fields):
                 "update_fields": update_fields,
             })
 
+        flush_state = strategy.before_flush(instances)
         strategy.model_class.objects.bulk_create(instances, **bulk_kwargs)
+        strategy.after_flush(instances, flush_state)
 
     # 2. Bulk Update RawData Status (Success)
     if success_rows:
@@ -0,0 +1,122 @@
+import gzip
+import json
+import logging
+import time
+from collections.abc import Callable
+from io import BytesIO
+from typing import Any, BinaryIO
+
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
+
+from core.models import Artifact, RawData
+from core.services.storage import build_writer
+
+logger = logging.getLogger(__name__)
+
+# Purge configuration
+CHUNK_SIZE = 5000
+
+
+def purge_processed_raw_data(
+    chunk_size: int = CHUNK_SIZE,
+    archive_to: str | None = None,
+    sleep_seconds: float = 0.0,
+    max_chunks: int | None = None,
+) -> dict[str, int]:
+    """
+    Shrinks the staging table by removing PROCESSED RawData rows of COMPLETED artifacts whose
+    processing has finished (processed_at is set; with streaming off, COMPLETED only means ingested).
+
+    Rows are handled one artifact at a time in bounded chunks. Each chunk is optionally archived
+    as gzipped NDJSON (local directory or s3://bucket/prefix) and then removed with a single
+    raw DELETE, bypassing Django's cascade collector (RawData has no dependents).
+    Every run selects all eligible artifacts that still have processed rows, so interrupted or
+    bounded runs are simply repeated, whatever order artifacts finished in.
+    """
+    archive = build_writer(archive_to, content_type="application/gzip") if archive_to else None
+    purge_run = _PurgeRun(chunk_size, archive, sleep_seconds, max_chunks)
+
+    processed_rows = RawData.objects.filter(artifact=OuterRef("pk"), status=RawData.PROCESSED)
+    artifact_ids = (
+        Artifact.objects.filter(status=Artifact.COMPLETED, processed_at__isnull=False)
+        .filter(Exists(processed_rows))
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+
+    for artifact_id in artifact_ids.iterator():
+        if not purge_run.purge_artifact(artifact_id):
+            break
+
+        purge_run.stats["artifacts"] += 1
+
+    stats = purge_run.stats
+    logger.info(
+        f"RawData purge finished: {stats['rows']} rows in {stats['chunks']} chunks "
+        f"across {stats['artifacts']} artifacts"
+    )
+    return stats
+
+
+class _PurgeRun:
+    """
+    Holds the throttling/archival configuration and running totals of a single purge invocation.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int,
+        archive: Callable[[str, BinaryIO], str] | None,
+        sleep_seconds: float,
+        max_chunks: int | None,
+    ):
+        self.chunk_size = chunk_size
+        self.archive = archive
+        self.sleep_seconds = sleep_seconds
+        self.max_chunks = max_chunks
+        self.stats = {"artifacts": 0, "chunks": 0, "rows": 0}
+
+    def purge_artifact(self, artifact_id: int) -> bool:
+        """
+        Purges all PROCESSED rows of one artifact. Returns False if the chunk budget ran out first.
+        """
+        processed_rows = RawData.objects.filter(artifact_id=artifact_id, status=RawData.PROCESSED)
+
+        while True:
+            # No ORDER BY: the (artifact, status) index hands back the next chunk, and deleted rows never reappear.
+            rows = list(processed_rows.values("id", "row_index", "data", "raw_content")[: self.chunk_size])
+            if not rows:
+                return True
+
+            if self.max_chunks is not None and self.stats["chunks"] >= self.max_chunks:
+                return False
+
+            self._purge_chunk(artifact_id, rows)
+
+            if self.sleep_seconds:
+                time.sleep(self.sleep_seconds)
+
+    def _purge_chunk(self, artifact_id: int, rows: list[dict[str, Any]]):
+        row_ids = [row["id"] for row in rows]
+
+        if self.archive:
+            name = f"artifact_{artifact_id}/rows_{min(row_ids)}_{max(row_ids)}.ndjson.gz"
+            location = self.archive(name, BytesIO(_serialize_chunk(rows)))
+            logger.info(f"Archived {len(rows)} rows of artifact {artifact_id} to {location}")
+
+        # Artifact.success_count includes purged rows, so the count moves with the delete
+        with transaction.atomic():
+            deleted = RawData.objects.filter(id__in=row_ids)._raw_delete(RawData.objects.db)
+            Artifact.objects.filter(id=artifact_id).update(purged_count=F("purged_count") + deleted)
+
+        self.stats["chunks"] += 1
+        self.stats["rows"] += deleted
+
+
+def _serialize_chunk(rows: list[dict[str, Any]]) -> bytes:
+    """
+    Encodes a chunk of rows as gzip-compressed newline-delimited JSON.
+    """
+    lines = "".join(json.dumps(row, default=str) + "\n" for row in rows)
+    return gzip.compress(lines.encode("utf-8"))
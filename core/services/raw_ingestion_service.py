@@ -1,8 +1,11 @@
 import csv
 import logging
+from collections.abc import Callable
 from typing import TextIO
 
+from core import metrics
 from core.models import Artifact, RawData
+from core.profiling import stage
 
 # Use a constant for batch size
 BATCH_SIZE = 1000
@@ -10,10 +13,16 @@ BATCH_SIZE = 1000
 logger = logging.getLogger(__name__)
 
 
-def ingest_file_to_raw(file_obj: TextIO, file_name: str, content_type: str) -> Artifact:
+@stage("ingest_file_to_raw")
+def ingest_file_to_raw(
+    file_obj: TextIO, file_name: str, content_type: str, handoff: Callable[[Artifact], None] | None = None
+) -> Artifact:
     """
     Step 1: Ingests a CSV file into RawData models grouped by an Artifact.
     Table structure is preserved 1:1 in the 'data' JSONField.
+    With handoff, the callback receives the artifact before any row is written and each committed
+    batch advances the artifact's committed_rows watermark, so processing can follow it; processing
+    (not ingestion) then marks the artifact COMPLETED. A failing handoff fails the artifact.
     """
     # Note: We now store s3_key instead of file.
     # file_obj is passed in just for reading parsing, not saving to the model.
@@ -25,6 +34,10 @@ def ingest_file_to_raw(file_obj: TextIO, file_name: str, content_type: str) -> A
     )
 
     try:
+        # Inside the try: if publishing the follower fails, the artifact is marked FAILED, not left PROCESSING
+        if handoff:
+            handoff(artifact)
+
         # Reset pointer just in case
         if hasattr(file_obj, "seek"):
             file_obj.seek(0)
@@ -42,29 +55,41 @@ def ingest_file_to_raw(file_obj: TextIO, file_name: str, content_type: str) -> A
             artifact.save()
             return artifact
 
+        rows_ingested = metrics.ROWS_INGESTED.labels(content_type)
         raw_rows = []
         for i, row in enumerate(reader, start=1):
-            # Clean keys/values
-            cleaned_row = {k.strip(): v.strip() for k, v in row.items() if k and k.strip()}
             raw_rows.append(
                 RawData(
                     artifact=artifact,
                     row_index=i,
-                    data=cleaned_row,
+                    data=clean_row(row),
                     status=RawData.PENDING,
                 )
             )
 
             # Batch create
             if len(raw_rows) >= BATCH_SIZE:
-                RawData.objects.bulk_create(raw_rows)
+                with stage("raw_insert", rows=len(raw_rows)):
+                    RawData.objects.bulk_create(raw_rows)
+                    if handoff:
+                        # Only a follower reads the watermark before ingestion completes
+                        Artifact.objects.filter(id=artifact.id).update(committed_rows=i)
+                rows_ingested.inc(len(raw_rows))
                 raw_rows = []
 
         if raw_rows:
-            RawData.objects.bulk_create(raw_rows)
+            with stage("raw_insert", rows=len(raw_rows)):
+                RawData.objects.bulk_create(raw_rows)
+            rows_ingested.inc(len(raw_rows))
 
-        artifact.status = Artifact.COMPLETED
-        artifact.save()
+        artifact.committed_rows = i
+        artifact.ingestion_complete = True
+        if handoff:
+            # Status belongs to the follower now, which may already have failed a stalled artifact
+            artifact.save(update_fields=["committed_rows", "ingestion_complete"])
+        else:
+            artifact.status = Artifact.COMPLETED
+            artifact.save()
         logger.info(f"Successfully ingested artifact {artifact.id} with {i} rows")
 
     except Exception as e:
@@ -73,3 +98,10 @@ def ingest_file_to_raw(file_obj: TextIO, file_name: str, content_type: str) -> A
         artifact.save()
 
     return artifact
+
+
+def clean_row(row: dict[str, str]) -> dict[str, str]:
+    """
+    Strips keys/values of a CSV row and drops blank (or overflow) columns.
+    """
+    return {k.strip(): v.strip() for k, v in row.items() if k and k.strip()}
@@ -0,0 +1,42 @@
+import os
+import shutil
+from collections.abc import Callable
+from pathlib import Path
+from typing import BinaryIO
+
+from core.aws import get_client
+
+S3_SCHEME = "s3://"
+
+
+def build_writer(destination: str, content_type: str | None = None) -> Callable[[str, BinaryIO], str]:
+    """
+    Returns a callable(name, body) -> location storing a binary file object as <destination>/<name>:
+    put_object (with content_type as ContentType) for s3://bucket[/prefix] destinations, otherwise a
+    local directory. Local files are written next to their final path and renamed, so readers never
+    see a partial file.
+    """
+    if destination.startswith(S3_SCHEME):
+        bucket, _, prefix = destination[len(S3_SCHEME) :].partition("/")
+        s3_client = get_client("s3")
+        extra = {"ContentType": content_type} if content_type else {}
+
+        def write_to_s3(name: str, body: BinaryIO) -> str:
+            key = f"{prefix.rstrip('/')}/{name}" if prefix else name
+            s3_client.put_object(Bucket=bucket, Key=key, Body=body, **extra)
+            return f"{S3_SCHEME}{bucket}/{key}"
+
+        return write_to_s3
+
+    base_dir = Path(destination)
+
+    def write_to_disk(name: str, body: BinaryIO) -> str:
+        path = base_dir / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            shutil.copyfileobj(body, f)
+        os.replace(tmp_path, path)
+        return str(path)
+
+    return write_to_disk
@@ -1,4 +1,5 @@
-from core.models import AuditRecord
+from core.models import AuditRecord, ProviderDailyTotal
+from core.rollups import Rollup
 from core.schemas.audit_record import AuditRecordSchema
 
 from .base import IngestionStrategy, register_strategy
@@ -13,6 +14,7 @@ class AuditRecordStrategy(IngestionStrategy):
     model_class = AuditRecord
     schema_class = AuditRecordSchema
     unique_fields = ["provider_npi", "service_date", "billing_amount"]
+    rollup = Rollup(ProviderDailyTotal, AuditRecord, "service_date", "provider_npi", "billing_amount")
 
     @classmethod
     def can_handle(cls, object_key: str) -> bool:
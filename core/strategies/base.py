@@ -1,8 +1,105 @@
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from functools import cache
+from types import MappingProxyType
 from typing import Any
 
 from django.db import models
+from django.db.models.base import ModelState
+from django.db.models.signals import post_init, pre_init
 from pydantic import BaseModel
 
+from core.rollups import Rollup
+
+
+@dataclass(frozen=True)
+class StrategyPlan:
+    """
+    Per-strategy facts compiled once by register_strategy instead of per artifact or per row:
+    the model's columns, the upsert's conflict and update columns, and the instance builder.
+    """
+
+    model_class: type[models.Model]
+    # attnames of the model's concrete fields, in column order
+    field_order: tuple[str, ...]
+    unique_fields: tuple[str, ...]
+    update_fields: tuple[str, ...]
+    # transform() key -> attname, for the concrete non-relation fields and FK attnames (e.g. artifact_id)
+    field_map: Mapping[str, str]
+    # Values of fields missing from the transform() output: constant defaults, and fields with a callable default
+    defaults: Mapping[str, Any]
+    default_factories: tuple[tuple[str, Callable[[], Any]], ...]
+
+    def instance_builder(self) -> Callable[..., models.Model]:
+        """
+        Returns build(data, **extra), equivalent to model_class(**data, **extra). While no
+        pre_init/post_init receivers are connected for the model, it fills the instance __dict__
+        directly and skips Model.__init__. Call once per batch, so receivers connected later apply.
+        """
+        if pre_init.has_listeners(self.model_class) or post_init.has_listeners(self.model_class):
+            return self._build_with_init
+        return self._build
+
+    def _build_with_init(self, data: dict[str, Any], **extra: Any) -> models.Model:
+        return self.model_class(**data, **extra)
+
+    def _build(self, data: dict[str, Any], **extra: Any) -> models.Model:
+        values = dict(self.defaults)
+        try:
+            for key, value in data.items():
+                values[self.field_map[key]] = value
+            for key, value in extra.items():
+                values[self.field_map[key]] = value
+        except KeyError:
+            # Relation objects, properties or unknown keys: Model.__init__ handles (or rejects) them
+            return self._build_with_init(data, **extra)
+        for attname, factory in self.default_factories:
+            if attname not in values:
+                values[attname] = factory()
+
+        instance = self.model_class.__new__(self.model_class)
+        instance._state = ModelState()
+        instance.__dict__.update(values)
+        return instance
+
+
+def compile_plan(strategy_cls: type["IngestionStrategy"]) -> StrategyPlan:
+    """
+    Builds the StrategyPlan of a strategy class from its model, schema and identity columns.
+    """
+    opts = strategy_cls.model_class._meta
+    fields = opts.concrete_fields
+
+    field_map = {field.attname: field.attname for field in fields}
+    field_map.update({field.name: field.attname for field in fields if not field.is_relation})
+
+    defaults = {}
+    default_factories = []
+    for field in fields:
+        if field.has_default() and callable(field.default):
+            default_factories.append((field.attname, field.get_default))
+        else:
+            defaults[field.attname] = field.get_default()
+
+    unique_fields = tuple(strategy_cls.unique_fields)
+    update_fields = ()
+    if unique_fields:
+        # Schema and derived fields except the identity columns, plus the artifact lineage so a
+        # re-ingested record points at the latest artifact and updated_at (auto_now only fills the
+        # INSERT values) so incremental exports see the change
+        names = dict.fromkeys([*strategy_cls.schema_class.model_fields, *strategy_cls.derived_fields])
+        update_fields = (*(name for name in names if name not in unique_fields), "artifact", "updated_at")
+
+    return StrategyPlan(
+        model_class=strategy_cls.model_class,
+        field_order=tuple(field.attname for field in fields),
+        unique_fields=unique_fields,
+        update_fields=update_fields,
+        field_map=MappingProxyType(field_map),
+        defaults=MappingProxyType(defaults),
+        default_factories=tuple(default_factories),
+    )
+
 
 class IngestionStrategy:
     """
@@ -12,6 +109,11 @@ class IngestionStrategy:
     model_class: type[models.Model]
     schema_class: type[BaseModel]
     unique_fields: list[str]
+    # Model fields filled by transform() rather than taken from the schema; upserts update them too
+    derived_fields: list[str] = []
+    rollup: Rollup | None = None
+    # Set by register_strategy
+    plan: StrategyPlan
 
     @classmethod
     def can_handle(cls, object_key: str) -> bool:
@@ -27,16 +129,33 @@ class IngestionStrategy:
         """
         return schema_instance.model_dump()
 
+    def before_flush(self, instances: list[models.Model]) -> Any:
+        """
+        Runs in the flush transaction right before the batch is upserted.
+        The return value is handed to after_flush.
+        """
+        if self.rollup:
+            return self.rollup.capture(instances, self.unique_fields)
+        return None
+
+    def after_flush(self, instances: list[models.Model], state: Any):
+        """
+        Runs in the flush transaction right after the batch was upserted, e.g. to maintain derived tables.
+        """
+        if self.rollup:
+            self.rollup.apply(instances, state)
+
 
 STRATEGY_REGISTRY: dict[str, type[IngestionStrategy]] = {}
 
 
 def register_strategy(name: str):
     """
-    Decorator to register an IngestionStrategy with a unique name.
+    Decorator to register an IngestionStrategy with a unique name and compile its StrategyPlan.
     """
 
     def decorator(cls: type[IngestionStrategy]):
+        cls.plan = compile_plan(cls)
         STRATEGY_REGISTRY[name] = cls
         return cls
 
@@ -46,8 +165,14 @@ def register_strategy(name: str):
 def get_strategy(type_name: str) -> IngestionStrategy | None:
     """
     Function to retrieve a strategy instance from the registry.
+    Strategies are stateless, so each class has one shared instance.
     """
     strategy_cls = STRATEGY_REGISTRY.get(type_name)
     if strategy_cls:
-        return strategy_cls()
+        return _instance(strategy_cls)
     return None
+
+
+@cache
+def _instance(strategy_cls: type[IngestionStrategy]) -> IngestionStrategy:
+    return strategy_cls()
@@ -1,8 +1,11 @@
-from decimal import Decimal
 from typing import Any
 
+from django.conf import settings
+
+from core.lab_rules import convert, parse_reference_range
 from core.models.lab_result import LabResult
 from core.schemas.lab_result import LabResultSchema
+from core.services.latest_lab_result_service import upsert_latest_results
 from core.strategies.base import IngestionStrategy, register_strategy
 
 
@@ -16,50 +19,40 @@ class LabResultStrategy(IngestionStrategy):
     model_class = LabResult
     schema_class = LabResultSchema
     unique_fields = ["patient_id", "test_code", "performed_at"]
+    derived_fields = ["abnormal_flag"]
 
     @classmethod
     def can_handle(cls, object_key: str) -> bool:
         return object_key.startswith("labs/")
 
+    def after_flush(self, instances: list[LabResult], state: Any):
+        """
+        Keeps the per-patient LatestLabResult index current, in the same transaction as the upsert.
+        """
+        super().after_flush(instances, state)
+        upsert_latest_results(instances)
+
     def transform(self, schema_instance: LabResultSchema) -> dict[str, Any]:
         """
         Transform the schema instance into a dictionary for the model.
-        
+
         Transformations:
-        1. Normalize units: Convert 'mmol/L' to 'mg/dL' for Glucose ("L001").
-        2. Reference Range Flagging: Append "[HIGH]" or "[LOW]" to test_name 
-           if result is outside parsed reference range.
-        3. Standardize unit case.
+        1. Normalize units: Convert with the conversion registered for (test_code, unit) in
+           core.lab_rules (e.g. 'mmol/L' to 'mg/dL' for Glucose "L001").
+        2. Standardize unit case.
+        3. Reference Range Flagging: Set abnormal_flag to HIGH or LOW if the result is outside
+           the parsed reference range (and append " [HIGH]"/" [LOW]" to test_name if
+           LAB_RESULT_FLAG_SUFFIX is enabled). Unparseable ranges are not flagged.
         """
         data = schema_instance.model_dump()
-        
-        # 1. Unit Conversion (Glucose L001: mmol/L -> mg/dL)
-        # Factor: 1 mmol/L = 18.0182 mg/dL
-        if data["test_code"] == "L001" and data["result_unit"].lower() == "mmol/l":
-            data["result_value"] = data["result_value"] * Decimal("18.0182")
-            data["result_unit"] = "mg/dL"
 
-        # Standardize unit case (after potential conversion)
-        if data.get("result_unit"):
-            data["result_unit"] = data["result_unit"].upper()
+        data["result_value"], unit = convert(data["test_code"], data["result_value"], data["result_unit"])
+        data["result_unit"] = unit.upper()
 
-        # 2. Reference Range Flagging
-        # Simple parser for ranges involved in format "min-max" or "<max" or ">min"
-        # Since this is a demo, we will handle "min-max" (e.g. "70-100")
-        ref_range = data.get("reference_range", "")
-        if ref_range and "-" in ref_range:
-            try:
-                low_str, high_str = ref_range.split("-")
-                low = Decimal(low_str.strip())
-                high = Decimal(high_str.strip())
-                value = data["result_value"]
+        reference_range = parse_reference_range(data["reference_range"])
+        data["abnormal_flag"] = reference_range.flag(data["result_value"]) if reference_range else None
 
-                if value < low:
-                    data["test_name"] = f"{data['test_name']} [LOW]"
-                elif value > high:
-                    data["test_name"] = f"{data['test_name']} [HIGH]"
-            except Exception:
-                 # If parsing fails, skip flagging logic
-                pass
+        if data["abnormal_flag"] and settings.LAB_RESULT_FLAG_SUFFIX:
+            data["test_name"] = f"{data['test_name']} [{data['abnormal_flag']}]"
 
         return data
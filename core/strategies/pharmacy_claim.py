@@ -1,4 +1,6 @@
 from core.models.pharmacy_claim import PharmacyClaim
+from core.models.pharmacy_daily_total import PharmacyDailyTotal
+from core.rollups import Rollup
 from core.schemas.pharmacy_claim import PharmacyClaimSchema
 
 from .base import IngestionStrategy, register_strategy
@@ -13,6 +15,7 @@ class PharmacyClaimStrategy(IngestionStrategy):
     model_class = PharmacyClaim
     schema_class = PharmacyClaimSchema
     unique_fields = ["claim_id"]
+    rollup = Rollup(PharmacyDailyTotal, PharmacyClaim, "service_date", "ncpdp_id", "total_amount_paid")
 
     @classmethod
     def can_handle(cls, object_key: str) -> bool:
@@ -1,4 +1,7 @@
+# Imported for their signal handlers (per-task connection reset, queue wait metrics and worker exporter)
+from . import connections, monitoring  # noqa: F401
 from .artifact_processing import process_artifact_task
-from .s3_processing import process_s3_file
+from .maintenance import export_parquet_task, purge_raw_data_task
+from .s3_processing import process_s3_batch, process_s3_file
 
-__all__ = ["process_s3_file", "process_artifact_task"]
+__all__ = ["process_s3_file", "process_s3_batch", "process_artifact_task", "purge_raw_data_task", "export_parquet_task"]
@@ -3,21 +3,27 @@ from typing import Any
 
 from celery import shared_task
 
+from core import profiling
 from core.services.processing_service import process_artifact
 
 logger = logging.getLogger(__name__)
 
 
 @shared_task(name="process_artifact_task", bind=True, max_retries=3)
-def process_artifact_task(self: Any, artifact_id: int) -> dict[str, Any]:
+def process_artifact_task(
+    self: Any, artifact_id: int, follow_ingestion: bool = False, profile: bool | None = None
+) -> dict[str, Any]:
     """
     Step 2: Processes an ingested Artifact into domain models.
+    With follow_ingestion, starts while ingestion is still writing (see STREAMING_HANDOFF).
+    profile overrides PIPELINE_PROFILING for this task (see core.profiling).
     """
 
     logger.info(f"Starting processing task for artifact {artifact_id}")
 
     try:
-        success_count, failed_count = process_artifact(artifact_id)
+        with profiling.profile(f"artifact {artifact_id}", enabled=profile):
+            success_count, failed_count = process_artifact(artifact_id, follow_ingestion=follow_ingestion)
 
         return {"success": success_count, "failed": failed_count}
 
@@ -0,0 +1,70 @@
+import logging
+import threading
+import time
+from typing import Any
+
+from celery.worker import state as worker_state
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LanePausedError(Exception):
+    """
+    Raised when an event targets an ingestion lane whose gate is closed; the event is not acknowledged.
+    """
+
+
+class BackpressureGate:
+    """
+    Decides whether the S3 event consumer should stop feeding an ingestion lane.
+
+    Downstream depth is the sum of ApproximateNumberOfMessages over the gated queues, refreshed
+    at most every S3_EVENT_BACKPRESSURE_CHECK_INTERVAL seconds. The gate closes once depth reaches the
+    high watermark and reopens only after it drains below the low watermark (hysteresis), so excess
+    events stay in the S3 event queue instead of piling up in Celery's queue.
+    Optionally the worker's own pool counts as saturated when every slot is busy.
+    """
+
+    def __init__(self, sqs: Any, queue_urls: list[str], pool_limit: int | None = None):
+        self.sqs = sqs
+        self.queue_urls = queue_urls
+        self.high_watermark = settings.S3_EVENT_BACKPRESSURE_HIGH_WATERMARK
+        self.low_watermark = settings.S3_EVENT_BACKPRESSURE_LOW_WATERMARK
+        self.check_interval = settings.S3_EVENT_BACKPRESSURE_CHECK_INTERVAL
+        self.pool_limit = pool_limit
+        self.paused = False
+        self.depth = 0
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def should_pause(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if self._checked_at is None or now - self._checked_at >= self.check_interval:
+                self._checked_at = now
+                self._refresh()
+
+            return self.paused or self._pool_saturated()
+
+    def _refresh(self):
+        try:
+            self.depth = sum(self._queue_depth(queue_url) for queue_url in self.queue_urls)
+        except Exception as e:
+            # Keep the previous decision rather than flapping on a transient SQS error
+            logger.error(f"Backpressure depth check failed: {e}")
+            return
+
+        was_paused = self.paused
+        self.paused = self.depth > self.low_watermark if was_paused else self.depth >= self.high_watermark
+
+        if self.paused != was_paused:
+            state = "pausing" if self.paused else "resuming"
+            logger.info(f"Backpressure {state} S3 events for {', '.join(self.queue_urls)} (depth: {self.depth})")
+
+    def _queue_depth(self, queue_url: str) -> int:
+        response = self.sqs.get_queue_attributes(QueueUrl=queue_url, AttributeNames=["ApproximateNumberOfMessages"])
+        return int(response["Attributes"]["ApproximateNumberOfMessages"])
+
+    def _pool_saturated(self) -> bool:
+        return self.pool_limit is not None and len(worker_state.active_requests) >= self.pool_limit
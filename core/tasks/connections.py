@@ -0,0 +1,15 @@
+from celery.signals import task_postrun, task_prerun
+from django.db import close_old_connections
+
+
+@task_prerun.connect
+@task_postrun.connect
+def reset_db_connections(task=None, **kwargs):
+    """
+    Drops connections that are broken, left mid-transaction or past CONN_MAX_AGE before and after
+    each task, so the next task starts clean while healthy connections are reused. With DB_POOL the
+    connection is handed back to the pool instead. Eager tasks share the caller's connection.
+    """
+    if task is not None and getattr(task.request, "is_eager", False):
+        return
+    close_old_connections()
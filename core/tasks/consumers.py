@@ -2,15 +2,26 @@ import json
 import logging
 import threading
 import time
+from itertools import batched
 from typing import Any
 from urllib.parse import unquote_plus
 
-import boto3
 from celery import bootsteps, current_app
 from django.conf import settings
+from django.db import close_old_connections
+
+from core import metrics
+from core.aws import get_client
+from core.tasks.backpressure import BackpressureGate, LanePausedError
+from core.tasks.dedup import EventDeduplicator
+from core.tasks.inflight import InFlightRegistry
+from core.tasks.routing import lane_queues, queue_for_size
 
 logger = logging.getLogger(__name__)
 
+# SQS caps ReceiveMessage and DeleteMessageBatch at 10 entries per call
+SQS_MAX_BATCH_SIZE = 10
+
 
 class S3EventConsumer(bootsteps.StartStopStep):
     """
@@ -24,25 +35,43 @@ class S3EventConsumer(bootsteps.StartStopStep):
         self.sqs = None
         self.queue_url = None
         self.enabled = True
-        self.thread = None
+        self.threads = []
+        self.heartbeat_thread = None
+        # Lane queue -> gate; each lane is throttled on its own depth
+        self.backpressure: dict[str, BackpressureGate] = {}
+        self.inflight = InFlightRegistry()
+        self.dedup = EventDeduplicator(
+            ttl_seconds=settings.S3_EVENT_DEDUP_TTL,
+            max_entries=settings.S3_EVENT_DEDUP_MAX_ENTRIES,
+            use_database=settings.S3_EVENT_DEDUP_DATABASE,
+            pending_seconds=settings.S3_EVENT_VISIBILITY_TIMEOUT,
+        )
 
     def start(self, worker: Any):
         self.enabled = True
         # Lazy initialization
         endpoint_url = settings.AWS_ENDPOINT_URL
-        self.sqs = boto3.client(
-            "sqs",
-            endpoint_url=endpoint_url,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_DEFAULT_REGION,
-        )
+        self.sqs = get_client("sqs")
         self.queue_url = f"{endpoint_url}/000000000000/s3-event-queue"
 
-        logger.info(f"S3EventConsumer starting for queue: {self.queue_url}")
+        if settings.S3_EVENT_BACKPRESSURE_ENABLED:
+            pool_limit = worker.concurrency if settings.S3_EVENT_BACKPRESSURE_POOL_SATURATION else None
+            self.backpressure = {
+                queue: BackpressureGate(self.sqs, [f"{endpoint_url}/000000000000/{queue}"], pool_limit=pool_limit)
+                for queue in lane_queues()
+            }
 
-        self.thread = threading.Thread(target=self.run, daemon=True)
-        self.thread.start()
+        poller_count = settings.S3_EVENT_CONSUMER_THREADS
+        logger.info(f"S3EventConsumer starting {poller_count} poller(s) for queue: {self.queue_url}")
+
+        self.threads = [
+            threading.Thread(target=self.run, name=f"S3EventConsumer-{i}", daemon=True) for i in range(poller_count)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+        self.heartbeat_thread = threading.Thread(target=self.heartbeat, name="S3EventConsumer-heartbeat", daemon=True)
+        self.heartbeat_thread.start()
 
     def stop(self, worker: Any):
         self.enabled = False
@@ -51,42 +80,248 @@ class S3EventConsumer(bootsteps.StartStopStep):
     def run(self):
         """
         Continuously polls SQS for messages and dispatches tasks.
+        Runs in each poller thread; the boto3 client is shared, as clients are thread-safe.
+        Celery's task signals never fire in these threads, so each iteration ends by dropping a broken
+        database connection (the dedup table) and handing a pooled one back.
         """
         while self.enabled:
             try:
-                response = self.sqs.receive_message(QueueUrl=self.queue_url, MaxNumberOfMessages=10, WaitTimeSeconds=5)
+                if self.backpressure and all([gate.should_pause() for gate in self.backpressure.values()]):
+                    # No lane can take work: leave events in the S3 event queue until one drains
+                    time.sleep(settings.S3_EVENT_BACKPRESSURE_PAUSE_SECONDS)
+                    continue
 
-                if "Messages" in response:
-                    for msg in response["Messages"]:
-                        self._process_message(msg)
+                messages = self._receive()
+                if messages:
+                    self._process_batch(messages)
 
             except Exception as e:
                 logger.error(f"S3EventConsumer polling error: {e}")
                 time.sleep(1)
+            finally:
+                close_old_connections()
 
-    def _process_message(self, msg: dict[str, Any]):
+    def heartbeat(self):
         """
-        Processes a single SQS message, extracts records, and deletes execution.
+        Periodically extends the visibility timeout of in-flight messages so slow dispatches
+        are not redelivered to another poller, prunes expired de-duplication entries and logs metrics.
+        Releases its database connection after each round, like the pollers.
+        """
+        while self.enabled:
+            time.sleep(settings.S3_EVENT_HEARTBEAT_INTERVAL)
+
+            try:
+                self._extend_visibility(self.inflight.receipt_handles())
+                self.dedup.prune()
+            except Exception as e:
+                logger.error(f"S3EventConsumer heartbeat error: {e}")
+            finally:
+                close_old_connections()
+
+            snapshot = self.metrics()
+            if snapshot["in_flight"]:
+                logger.info(f"S3EventConsumer metrics: {snapshot}")
+
+    def metrics(self) -> dict[str, Any]:
+        """
+        Returns in-flight, lag and age-of-oldest metrics for sizing consumer concurrency.
+        """
+        snapshot = self.inflight.metrics()
+        if self.backpressure:
+            snapshot.update(
+                paused={queue: gate.paused for queue, gate in self.backpressure.items()},
+                downstream_depth={queue: gate.depth for queue, gate in self.backpressure.items()},
+            )
+        return snapshot
+
+    def _receive(self) -> list[dict[str, Any]]:
+        """
+        Long-polls for messages. With batching enabled, keeps receiving for up to
+        S3_EVENT_BATCH_WINDOW_SECONDS after the first message so small objects can share a task.
+        """
+        messages = self._receive_messages(wait_seconds=5)
+        if settings.S3_EVENT_BATCH_MAX_OBJECTS <= 1:
+            return messages
+
+        deadline = time.monotonic() + settings.S3_EVENT_BATCH_WINDOW_SECONDS
+        while messages and len(messages) < settings.S3_EVENT_BATCH_MAX_OBJECTS:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            more = self._receive_messages(wait_seconds=int(remaining))
+            if not more:
+                break
+            messages.extend(more)
+
+        return messages
+
+    def _receive_messages(self, wait_seconds: int) -> list[dict[str, Any]]:
+        response = self.sqs.receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=SQS_MAX_BATCH_SIZE,
+            WaitTimeSeconds=wait_seconds,
+            VisibilityTimeout=settings.S3_EVENT_VISIBILITY_TIMEOUT,
+            AttributeNames=["SentTimestamp"],
+        )
+        messages = response.get("Messages", [])
+        metrics.CONSUMER_POLLS.inc()
+        metrics.CONSUMER_MESSAGES.inc(len(messages))
+        return messages
+
+    def _process_batch(self, messages: list[dict[str, Any]]):
+        """
+        Dispatches a received batch over a single broker producer, then acknowledges it in one call.
+        Messages are only deleted once send_task returned, i.e. the broker accepted the publish.
+        Small-lane objects collected while batching are dispatched together after the loop.
+        """
+        fresh = [msg for msg in messages if self.inflight.track(msg)]
+
+        try:
+            with self._producer() as producer:
+                batch = {}
+                dispatched_ids = [msg["MessageId"] for msg in fresh if self._process_message(msg, producer, batch)]
+                failed_ids = self._dispatch_batch(batch, producer)
+
+            dispatched_ids = [message_id for message_id in dispatched_ids if message_id not in failed_ids]
+
+            # Use the latest receipt handle: a redelivery may have replaced it meanwhile.
+            self._acknowledge([self.inflight.receipt_handle(message_id) for message_id in dispatched_ids])
+            self.inflight.release(dispatched_ids, acknowledged=True)
+        finally:
+            # Failed messages stop heartbeating and become visible again once their timeout lapses.
+            self.inflight.release([msg["MessageId"] for msg in fresh], acknowledged=False)
+
+    def _producer(self) -> Any:
+        """
+        Returns a context manager yielding the broker producer shared by one received batch.
+        """
+        return current_app.producer_or_acquire()
+
+    def _send_task(self, task_name: str, kwargs: dict[str, Any], queue: str, producer: Any):
+        """
+        Publishes one task. Overridden by the load test harness to run tasks in-process.
+        """
+        current_app.send_task(task_name, kwargs=kwargs, queue=queue, producer=producer)
+
+    def _process_message(self, msg: dict[str, Any], producer: Any, batch: dict[str, list] | None = None) -> bool:
+        """
+        Processes a single SQS message and extracts records.
+        Returns True when every record was dispatched (or added to the batch) and the message can be deleted.
         """
         try:
             body = json.loads(msg["Body"])
             if "Records" in body:
+                pending = batch.setdefault(msg["MessageId"], []) if batch is not None else None
                 for record in body["Records"]:
-                    self._dispatch_task(record)
+                    self._dispatch_task(record, producer, pending)
 
-            self.sqs.delete_message(QueueUrl=self.queue_url, ReceiptHandle=msg["ReceiptHandle"])
+            return True
+        except LanePausedError as e:
+            # Not acknowledged: redelivered after the visibility timeout, once the lane may have drained
+            logger.info(f"S3EventConsumer: Deferring message {msg['MessageId']}, lane {e} is over its watermark")
+            return False
         except Exception as e:
             logger.error(f"S3EventConsumer message error: {e}")
+            return False
+
+    def _acknowledge(self, receipt_handles: list[str]):
+        """
+        Deletes dispatched messages with DeleteMessageBatch, up to 10 receipts per call.
+        """
+        for chunk in batched(receipt_handles, SQS_MAX_BATCH_SIZE):
+            response = self.sqs.delete_message_batch(
+                QueueUrl=self.queue_url,
+                Entries=[{"Id": str(i), "ReceiptHandle": handle} for i, handle in enumerate(chunk)],
+            )
+            for failure in response.get("Failed", []):
+                logger.error(f"S3EventConsumer delete failed for entry {failure['Id']}: {failure.get('Message')}")
+
+    def _extend_visibility(self, receipt_handles: list[str]):
+        """
+        Resets the visibility timeout of in-flight messages, up to 10 receipts per call.
+        """
+        for chunk in batched(receipt_handles, SQS_MAX_BATCH_SIZE):
+            response = self.sqs.change_message_visibility_batch(
+                QueueUrl=self.queue_url,
+                Entries=[
+                    {"Id": str(i), "ReceiptHandle": handle, "VisibilityTimeout": settings.S3_EVENT_VISIBILITY_TIMEOUT}
+                    for i, handle in enumerate(chunk)
+                ],
+            )
+            for failure in response.get("Failed", []):
+                logger.error(f"S3EventConsumer visibility extension failed for entry {failure['Id']}")
 
-    def _dispatch_task(self, record: dict[str, Any]):
+    def _dispatch_batch(self, batch: dict[str, list[tuple[str, str, str, str]]], producer: Any) -> set[str]:
         """
-        Extracts S3 details and dispatches the Celery task.
+        Dispatches the collected small objects as process_s3_batch tasks of up to S3_EVENT_BATCH_MAX_OBJECTS.
+        Returns the ids of messages with an object in a failed dispatch, whose claims are released.
+        """
+        entries = [(message_id, obj) for message_id, objects in batch.items() for obj in objects]
+        failed_ids = set()
+
+        for chunk in batched(entries, settings.S3_EVENT_BATCH_MAX_OBJECTS):
+            queue = lane_queues()[0]
+            logger.info(f"S3EventConsumer: Dispatching task 'process_s3_batch' for {len(chunk)} objects to {queue}")
+            try:
+                self._send_task(
+                    "process_s3_batch",
+                    {"objects": [[bucket, key] for _, (bucket, key, _, _) in chunk], "lane": queue},
+                    queue,
+                    producer,
+                )
+            except Exception as e:
+                logger.error(f"S3EventConsumer batch dispatch error: {e}")
+                for message_id, (bucket, key, etag, sequencer) in chunk:
+                    self.dedup.release(bucket, key, etag, sequencer)
+                    failed_ids.add(message_id)
+                continue
+
+            metrics.CONSUMER_DISPATCHES.labels("process_s3_batch").inc()
+            for _, (bucket, key, etag, sequencer) in chunk:
+                self.dedup.confirm(bucket, key, etag, sequencer)
+
+        return failed_ids
+
+    def _dispatch_task(self, record: dict[str, Any], producer: Any, batch: list | None = None):
+        """
+        Extracts S3 details and dispatches the Celery task, unless the event is a duplicate
+        of (or older than) one already dispatched for the same object key.
+        The task is routed to the ingestion lane matching the object size from the event record;
+        raises LanePausedError if that lane's backpressure gate is closed.
+        Manifest objects become a process_s3_batch task; with batching enabled, small-lane objects
+        are appended to batch instead of being dispatched one by one.
         """
         bucket = record["s3"]["bucket"]["name"]
-        key = unquote_plus(record["s3"]["object"]["key"])
+        s3_object = record["s3"]["object"]
+        key = unquote_plus(s3_object["key"])
+        etag, sequencer = s3_object.get("eTag"), s3_object.get("sequencer")
+        size = s3_object.get("size")
+        queue = queue_for_size(size)
 
-        logger.info(f"S3EventConsumer: Dispatching task 'process_s3_file' for s3://{bucket}/{key}")
+        gate = self.backpressure.get(queue)
+        if gate and gate.should_pause():
+            raise LanePausedError(queue)
 
-        current_app.send_task(
-            "process_s3_file", kwargs={"bucket_name": bucket, "object_key": key}, queue="healthcare-ingestion-queue"
-        )
+        if not self.dedup.claim(bucket, key, etag, sequencer):
+            logger.info(f"S3EventConsumer: Skipping duplicate event for s3://{bucket}/{key}")
+            return
+
+        batchable = size is not None and queue == lane_queues()[0] and settings.S3_EVENT_BATCH_MAX_OBJECTS > 1
+
+        if key.endswith(settings.S3_BATCH_MANIFEST_SUFFIX):
+            task_name, kwargs = "process_s3_batch", {"manifest": [bucket, key], "lane": queue}
+        elif batchable and batch is not None:
+            batch.append((bucket, key, etag, sequencer))
+            return
+        else:
+            task_name, kwargs = "process_s3_file", {"bucket_name": bucket, "object_key": key, "lane": queue}
+
+        logger.info(f"S3EventConsumer: Dispatching task '{task_name}' for s3://{bucket}/{key} to {queue}")
+
+        try:
+            self._send_task(task_name, kwargs, queue, producer)
+        except Exception:
+            self.dedup.release(bucket, key, etag, sequencer)
+            raise
+        self.dedup.confirm(bucket, key, etag, sequencer)
+        metrics.CONSUMER_DISPATCHES.labels(task_name).inc()
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from core.models import S3ObjectEvent
+
+# S3 sequencers are hex strings of varying length; left-padding makes them comparable as strings.
+SEQUENCER_WIDTH = 64
+
+CLAIM_SQL = f"""
+    INSERT INTO {S3ObjectEvent._meta.db_table} AS event (bucket, object_key, sequencer, etag, expires_at)
+    VALUES (%s, %s, %s, %s, %s)
+    ON CONFLICT (bucket, object_key) DO UPDATE
+    SET sequencer = EXCLUDED.sequencer, etag = EXCLUDED.etag, expires_at = EXCLUDED.expires_at
+    WHERE event.expires_at < %s
+       OR (EXCLUDED.sequencer <> '' AND event.sequencer < EXCLUDED.sequencer)
+       OR (EXCLUDED.sequencer = '' AND event.etag <> EXCLUDED.etag)
+    RETURNING id
+"""
+
+
+class EventDeduplicator:
+    """
+    Drops redundant S3 notifications before they turn into process_s3_file tasks.
+
+    Keeps the latest (sequencer, eTag) seen per (bucket, key) in an in-process LRU with TTL.
+    An event is dispatched only if it is newer than the remembered one: a greater sequencer or,
+    for events without a sequencer, a different eTag. Exact duplicates and out-of-order stale
+    events are dropped. With use_database, the S3ObjectEvent table arbitrates between workers
+    through a conditional upsert, so only one consumer claims each event.
+
+    A claim is only a lease of pending_seconds (the SQS visibility timeout) until confirm() records
+    the successful dispatch for ttl_seconds. If the consumer dies between claim and dispatch, the
+    lease has lapsed by the time SQS redelivers the message, and the redelivery claims it again.
+    """
+
+    def __init__(
+        self, ttl_seconds: int, max_entries: int, use_database: bool = False, pending_seconds: int | None = None
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.pending_seconds = ttl_seconds if pending_seconds is None else pending_seconds
+        self.max_entries = max_entries
+        self.use_database = use_database
+        self._lock = threading.Lock()
+        self._latest: OrderedDict[tuple[str, str], tuple[str, str, float]] = OrderedDict()
+
+    def claim(self, bucket: str, key: str, etag: str | None, sequencer: str | None) -> bool:
+        """
+        Returns True if the event should be dispatched, remembering it as the latest for its key
+        until the pending lease lapses; confirm() once dispatched.
+        """
+        etag, sequencer = _normalize(etag, sequencer)
+        now = time.monotonic()
+
+        with self._lock:
+            previous = self._latest.get((bucket, key))
+            if previous and previous[2] > now and not _supersedes(previous, sequencer, etag):
+                self._latest.move_to_end((bucket, key))
+                return False
+
+        if self.use_database and not self._claim_in_database(bucket, key, sequencer, etag):
+            return False
+
+        with self._lock:
+            self._latest[(bucket, key)] = (sequencer, etag, now + self.pending_seconds)
+            self._latest.move_to_end((bucket, key))
+            while len(self._latest) > self.max_entries:
+                self._latest.popitem(last=False)
+
+        return True
+
+    def confirm(self, bucket: str, key: str, etag: str | None, sequencer: str | None):
+        """
+        Keeps a claimed event for the full TTL once its task was dispatched.
+        """
+        etag, sequencer = _normalize(etag, sequencer)
+
+        with self._lock:
+            previous = self._latest.get((bucket, key))
+            if previous and previous[:2] == (sequencer, etag):
+                self._latest[(bucket, key)] = (sequencer, etag, time.monotonic() + self.ttl_seconds)
+
+        if self.use_database:
+            S3ObjectEvent.objects.filter(bucket=bucket, object_key=key, sequencer=sequencer, etag=etag).update(
+                expires_at=timezone.now() + timedelta(seconds=self.ttl_seconds)
+            )
+
+    def release(self, bucket: str, key: str, etag: str | None, sequencer: str | None):
+        """
+        Forgets a claimed event whose dispatch failed, so its redelivery is not dropped.
+        """
+        etag, sequencer = _normalize(etag, sequencer)
+
+        with self._lock:
+            previous = self._latest.get((bucket, key))
+            if previous and previous[:2] == (sequencer, etag):
+                del self._latest[(bucket, key)]
+
+        if self.use_database:
+            S3ObjectEvent.objects.filter(bucket=bucket, object_key=key, sequencer=sequencer, etag=etag).delete()
+
+    def prune(self):
+        """
+        Evicts expired entries from the cache and the shared table.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for cache_key in [k for k, (_, _, expires_at) in self._latest.items() if expires_at <= now]:
+                del self._latest[cache_key]
+
+        if self.use_database:
+            S3ObjectEvent.objects.filter(expires_at__lt=timezone.now()).delete()
+
+    def _claim_in_database(self, bucket: str, key: str, sequencer: str, etag: str) -> bool:
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                CLAIM_SQL, [bucket, key, sequencer, etag, now + timedelta(seconds=self.pending_seconds), now]
+            )
+            return cursor.fetchone() is not None
+
+
+def _normalize(etag: str | None, sequencer: str | None) -> tuple[str, str]:
+    return etag or "", sequencer.rjust(SEQUENCER_WIDTH, "0") if sequencer else ""
+
+
+def _supersedes(previous: tuple[str, str, float], sequencer: str, etag: str) -> bool:
+    previous_sequencer, previous_etag, _ = previous
+    if sequencer:
+        return sequencer > previous_sequencer
+    return etag != previous_etag
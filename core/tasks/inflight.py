@@ -0,0 +1,82 @@
+import threading
+import time
+from typing import Any
+
+
+class InFlightRegistry:
+    """
+    Thread-safe registry of SQS messages received by the consumer but not yet acknowledged.
+
+    Keyed on MessageId so a redelivery of a message that is still being handled (visibility
+    expired, or a concurrent poller received it) is detected instead of dispatched twice.
+    SQS only honours the most recent receipt handle, so the newest one is always kept.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._messages: dict[str, dict[str, Any]] = {}
+        self.last_lag_seconds = 0.0
+        self.received = 0
+        self.acknowledged = 0
+        self.redelivered = 0
+
+    def track(self, msg: dict[str, Any]) -> bool:
+        """
+        Registers a received message. Returns False if it is already in flight.
+        """
+        now = time.time()
+
+        with self._lock:
+            self.received += 1
+            entry = self._messages.get(msg["MessageId"])
+            if entry:
+                entry["receipt_handle"] = msg["ReceiptHandle"]
+                self.redelivered += 1
+                return False
+
+            # SentTimestamp (epoch millis) is when S3 enqueued the event
+            sent_timestamp = msg.get("Attributes", {}).get("SentTimestamp")
+            sent_at = int(sent_timestamp) / 1000 if sent_timestamp else now
+
+            self._messages[msg["MessageId"]] = {"receipt_handle": msg["ReceiptHandle"], "received_at": now}
+            self.last_lag_seconds = max(now - sent_at, 0.0)
+            return True
+
+    def receipt_handle(self, message_id: str) -> str:
+        with self._lock:
+            return self._messages[message_id]["receipt_handle"]
+
+    def receipt_handles(self) -> list[str]:
+        """
+        Snapshot of the receipt handles of every in-flight message.
+        """
+        with self._lock:
+            return [entry["receipt_handle"] for entry in self._messages.values()]
+
+    def release(self, message_ids: list[str], acknowledged: bool):
+        """
+        Stops tracking messages, either because they were deleted or handed back to SQS.
+        """
+        with self._lock:
+            for message_id in message_ids:
+                self._messages.pop(message_id, None)
+            if acknowledged:
+                self.acknowledged += len(message_ids)
+
+    def metrics(self) -> dict[str, Any]:
+        """
+        In-flight count, age of the oldest in-flight message, and the lag between
+        enqueue and receipt of the most recently received message.
+        """
+        now = time.time()
+
+        with self._lock:
+            oldest = min((entry["received_at"] for entry in self._messages.values()), default=now)
+            return {
+                "in_flight": len(self._messages),
+                "oldest_age_seconds": round(now - oldest, 3),
+                "lag_seconds": round(self.last_lag_seconds, 3),
+                "received": self.received,
+                "acknowledged": self.acknowledged,
+                "redelivered": self.redelivered,
+            }
@@ -0,0 +1,50 @@
+import logging
+from typing import Any
+
+from celery import shared_task
+from django.conf import settings
+
+from core.services.parquet_export_service import export_parquet
+from core.services.purge_service import purge_processed_raw_data
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="purge_raw_data_task")
+def purge_raw_data_task(max_chunks: int | None = None) -> dict[str, Any]:
+    """
+    Background purge of processed staging rows, configured via RAW_DATA_PURGE_* settings.
+    Like the purge_raw_data command, refuses to delete unarchived rows unless explicitly allowed.
+    """
+    if not settings.RAW_DATA_PURGE_ARCHIVE_TO and not settings.RAW_DATA_PURGE_NO_ARCHIVE:
+        logger.warning(
+            "RawData purge skipped: set RAW_DATA_PURGE_ARCHIVE_TO, "
+            "or RAW_DATA_PURGE_NO_ARCHIVE=True to delete unarchived"
+        )
+        return {}
+
+    logger.info("Starting RawData purge task")
+
+    return purge_processed_raw_data(
+        chunk_size=settings.RAW_DATA_PURGE_CHUNK_SIZE,
+        archive_to=settings.RAW_DATA_PURGE_ARCHIVE_TO,
+        sleep_seconds=settings.RAW_DATA_PURGE_SLEEP_SECONDS,
+        max_chunks=max_chunks,
+    )
+
+
+@shared_task(name="export_parquet_task")
+def export_parquet_task() -> dict[str, Any]:
+    """
+    Incremental Parquet export of every PARQUET_EXPORT_TYPES table to PARQUET_EXPORT_DESTINATION.
+    Meant to be scheduled; each run only rewrites the days changed since the previous one.
+    """
+    destination = settings.PARQUET_EXPORT_DESTINATION
+    if not destination:
+        logger.info("PARQUET_EXPORT_DESTINATION is not set; skipping Parquet export")
+        return {}
+
+    return {
+        content_type: export_parquet(content_type, destination, settle_seconds=settings.PARQUET_EXPORT_SETTLE_SECONDS)
+        for content_type in settings.PARQUET_EXPORT_TYPES
+    }
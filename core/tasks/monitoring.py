@@ -0,0 +1,48 @@
+import logging
+import time
+
+from celery.signals import before_task_publish, task_prerun, worker_ready
+from django.conf import settings
+from prometheus_client import start_http_server
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+# Custom message headers become attributes of the task request on the worker
+PUBLISHED_AT_HEADER = "published_at"
+
+
+@before_task_publish.connect
+def stamp_published_at(headers=None, **kwargs):
+    """
+    Stamps every published task with its publish time.
+    """
+    if headers is not None:
+        headers[PUBLISHED_AT_HEADER] = time.time()
+
+
+@task_prerun.connect
+def observe_queue_wait(task=None, **kwargs):
+    """
+    Records how long a task waited in the broker. Tasks with an ETA or countdown (including
+    retries) waited on purpose and are skipped, as are eager tasks, which were never published.
+    """
+    request = task.request
+    published_at = getattr(request, PUBLISHED_AT_HEADER, None)
+    if published_at is None or request.eta:
+        return
+    metrics.TASK_QUEUE_WAIT_SECONDS.labels(task.name).observe(max(time.time() - published_at, 0))
+
+
+@worker_ready.connect
+def start_metrics_exporter(**kwargs):
+    """
+    Serves /metrics from the worker's main process on METRICS_WORKER_PORT. With
+    PROMETHEUS_MULTIPROC_DIR set, this includes the samples of every pool process.
+    """
+    port = settings.METRICS_WORKER_PORT
+    if not port:
+        return
+    start_http_server(port, registry=metrics.get_registry())
+    logger.info(f"Serving worker metrics on port {port}")
@@ -0,0 +1,24 @@
+from django.conf import settings
+
+
+def queue_for_size(size: int | None) -> str:
+    """
+    Returns the ingestion lane (Celery queue) for an object of the given size in bytes.
+    Lanes are (max_size, queue) pairs in ascending order; a max_size of None matches everything.
+    Objects of unknown size go to the default queue.
+    """
+    if size is None:
+        return settings.CELERY_TASK_DEFAULT_QUEUE
+
+    for max_size, queue in settings.INGESTION_QUEUE_LANES:
+        if max_size is None or size <= max_size:
+            return queue
+
+    return settings.CELERY_TASK_DEFAULT_QUEUE
+
+
+def lane_queues() -> list[str]:
+    """
+    Returns every ingestion lane queue name.
+    """
+    return [queue for _, queue in settings.INGESTION_QUEUE_LANES]
@@ -1,25 +1,40 @@
+import json
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import batched
 from typing import Any
 
-import boto3
 from celery import shared_task
 from django.conf import settings
 from django.core.files.base import ContentFile
 
+from core import metrics, profiling
+from core.aws import get_client
 from core.models import Artifact
+from core.services.processing_service import process_artifact
 from core.services.raw_ingestion_service import ingest_file_to_raw
 from core.strategies.factory import StrategyFactory
 from core.tasks.artifact_processing import process_artifact_task
+from core.tasks.routing import queue_for_size
 
 logger = logging.getLogger(__name__)
 
 
 @shared_task(name="process_s3_file", bind=True, max_retries=3)
-def process_s3_file(self: Any, bucket_name: str, object_key: str) -> dict[str, Any]:
+def process_s3_file(
+    self: Any, bucket_name: str, object_key: str, profile: bool | None = None, lane: str | None = None
+) -> dict[str, Any]:
     """
     Step 1: Downloads a CSV file from S3 and ingests it into RawData.
-    On success, triggers process_artifact_task.
+    Triggers process_artifact_task on lane, the queue the consumer routed this task to: on success,
+    or, with STREAMING_HANDOFF, as soon as the artifact exists so processing overlaps ingestion.
+    profile overrides PIPELINE_PROFILING for this task (see core.profiling).
     """
+    with profiling.profile(f"s3://{bucket_name}/{object_key}", enabled=profile):
+        return _process_s3_file(self, bucket_name, object_key, lane)
+
+
+def _process_s3_file(task: Any, bucket_name: str, object_key: str, lane: str | None) -> dict[str, Any]:
     try:
         content_type = StrategyFactory.get_content_type(object_key)
     except ValueError as e:
@@ -28,33 +43,140 @@ def process_s3_file(self: Any, bucket_name: str, object_key: str) -> dict[str, A
 
     logger.info(f"Processing file from S3: bucket={bucket_name}, key={object_key}, content_type={content_type}")
 
-    s3_client = boto3.client(
-        "s3",
-        endpoint_url=settings.AWS_ENDPOINT_URL,
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        region_name=settings.AWS_DEFAULT_REGION,
-    )
+    s3_client = get_client("s3")
 
     try:
-        response = s3_client.get_object(Bucket=bucket_name, Key=object_key)
-        file_content = response["Body"].read()  # bytes
+        with profiling.stage("s3_download"):
+            file_content = _download(s3_client, bucket_name, object_key)
 
         # Create a Django ContentFile
         file_obj = ContentFile(file_content, name=object_key)
 
+        # Artifact processing stays on the lane the consumer picked (and throttles) from the event size;
+        # only tasks published without one fall back to the downloaded size
+        queue = lane or queue_for_size(len(file_content))
+
+        def handoff(artifact: Artifact):
+            process_artifact_task.apply_async(args=[artifact.id], kwargs={"follow_ingestion": True}, queue=queue)
+
         # 1. Ingest to Raw
-        artifact = ingest_file_to_raw(file_obj, object_key, content_type)
+        streaming = settings.STREAMING_HANDOFF
+        artifact = ingest_file_to_raw(file_obj, object_key, content_type, handoff=handoff if streaming else None)
 
         if artifact.status == Artifact.FAILED:
             return {"success": 0, "failed": 1, "error": "Raw ingestion failed"}
 
         # 2. Trigger Artifact Processing
-        process_artifact_task.delay(artifact.id)
+        if not streaming:
+            process_artifact_task.apply_async(args=[artifact.id], queue=queue)
 
         return {"success": 1, "failed": 0, "artifact_id": artifact.id}
 
     except Exception as e:
         logger.error(f"Error processing file {object_key}: {str(e)}")
         # Retry logic
-        raise self.retry(exc=e, countdown=60) from e
+        raise task.retry(exc=e, countdown=60) from e
+
+
+@shared_task(name="process_s3_batch", bind=True, max_retries=3)
+def process_s3_batch(
+    self: Any,
+    objects: list[list[str]] | None = None,
+    manifest: list[str] | None = None,
+    profile: bool | None = None,
+    lane: str | None = None,
+) -> dict[str, Any]:
+    """
+    Steps 1 and 2 for many small S3 objects in one task.
+    Takes (bucket, key) pairs and/or the (bucket, key) of a JSON manifest listing them. Objects are
+    downloaded concurrently over the shared S3 client, each ingested as its own Artifact and
+    processed back-to-back on this worker, amortizing task overhead across the batch.
+    Only objects whose download failed are retried. Artifacts handed to their own task stay on lane.
+    """
+    with profiling.profile(f"s3 batch {self.request.id}", enabled=profile):
+        return _process_s3_batch(self, objects, manifest, lane)
+
+
+def _process_s3_batch(
+    task: Any, objects: list[list[str]] | None, manifest: list[str] | None, lane: str | None
+) -> dict[str, Any]:
+    objects = [tuple(obj) for obj in objects or []]
+    if manifest:
+        objects.extend(_read_manifest(*manifest))
+
+    logger.info(f"Processing batch of {len(objects)} S3 objects")
+
+    result = {"success": 0, "failed": 0, "skipped": 0, "artifact_ids": []}
+    retry_objects = []
+    supported = []
+    for bucket_name, object_key in objects:
+        try:
+            supported.append((bucket_name, object_key, StrategyFactory.get_content_type(object_key)))
+        except ValueError as e:
+            logger.error(f"Skipping processing: {str(e)}")
+            result["skipped"] += 1
+
+    s3_client = get_client("s3")
+    workers = settings.S3_BATCH_DOWNLOAD_WORKERS
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Bounded windows keep at most a few downloads per worker in memory
+        for window in batched(supported, workers * 4):
+            futures = {
+                executor.submit(_download, s3_client, bucket_name, object_key): (bucket_name, object_key, content_type)
+                for bucket_name, object_key, content_type in window
+            }
+            for future in as_completed(futures):
+                bucket_name, object_key, content_type = futures[future]
+                try:
+                    file_content = future.result()
+                except Exception as e:
+                    logger.error(f"Error downloading file {object_key}: {str(e)}")
+                    retry_objects.append([bucket_name, object_key])
+                    continue
+
+                _ingest_and_process(file_content, object_key, content_type, result, lane)
+
+    if retry_objects:
+        logger.warning(f"Retrying {len(retry_objects)} of {len(objects)} objects in batch")
+        raise task.retry(kwargs={"objects": retry_objects, "lane": lane}, countdown=60)
+
+    return result
+
+
+def _download(s3_client: Any, bucket_name: str, object_key: str) -> bytes:
+    with metrics.S3_DOWNLOAD_SECONDS.time():
+        content = s3_client.get_object(Bucket=bucket_name, Key=object_key)["Body"].read()
+    metrics.S3_DOWNLOAD_BYTES.inc(len(content))
+    return content
+
+
+def _read_manifest(bucket_name: str, manifest_key: str) -> list[tuple[str, str]]:
+    """
+    Reads a JSON manifest: a list of object keys in the manifest's bucket or {"bucket", "key"} objects.
+    """
+    entries = json.loads(_download(get_client("s3"), bucket_name, manifest_key))
+    return [
+        (bucket_name, entry) if isinstance(entry, str) else (entry.get("bucket", bucket_name), entry["key"])
+        for entry in entries
+    ]
+
+
+def _ingest_and_process(
+    file_content: bytes, object_key: str, content_type: str, result: dict[str, Any], lane: str | None
+):
+    artifact = ingest_file_to_raw(ContentFile(file_content, name=object_key), object_key, content_type)
+
+    if artifact.status == Artifact.FAILED:
+        result["failed"] += 1
+        return
+
+    result["success"] += 1
+    result["artifact_ids"].append(artifact.id)
+
+    try:
+        process_artifact(artifact.id)
+    except Exception as e:
+        # Hand the artifact to its own task so it gets the usual retries
+        logger.error(f"Error processing artifact {artifact.id} in batch: {str(e)}")
+        process_artifact_task.apply_async(args=[artifact.id], queue=lane or queue_for_size(len(file_content)))
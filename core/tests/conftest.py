@@ -24,7 +24,7 @@ def get_test_csv():
 @pytest.fixture
 def mock_s3():
     """Fixture to handle the entire S3 client lifecycle and mocking."""
-    with patch("core.tasks.s3_processing.boto3.client") as mock_client:
+    with patch("core.tasks.s3_processing.get_client") as mock_client:
         mock_instance = MagicMock()
         mock_client.return_value = mock_instance
         yield mock_instance
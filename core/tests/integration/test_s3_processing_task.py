@@ -2,12 +2,14 @@
 Integration tests for the s3_processing_task Celery task.
 """
 
-from unittest.mock import patch
+import io
+import json
+from unittest.mock import MagicMock, patch
 
 import pytest
 
-from core.models import Artifact
-from core.tasks import process_s3_file
+from core.models import Artifact, AuditRecord, RawData
+from core.tasks import process_s3_batch, process_s3_file
 
 
 @pytest.mark.django_db
@@ -18,7 +20,7 @@ def test_audit_s3_processing_success(set_s3_content):
     mock_instance = set_s3_content("bucket", "audit/test.csv", csv_content)
 
     with (
-        patch("core.tasks.s3_processing.boto3.client", return_value=mock_instance),
+        patch("core.tasks.s3_processing.get_client", return_value=mock_instance),
         patch("core.tasks.s3_processing.process_artifact_task") as mock_process_task,
     ):
         # Execute
@@ -31,8 +33,10 @@ def test_audit_s3_processing_success(set_s3_content):
         # Verify Artifact created
         assert Artifact.objects.filter(file="audit/test.csv").exists()
 
-        # Verify next task triggered
-        mock_process_task.delay.assert_called_once_with(result["artifact_id"])
+        # Verify next task triggered on the small-file lane
+        mock_process_task.apply_async.assert_called_once_with(
+            args=[result["artifact_id"]], queue="healthcare-ingestion-queue"
+        )
 
         # NOTE: We no longer check AuditRecord here as that is done async in step 2.
         # See test_raw_ingestion.py for step 2 verification.
@@ -46,7 +50,7 @@ def test_audit_s3_processing_failure(set_s3_content):
     mock_instance = set_s3_content("bucket", "audit/test.csv", csv_content)
 
     with (
-        patch("core.tasks.s3_processing.boto3.client", return_value=mock_instance),
+        patch("core.tasks.s3_processing.get_client", return_value=mock_instance),
         patch("core.tasks.s3_processing.process_artifact_task") as mock_process_task,
     ):
         # Execute
@@ -57,7 +61,7 @@ def test_audit_s3_processing_failure(set_s3_content):
     assert result["failed"] == 1
     # raw ingestion marks artifact as FAILED if empty headers
     assert Artifact.objects.filter(status="FAILED").exists()
-    mock_process_task.delay.assert_not_called()
+    mock_process_task.apply_async.assert_not_called()
 
 
 def test_process_s3_file_unknown_prefix():
@@ -82,3 +86,141 @@ def test_process_s3_file_exception_retry(mock_s3, monkeypatch):
         with pytest.raises(Exception, match="Retry Triggered"):
             process_s3_file("bucket", "audit/test.csv")
         mock_retry.assert_called_once()
+
+
+@pytest.mark.django_db
+def test_s3_processing_large_file_lane(set_s3_content, settings):
+    """Test that processing of a large file published without a lane falls back to the large-file lane."""
+    settings.INGESTION_QUEUE_LANES = [(10, "small-queue"), (None, "large-queue")]
+    csv_content = "provider_npi,billing_amount,service_date,status\n1234567890,100.00,2023-01-01,submitted"
+    mock_instance = set_s3_content("bucket", "audit/big.csv", csv_content)
+
+    with (
+        patch("core.tasks.s3_processing.get_client", return_value=mock_instance),
+        patch("core.tasks.s3_processing.process_artifact_task") as mock_process_task,
+    ):
+        result = process_s3_file("bucket", "audit/big.csv")
+
+    mock_process_task.apply_async.assert_called_once_with(args=[result["artifact_id"]], queue="large-queue")
+
+
+@pytest.mark.django_db
+def test_s3_processing_keeps_the_dispatch_lane(set_s3_content, settings):
+    """Test that processing stays on the consumer's lane even if the download size points at another one."""
+    settings.INGESTION_QUEUE_LANES = [(10, "small-queue"), (None, "large-queue")]
+    csv_content = "provider_npi,billing_amount,service_date,status\n1234567890,100.00,2023-01-01,submitted"
+    mock_instance = set_s3_content("bucket", "audit/big.csv", csv_content)
+
+    with (
+        patch("core.tasks.s3_processing.get_client", return_value=mock_instance),
+        patch("core.tasks.s3_processing.process_artifact_task") as mock_process_task,
+    ):
+        result = process_s3_file("bucket", "audit/big.csv", lane="small-queue")
+
+    mock_process_task.apply_async.assert_called_once_with(args=[result["artifact_id"]], queue="small-queue")
+
+
+AUDIT_CSV = "provider_npi,billing_amount,service_date,status\n{npi},100.00,2023-01-01,submitted"
+
+
+def _s3_objects(contents):
+    """Mock S3 client serving get_object from a {key: content} dict; exceptions are raised."""
+    mock_instance = MagicMock()
+
+    def get_object(Bucket, Key):  # noqa: N803
+        content = contents[Key]
+        if isinstance(content, Exception):
+            raise content
+        return {"Body": io.BytesIO(content.encode("utf-8"))}
+
+    mock_instance.get_object.side_effect = get_object
+    return mock_instance
+
+
+@pytest.mark.django_db
+def test_process_s3_batch_ingests_and_processes_each_object():
+    contents = {f"audit/{i}.csv": AUDIT_CSV.format(npi=f"123456789{i}") for i in range(3)}
+    contents["unknown/skip.csv"] = ""
+
+    with patch("core.tasks.s3_processing.get_client", return_value=_s3_objects(contents)):
+        result = process_s3_batch(objects=[["bucket", key] for key in contents])
+
+    assert result["success"] == 3  # noqa: PLR2004
+    assert result["skipped"] == 1
+    assert Artifact.objects.filter(id__in=result["artifact_ids"], status=Artifact.COMPLETED).count() == 3  # noqa: PLR2004
+    assert AuditRecord.objects.count() == 3  # noqa: PLR2004
+
+
+@pytest.mark.django_db
+def test_process_s3_batch_reads_manifest():
+    """Test that manifest entries may be bare keys (manifest bucket) or bucket/key objects."""
+    contents = {
+        "drops/batch.manifest.json": json.dumps(["audit/a.csv", {"bucket": "other", "key": "audit/b.csv"}]),
+        "audit/a.csv": AUDIT_CSV.format(npi="1111111111"),
+        "audit/b.csv": "",
+    }
+    mock_instance = _s3_objects(contents)
+
+    with patch("core.tasks.s3_processing.get_client", return_value=mock_instance):
+        result = process_s3_batch(manifest=["bucket", "drops/batch.manifest.json"])
+
+    assert result["success"] == 1
+    assert result["failed"] == 1
+    mock_instance.get_object.assert_any_call(Bucket="other", Key="audit/b.csv")
+
+
+@pytest.mark.django_db
+def test_process_s3_batch_retries_only_failed_downloads():
+    contents = {"audit/ok.csv": AUDIT_CSV.format(npi="1111111111"), "audit/down.csv": Exception("S3 Down")}
+
+    with (
+        patch("core.tasks.s3_processing.get_client", return_value=_s3_objects(contents)),
+        patch("core.tasks.s3_processing.process_s3_batch.retry") as mock_retry,
+    ):
+        mock_retry.side_effect = Exception("Retry Triggered")
+        with pytest.raises(Exception, match="Retry Triggered"):
+            process_s3_batch(objects=[["bucket", key] for key in contents], lane="small-queue")
+
+    mock_retry.assert_called_once_with(
+        kwargs={"objects": [["bucket", "audit/down.csv"]], "lane": "small-queue"}, countdown=60
+    )
+    assert Artifact.objects.filter(file="audit/ok.csv").count() == 1
+
+
+@pytest.mark.django_db
+def test_process_s3_batch_hands_off_artifacts_that_fail_processing():
+    contents = {"audit/a.csv": AUDIT_CSV.format(npi="1111111111")}
+
+    with (
+        patch("core.tasks.s3_processing.get_client", return_value=_s3_objects(contents)),
+        patch("core.tasks.s3_processing.process_artifact", side_effect=Exception("DB Down")),
+        patch("core.tasks.s3_processing.process_artifact_task") as mock_process_task,
+    ):
+        result = process_s3_batch(objects=[["bucket", "audit/a.csv"]])
+
+    mock_process_task.apply_async.assert_called_once_with(
+        args=[result["artifact_ids"][0]], queue="healthcare-ingestion-queue"
+    )
+
+
+@pytest.mark.django_db
+def test_s3_processing_streaming_handoff(set_s3_content, settings):
+    """Test that STREAMING_HANDOFF dispatches processing before ingestion writes any row."""
+    settings.STREAMING_HANDOFF = True
+    mock_instance = set_s3_content("bucket", "audit/stream.csv", AUDIT_CSV.format(npi="1234567890"))
+    raw_rows_at_dispatch = []
+
+    with (
+        patch("core.tasks.s3_processing.get_client", return_value=mock_instance),
+        patch("core.tasks.s3_processing.process_artifact_task") as mock_process_task,
+    ):
+        mock_process_task.apply_async.side_effect = lambda **kwargs: raw_rows_at_dispatch.append(
+            RawData.objects.filter(artifact_id=kwargs["args"][0]).count()
+        )
+        result = process_s3_file("bucket", "audit/stream.csv")
+
+    mock_process_task.apply_async.assert_called_once_with(
+        args=[result["artifact_id"]], kwargs={"follow_ingestion": True}, queue="healthcare-ingestion-queue"
+    )
+    assert raw_rows_at_dispatch == [0]
+    assert Artifact.objects.get(id=result["artifact_id"]).status == Artifact.PROCESSING
@@ -0,0 +1,73 @@
+"""
+Unit tests for the shared boto3 client provider.
+"""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from core.aws import get_client, reset_clients
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients():
+    reset_clients()
+    yield
+    reset_clients()
+
+
+def test_client_is_created_once_per_service(settings):
+    settings.AWS_MAX_POOL_CONNECTIONS = 40
+    settings.AWS_MAX_RETRIES = 7
+
+    with patch("core.aws.clients.boto3.client", side_effect=lambda service, **kwargs: object()) as mock_boto:
+        s3 = get_client("s3")
+        assert get_client("s3") is s3
+        assert get_client("sqs") is not s3
+
+    assert mock_boto.call_count == 2  # noqa: PLR2004
+    config = mock_boto.call_args_list[0].kwargs["config"]
+    assert config.max_pool_connections == 40  # noqa: PLR2004
+    assert config.retries == {"max_attempts": 7, "mode": "standard"}
+    assert config.tcp_keepalive is True
+    assert mock_boto.call_args_list[0].kwargs["endpoint_url"] == settings.AWS_ENDPOINT_URL
+
+
+def test_concurrent_first_use_creates_single_client():
+    """Test that threads racing on first use share one client."""
+    barrier = threading.Barrier(8)
+    results = []
+
+    def fetch():
+        barrier.wait()
+        results.append(get_client("s3"))
+
+    with patch("core.aws.clients.boto3.client", side_effect=lambda service, **kwargs: object()) as mock_boto:
+        threads = [threading.Thread(target=fetch) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    mock_boto.assert_called_once()
+    assert len({id(client) for client in results}) == 1
+
+
+def test_reset_clients_forces_new_client():
+    with patch("core.aws.clients.boto3.client", side_effect=lambda service, **kwargs: object()):
+        first = get_client("s3")
+        reset_clients()
+        assert get_client("s3") is not first
+
+
+def test_memory_backend_shares_in_process_clients(settings):
+    settings.AWS_CLIENT_BACKEND = "memory"
+
+    with patch("core.aws.clients.boto3.client") as mock_boto:
+        s3 = get_client("s3")
+        s3.put_object(Bucket="bucket", Key="key", Body=b"data")
+        assert get_client("s3").get_object(Bucket="bucket", Key="key")["Body"].read() == b"data"
+        assert type(get_client("sqs")).__name__ == "MemorySQS"
+
+    mock_boto.assert_not_called()
@@ -0,0 +1,153 @@
+"""
+Unit tests for the in-memory S3/SQS stand-ins used by load tests.
+"""
+
+import io
+import threading
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+from core.aws.memory import MemoryS3, MemorySQS
+
+QUEUE_URL = "http://localhost:4566/000000000000/test-queue"
+
+
+@pytest.fixture
+def s3():
+    client = MemoryS3()
+    client.put_object(Bucket="bucket", Key="data.csv", Body=b"0123456789")
+    return client
+
+
+@pytest.fixture
+def sqs():
+    return MemorySQS()
+
+
+def test_get_object_returns_body_and_etag(s3):
+    response = s3.get_object(Bucket="bucket", Key="data.csv")
+
+    assert response["Body"].read() == b"0123456789"
+    assert response["ContentLength"] == 10  # noqa: PLR2004
+    assert response["ETag"] == '"781e5e245d69b566979b86e28d23f2c7"'
+
+
+def test_put_object_accepts_strings_and_file_objects(s3):
+    s3.put_object(Bucket="bucket", Key="text.csv", Body="a,b")
+    s3.put_object(Bucket="bucket", Key="stream.csv", Body=io.BytesIO(b"c,d"))
+
+    assert s3.get_object(Bucket="bucket", Key="text.csv")["Body"].read() == b"a,b"
+    assert s3.get_object(Bucket="bucket", Key="stream.csv")["Body"].read() == b"c,d"
+
+
+@pytest.mark.parametrize(
+    ("header", "expected", "content_range"),
+    [
+        ("bytes=2-4", b"234", "bytes 2-4/10"),
+        ("bytes=7-", b"789", "bytes 7-9/10"),
+        ("bytes=-2", b"89", "bytes 8-9/10"),
+        ("bytes=8-100", b"89", "bytes 8-9/10"),
+    ],
+)
+def test_get_object_ranges(s3, header, expected, content_range):
+    response = s3.get_object(Bucket="bucket", Key="data.csv", Range=header)
+
+    assert response["Body"].read() == expected
+    assert response["ContentRange"] == content_range
+    assert response["ContentLength"] == len(expected)
+
+
+@pytest.mark.parametrize("header", ["bytes=10-", "bytes=5-2", "items=0-1", "bytes=0-1,3-4", "bytes=-"])
+def test_get_object_invalid_ranges(s3, header):
+    with pytest.raises(ClientError) as exc_info:
+        s3.get_object(Bucket="bucket", Key="data.csv", Range=header)
+
+    assert exc_info.value.response["Error"]["Code"] == "InvalidRange"
+
+
+def test_get_missing_object_raises_no_such_key(s3):
+    with pytest.raises(ClientError) as exc_info:
+        s3.get_object(Bucket="bucket", Key="missing.csv")
+
+    assert exc_info.value.response["Error"]["Code"] == "NoSuchKey"
+
+
+def test_receive_hides_messages_until_visibility_timeout(sqs):
+    sqs.send_message(QueueUrl=QUEUE_URL, MessageBody="hello")
+
+    first = sqs.receive_message(QueueUrl=QUEUE_URL, VisibilityTimeout=0.05)["Messages"]
+    assert first[0]["Body"] == "hello"
+    assert "SentTimestamp" in first[0]["Attributes"]
+    assert sqs.receive_message(QueueUrl=QUEUE_URL) == {}
+
+    time.sleep(0.06)
+    second = sqs.receive_message(QueueUrl=QUEUE_URL)["Messages"]
+
+    assert second[0]["MessageId"] == first[0]["MessageId"]
+    assert second[0]["ReceiptHandle"] != first[0]["ReceiptHandle"]
+
+
+def test_stale_receipt_handle_does_not_delete_redelivered_message(sqs):
+    sqs.send_message(QueueUrl=QUEUE_URL, MessageBody="hello")
+    stale = sqs.receive_message(QueueUrl=QUEUE_URL, VisibilityTimeout=0)["Messages"][0]["ReceiptHandle"]
+    current = sqs.receive_message(QueueUrl=QUEUE_URL)["Messages"][0]["ReceiptHandle"]
+
+    sqs.delete_message(QueueUrl=QUEUE_URL, ReceiptHandle=stale)
+    attributes = sqs.get_queue_attributes(QueueUrl=QUEUE_URL, AttributeNames=["All"])["Attributes"]
+    assert attributes["ApproximateNumberOfMessagesNotVisible"] == "1"
+
+    sqs.delete_message(QueueUrl=QUEUE_URL, ReceiptHandle=current)
+    attributes = sqs.get_queue_attributes(QueueUrl=QUEUE_URL, AttributeNames=["All"])["Attributes"]
+    assert attributes == {"ApproximateNumberOfMessages": "0", "ApproximateNumberOfMessagesNotVisible": "0"}
+
+
+def test_receive_caps_batch_and_delete_batch(sqs):
+    for i in range(12):
+        sqs.send_message(QueueUrl=QUEUE_URL, MessageBody=str(i))
+
+    messages = sqs.receive_message(QueueUrl=QUEUE_URL, MaxNumberOfMessages=10)["Messages"]
+    assert len(messages) == 10  # noqa: PLR2004
+
+    response = sqs.delete_message_batch(
+        QueueUrl=QUEUE_URL,
+        Entries=[{"Id": str(i), "ReceiptHandle": msg["ReceiptHandle"]} for i, msg in enumerate(messages)],
+    )
+
+    assert len(response["Successful"]) == 10  # noqa: PLR2004
+    attributes = sqs.get_queue_attributes(QueueUrl=QUEUE_URL, AttributeNames=["All"])["Attributes"]
+    assert attributes["ApproximateNumberOfMessages"] == "2"
+
+
+def test_change_message_visibility_batch(sqs):
+    sqs.send_message(QueueUrl=QUEUE_URL, MessageBody="hello")
+    handle = sqs.receive_message(QueueUrl=QUEUE_URL)["Messages"][0]["ReceiptHandle"]
+
+    response = sqs.change_message_visibility_batch(
+        QueueUrl=QUEUE_URL,
+        Entries=[
+            {"Id": "0", "ReceiptHandle": handle, "VisibilityTimeout": 0},
+            {"Id": "1", "ReceiptHandle": "unknown", "VisibilityTimeout": 0},
+        ],
+    )
+
+    assert response["Successful"] == [{"Id": "0"}]
+    assert response["Failed"][0]["Code"] == "ReceiptHandleIsInvalid"
+    assert sqs.receive_message(QueueUrl=QUEUE_URL)["Messages"][0]["Body"] == "hello"
+
+
+def test_long_poll_wakes_up_on_send(sqs):
+    """Test that a long poll returns as soon as a message arrives instead of waiting out WaitTimeSeconds."""
+    sender = threading.Timer(0.05, sqs.send_message, kwargs={"QueueUrl": QUEUE_URL, "MessageBody": "late"})
+    sender.start()
+
+    started_at = time.monotonic()
+    response = sqs.receive_message(QueueUrl=QUEUE_URL, WaitTimeSeconds=5)
+
+    assert response["Messages"][0]["Body"] == "late"
+    assert time.monotonic() - started_at < 1
+
+
+def test_long_poll_times_out_empty(sqs):
+    assert sqs.receive_message(QueueUrl=QUEUE_URL, WaitTimeSeconds=0.05) == {}
@@ -0,0 +1,74 @@
+"""
+Unit tests for the consumer's backpressure gate.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.tasks.backpressure import BackpressureGate
+
+
+@pytest.fixture(autouse=True)
+def watermarks(settings):
+    settings.S3_EVENT_BACKPRESSURE_HIGH_WATERMARK = 100
+    settings.S3_EVENT_BACKPRESSURE_LOW_WATERMARK = 50
+    settings.S3_EVENT_BACKPRESSURE_CHECK_INTERVAL = 0
+
+
+def _sqs_with_depths(*depths):
+    sqs = MagicMock()
+    sqs.get_queue_attributes.side_effect = [
+        {"Attributes": {"ApproximateNumberOfMessages": str(depth)}} for depth in depths
+    ]
+    return sqs
+
+
+def test_pauses_above_high_and_resumes_below_low_watermark():
+    """Test the hysteresis between the two watermarks."""
+    gate = BackpressureGate(_sqs_with_depths(99, 100, 75, 50), ["queue"])
+
+    assert gate.should_pause() is False
+    assert gate.should_pause() is True
+    assert gate.should_pause() is True  # still above the low watermark
+    assert gate.should_pause() is False
+    assert gate.depth == 50  # noqa: PLR2004
+
+
+def test_depth_is_summed_across_queues():
+    gate = BackpressureGate(_sqs_with_depths(60, 40), ["small", "large"])
+
+    assert gate.should_pause() is True
+    assert gate.depth == 100  # noqa: PLR2004
+
+
+def test_depth_is_cached_between_checks(settings):
+    settings.S3_EVENT_BACKPRESSURE_CHECK_INTERVAL = 60
+    sqs = _sqs_with_depths(10)
+    gate = BackpressureGate(sqs, ["queue"])
+
+    gate.should_pause()
+    gate.should_pause()
+
+    sqs.get_queue_attributes.assert_called_once_with(QueueUrl="queue", AttributeNames=["ApproximateNumberOfMessages"])
+
+
+def test_sqs_errors_keep_previous_decision():
+    sqs = _sqs_with_depths(150)
+    gate = BackpressureGate(sqs, ["queue"])
+    gate.should_pause()
+    sqs.get_queue_attributes.side_effect = Exception("SQS Down")
+
+    with patch("core.tasks.backpressure.logger") as mock_logger:
+        assert gate.should_pause() is True
+
+    mock_logger.error.assert_called_with("Backpressure depth check failed: SQS Down")
+
+
+def test_pool_saturation_pauses_polling():
+    gate = BackpressureGate(_sqs_with_depths(0, 0), ["queue"], pool_limit=2)
+
+    with patch("core.tasks.backpressure.worker_state.active_requests", {"a", "b"}):
+        assert gate.should_pause() is True
+    with patch("core.tasks.backpressure.worker_state.active_requests", {"a"}):
+        assert gate.should_pause() is False
@@ -0,0 +1,106 @@
+"""
+Unit tests for the benchmark harness and its synthetic data generators.
+"""
+
+import csv
+import io
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from core.benchmarks import GENERATORS, compare_to_baseline, generate_csv, generate_rows, run_benchmark
+from core.benchmarks.runner import STAGES
+from core.models import Artifact, RawData
+from core.strategies import get_strategy
+
+ROWS = 40
+
+
+@pytest.mark.parametrize("content_type", list(GENERATORS))
+def test_generators_are_seeded_and_valid(content_type):
+    """Test that a seed reproduces the file and that clean rows pass the strategy's schema."""
+    assert generate_csv(content_type, ROWS, seed=7) == generate_csv(content_type, ROWS, seed=7)
+    assert generate_csv(content_type, ROWS, seed=7) != generate_csv(content_type, ROWS, seed=8)
+
+    strategy = get_strategy(content_type)
+    for row in csv.DictReader(io.StringIO(generate_csv(content_type, ROWS).decode())):
+        strategy.transform(strategy.schema_class.model_validate(row))
+
+
+def test_generators_error_rate():
+    rows = list(generate_rows("pharmacy", 1000, error_rate=0.1, seed=1))
+    invalid = sum(row["service_date"] == "not-a-date" or row["total_amount_paid"] == "-1.00" for row in rows)
+    assert 50 < invalid < 150  # noqa: PLR2004
+
+
+def test_generators_unknown_type():
+    with pytest.raises(ValueError, match="No generator"):
+        next(generate_rows("unknown", 1))
+
+
+@pytest.mark.django_db
+def test_run_benchmark_measures_stages_and_rolls_back():
+    results = run_benchmark("audit", ROWS, error_rate=0.1, seed=3)
+
+    assert list(results) == list(STAGES)
+    assert all(result["rows_per_second"] > 0 and result["peak_rss_mb"] > 0 for result in results.values())
+    assert results["prepare_batch"]["queries"] == 0
+    assert results["process_artifact"]["queries"] > results["flush_batch"]["queries"] > 0
+    assert not Artifact.objects.exists()
+    assert not RawData.objects.exists()
+
+
+def _report(rows_per_second, queries):
+    return {"results": {"audit": {"flush_batch": {"rows_per_second": rows_per_second, "queries": queries}}}}
+
+
+def test_compare_to_baseline():
+    baseline = _report(1000, 5)
+
+    assert compare_to_baseline(_report(850, 5), baseline, tolerance=0.2) == []
+    assert compare_to_baseline(_report(700, 6), baseline, tolerance=0.2) == [
+        "audit.flush_batch: 700 rows/s (baseline 1000, -20% allowed)",
+        "audit.flush_batch: 6 queries (baseline 5)",
+    ]
+    assert compare_to_baseline(_report(1, 99), {"results": {}}) == []
+
+
+@pytest.mark.django_db
+def test_benchmark_command_writes_and_compares_baselines(tmp_path):
+    output = tmp_path / "baseline.json"
+
+    out = StringIO()
+    call_command("benchmark_pipeline", "--types", "pharmacy", "--rows", "20", "--output", str(output), stdout=out)
+
+    assert "pharmacy (20 rows)" in out.getvalue()
+    report = json.loads(output.read_text())
+    assert report["meta"]["rows"] == 20  # noqa: PLR2004
+    assert set(report["results"]["pharmacy"]) == set(STAGES)
+
+    # Throughput of 20-row runs is noise; only the (deterministic) query counts are compared here
+    out = StringIO()
+    call_command(
+        "benchmark_pipeline",
+        *("--types", "pharmacy", "--rows", "20", "--baseline", str(output), "--tolerance", "1"),
+        stdout=out,
+    )
+    assert "No regressions" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_benchmark_command_fails_on_regression(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(_report(10**9, 0)))
+
+    out = StringIO()
+    with pytest.raises(CommandError, match="regression"):
+        call_command(
+            "benchmark_pipeline",
+            *("--types", "audit", "--rows", "20", "--baseline", str(baseline), "--fail-on-regression", "--with-logs"),
+            stdout=out,
+        )
+
+    assert "Regression: audit.flush_batch" in out.getvalue()
@@ -2,12 +2,14 @@
 Unit tests for the 'ingest_csv_file' management command.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from io import StringIO
 from unittest.mock import MagicMock
 
 import pytest
 from django.core.management import call_command
 
+from core.management.commands.ingest_csv_file import expand_paths
 from core.models import Artifact
 
 
@@ -105,3 +107,102 @@ def test_ingest_csv_file_command_os_error(tmp_path, monkeypatch):
     out = StringIO()
     call_command("ingest_csv_file", str(csv_file), "--type", "audit", stdout=out)
     assert "Error opening/reading file: Permission Denied" in out.getvalue()
+
+
+def test_expand_paths_resolves_directories_and_globs(tmp_path):
+    (tmp_path / "2023").mkdir()
+    for name in ("2023/a.csv", "2023/b.csv", "2023/notes.txt", "c.csv"):
+        (tmp_path / name).write_text("x")
+
+    paths = expand_paths([str(tmp_path / "2023"), str(tmp_path / "*.csv"), str(tmp_path / "2023/a.csv"), "missing.csv"])
+
+    assert paths == [
+        str(tmp_path / "2023/a.csv"),
+        str(tmp_path / "2023/b.csv"),
+        str(tmp_path / "c.csv"),
+        "missing.csv",
+    ]
+
+
+@pytest.mark.django_db
+def test_ingest_csv_file_command_many_files_reports_aggregate(tmp_path):
+    for i in range(2):
+        (tmp_path / f"audit_{i}.csv").write_text(
+            f"provider_npi,billing_amount,service_date,status\n123456789{i},100.00,2025-01-01,active"
+        )
+
+    out = StringIO()
+    call_command("ingest_csv_file", str(tmp_path / "*.csv"), str(tmp_path / "gone.csv"), stdout=out)
+
+    output = out.getvalue()
+    assert f"{tmp_path / 'audit_0.csv'}: Ingestion complete. Success: 1, Failed: 0" in output
+    assert f"{tmp_path / 'gone.csv'}: File not found" in output
+    assert "Total: 3 files (1 with errors). Success: 2, Failed: 0" in output
+    assert Artifact.objects.count() == 2  # noqa: PLR2004
+
+
+class _InlineExecutor(ThreadPoolExecutor):
+    """Stands in for the spawn process pool, recording its configuration."""
+
+    def __init__(self, max_workers, mp_context, initializer):
+        super().__init__(max_workers=max_workers)
+        _InlineExecutor.config = {"max_workers": max_workers, "start_method": mp_context.get_start_method()}
+
+
+def test_ingest_csv_file_command_workers_use_process_pool(tmp_path, monkeypatch):
+    for i in range(3):
+        (tmp_path / f"{i}.csv").touch()
+
+    def fake_ingest_path(path, data_type):
+        return {"path": path, "success": 10, "failed": 1, "seconds": 0.5, "error": None}
+
+    monkeypatch.setattr("core.management.commands.ingest_csv_file.ProcessPoolExecutor", _InlineExecutor)
+    monkeypatch.setattr("core.management.commands.ingest_csv_file.ingest_path", fake_ingest_path)
+
+    out = StringIO()
+    call_command("ingest_csv_file", str(tmp_path), "--workers", "8", stdout=out)
+
+    assert _InlineExecutor.config == {"max_workers": 3, "start_method": "spawn"}
+    assert "(22 rows/s)" in out.getvalue()
+    assert "Total: 3 files (0 with errors). Success: 30, Failed: 3" in out.getvalue()
+
+
+def test_ingest_csv_file_command_no_matches(tmp_path):
+    out = StringIO()
+    call_command("ingest_csv_file", str(tmp_path / "*.csv"), stdout=out)
+    assert "No CSV files matched" in out.getvalue()
+
+
+def test_ingest_csv_file_command_dry_run(tmp_path):
+    """Test that a dry run reports validation results without database access (no django_db mark)."""
+    valid = tmp_path / "valid.csv"
+    valid.write_text("provider_npi,billing_amount,service_date,status\n1234567890,100.00,2025-01-01,active")
+    invalid = tmp_path / "invalid.csv"
+    invalid.write_text("provider_npi,billing_amount,service_date,status\n1234567890,lots,2025-01-01,active")
+
+    out = StringIO()
+    call_command("ingest_csv_file", str(valid), str(invalid), str(tmp_path / "gone.csv"), "--dry-run", stdout=out)
+
+    output = out.getvalue()
+    assert "Starting dry run of audit" in output
+    assert f"{valid}: Dry run complete. Valid: 1, Invalid: 0" in output
+    assert "peak memory" in output
+    assert "    billing_amount: decimal_parsing x1" in output
+    assert f"{tmp_path / 'gone.csv'}: File not found" in output
+    assert "Valid: 1, Invalid: 1" in output.splitlines()[-1]
+
+
+def test_ingest_csv_file_command_dry_run_errors(tmp_path, monkeypatch):
+    (tmp_path / "a.csv").touch()
+    (tmp_path / "b.csv").touch()
+    errors = iter([OSError("Permission Denied"), Exception("Boom")])
+
+    def mock_validate(*args, **kwargs):
+        raise next(errors)
+
+    monkeypatch.setattr("core.management.commands.ingest_csv_file.validate_csv_file", mock_validate)
+
+    out = StringIO()
+    call_command("ingest_csv_file", str(tmp_path), "--dry-run", stdout=out)
+    assert "a.csv: Error opening/reading file: Permission Denied" in out.getvalue()
+    assert "b.csv: Fatal error: Boom" in out.getvalue()
@@ -0,0 +1,33 @@
+"""
+Unit tests for the per-task database connection reset.
+"""
+
+from unittest.mock import MagicMock, patch
+
+from celery.signals import task_postrun, task_prerun
+
+from core.tasks.connections import reset_db_connections
+
+
+def _task(is_eager):
+    task = MagicMock()
+    task.request.is_eager = is_eager
+    return task
+
+
+def test_reset_closes_old_connections_around_worker_tasks():
+    task = _task(is_eager=False)
+
+    with patch("core.tasks.connections.close_old_connections") as mock_close:
+        task_prerun.send(sender=task, task=task, task_id="1")
+        task_postrun.send(sender=task, task=task, task_id="1")
+
+    assert mock_close.call_count == 2  # noqa: PLR2004
+
+
+def test_reset_skips_eager_tasks():
+    """Test that eager tasks keep the caller's connection (and its open transaction)."""
+    with patch("core.tasks.connections.close_old_connections") as mock_close:
+        reset_db_connections(task=_task(is_eager=True))
+
+    mock_close.assert_not_called()
@@ -3,10 +3,13 @@ Unit tests for the S3EventConsumer Celery bootstep.
 """
 
 import json
+import time
 from unittest.mock import ANY, MagicMock, patch
 
 import pytest
+from django.db import connection
 
+from core.models import S3ObjectEvent
 from core.tasks.consumers import S3EventConsumer
 
 
@@ -27,23 +30,31 @@ def test_consumer_init(consumer):
     assert consumer.requires == {"celery.worker.components:Pool"}
 
 
-@patch("core.tasks.consumers.boto3.client")
+@patch("core.tasks.consumers.get_client")
 @patch("core.tasks.consumers.threading.Thread")
-def test_consumer_start_stop(mock_thread, mock_boto, consumer):
+def test_consumer_start_stop(mock_thread, mock_get_client, consumer, settings):
     """Test start and stop lifecycle methods."""
-    worker = MagicMock()
+    settings.S3_EVENT_CONSUMER_THREADS = 3
     worker = MagicMock()
 
     # Test Start
     consumer.start(worker)
 
     assert consumer.enabled is True
-    mock_boto.assert_called_with(
-        "sqs", endpoint_url=ANY, aws_access_key_id=ANY, aws_secret_access_key=ANY, region_name=ANY
-    )
-    mock_thread.return_value.start.assert_called_once()
+    mock_get_client.assert_called_once_with("sqs")
+    assert consumer.sqs is mock_get_client.return_value
+    # Pollers plus the visibility heartbeat
+    assert mock_thread.call_count == settings.S3_EVENT_CONSUMER_THREADS + 1
+    assert mock_thread.return_value.start.call_count == settings.S3_EVENT_CONSUMER_THREADS + 1
     assert consumer.queue_url is not None
 
+    # One gate per lane, each on its own queue
+    gates = consumer.backpressure
+    assert list(gates) == ["healthcare-ingestion-queue", "healthcare-ingestion-large-queue"]
+    assert [gate.queue_urls for gate in gates.values()] == [
+        [f"{settings.AWS_ENDPOINT_URL}/000000000000/{queue}"] for queue in gates
+    ]
+
     # Test Stop
     consumer.stop(worker)
     assert consumer.enabled is False
@@ -61,7 +72,7 @@ def test_consumer_run_loop(mock_send_task, consumer):
 
     def side_effect(*args, **kwargs):
         consumer.enabled = False  # Stop loop after first call
-        return {"Messages": [{"Body": json.dumps(s3_event), "ReceiptHandle": "handle-123"}]}
+        return {"Messages": [{"MessageId": "m-1", "Body": json.dumps(s3_event), "ReceiptHandle": "handle-123"}]}
 
     consumer.sqs.receive_message.side_effect = side_effect
 
@@ -70,10 +81,13 @@ def test_consumer_run_loop(mock_send_task, consumer):
     # Verification
     mock_send_task.assert_called_once_with(
         "process_s3_file",
-        kwargs={"bucket_name": "test-bucket", "object_key": "test/key.csv"},
+        kwargs={"bucket_name": "test-bucket", "object_key": "test/key.csv", "lane": "healthcare-ingestion-queue"},
         queue="healthcare-ingestion-queue",
+        producer=ANY,
+    )
+    consumer.sqs.delete_message_batch.assert_called_once_with(
+        QueueUrl="test-queue-url", Entries=[{"Id": "0", "ReceiptHandle": "handle-123"}]
     )
-    consumer.sqs.delete_message.assert_called_once_with(QueueUrl="test-queue-url", ReceiptHandle="handle-123")
 
 
 def test_consumer_run_loop_handles_exception(consumer):
@@ -109,7 +123,7 @@ def test_consumer_message_processing_exception(mock_send_task, consumer):
 
         def side_effect(*args, **kwargs):
             consumer.enabled = False
-            return {"Messages": [{"Body": json.dumps(s3_event), "ReceiptHandle": "handle"}]}
+            return {"Messages": [{"MessageId": "m-1", "Body": json.dumps(s3_event), "ReceiptHandle": "handle"}]}
 
         consumer.sqs.receive_message.side_effect = side_effect
 
@@ -119,3 +133,351 @@ def test_consumer_message_processing_exception(mock_send_task, consumer):
         consumer.run()
 
         mock_logger.error.assert_called_with("S3EventConsumer message error: Processing Crash")
+
+        consumer.sqs.delete_message_batch.assert_not_called()
+
+
+@pytest.mark.django_db(transaction=True)
+@patch("core.tasks.consumers.current_app.send_task")
+def test_consumer_poller_recovers_from_dropped_database_connection(mock_send_task, consumer, settings):
+    """Test that a poller reconnects after its dedup connection drops instead of failing until a restart."""
+    settings.S3_EVENT_BATCH_MAX_OBJECTS = 1
+    consumer.dedup.use_database = True
+    consumer.sqs = MagicMock()
+    consumer.sqs.delete_message_batch.return_value = {}
+    consumer.queue_url = "test-queue-url"
+    batches = [[_message("h-1", key="audit/a.csv")], [_message("h-2", key="audit/b.csv")]]
+    connection.ensure_connection()
+
+    def receive(**kwargs):
+        if len(batches) == 2:  # noqa: PLR2004
+            # The server goes away under the connection the poller already holds
+            connection.connection.close()
+        consumer.enabled = len(batches) > 1
+        return {"Messages": batches.pop(0)}
+
+    consumer.sqs.receive_message.side_effect = receive
+
+    consumer.run()
+
+    mock_send_task.assert_called_once_with(
+        "process_s3_file",
+        kwargs={"bucket_name": "b", "object_key": "audit/b.csv", "lane": "healthcare-ingestion-queue"},
+        queue="healthcare-ingestion-queue",
+        producer=ANY,
+    )
+    consumer.sqs.delete_message_batch.assert_called_once_with(
+        QueueUrl="test-queue-url", Entries=[{"Id": "0", "ReceiptHandle": "h-2"}]
+    )
+    assert list(S3ObjectEvent.objects.values_list("object_key", flat=True)) == ["audit/b.csv"]
+
+
+def _message(handle, key=None, message_id=None, s3_object=None):
+    s3_object = s3_object or {"key": key or f"test/{handle}.csv"}
+    s3_event = {"Records": [{"s3": {"bucket": {"name": "b"}, "object": s3_object}}]}
+    return {"MessageId": message_id or f"id-{handle}", "Body": json.dumps(s3_event), "ReceiptHandle": handle}
+
+
+@patch("core.tasks.consumers.current_app.send_task")
+def test_consumer_acknowledges_in_batches_of_ten(mock_send_task, consumer):
+    """Test that receipts are deleted with DeleteMessageBatch, 10 entries per call."""
+    consumer.sqs = MagicMock()
+    consumer.sqs.delete_message_batch.return_value = {"Successful": []}
+    consumer.queue_url = "test-queue-url"
+
+    consumer._process_batch([_message(f"handle-{i}") for i in range(12)])
+
+    assert mock_send_task.call_count == 12  # noqa: PLR2004
+    entries = [call.kwargs["Entries"] for call in consumer.sqs.delete_message_batch.call_args_list]
+    assert [len(chunk) for chunk in entries] == [10, 2]
+    assert entries[1][1]["ReceiptHandle"] == "handle-11"
+
+
+@patch("core.tasks.consumers.current_app.send_task")
+def test_consumer_skips_acknowledging_failed_messages(mock_send_task, consumer):
+    """Test that only messages whose records were all dispatched are deleted."""
+    consumer.sqs = MagicMock()
+    consumer.sqs.delete_message_batch.return_value = {}
+    consumer.queue_url = "test-queue-url"
+
+    consumer._process_batch([_message("good"), {"MessageId": "m-bad", "Body": "not-json", "ReceiptHandle": "bad"}])
+
+    consumer.sqs.delete_message_batch.assert_called_once_with(
+        QueueUrl="test-queue-url", Entries=[{"Id": "0", "ReceiptHandle": "good"}]
+    )
+
+
+@patch("core.tasks.consumers.current_app.send_task")
+def test_consumer_logs_failed_deletes(mock_send_task, consumer):
+    """Test that per-entry DeleteMessageBatch failures are logged."""
+    consumer.sqs = MagicMock()
+    consumer.sqs.delete_message_batch.return_value = {"Failed": [{"Id": "0", "Message": "ReceiptHandleIsInvalid"}]}
+    consumer.queue_url = "test-queue-url"
+
+    with patch("core.tasks.consumers.logger") as mock_logger:
+        consumer._process_batch([_message("stale")])
+
+    mock_logger.error.assert_called_with("S3EventConsumer delete failed for entry 0: ReceiptHandleIsInvalid")
+
+
+@patch("core.tasks.consumers.current_app.send_task")
+def test_consumer_releases_messages_after_batch(mock_send_task, consumer):
+    """Test that acknowledged and failed messages both leave the in-flight registry."""
+    consumer.sqs = MagicMock()
+    consumer.sqs.delete_message_batch.return_value = {}
+    consumer.queue_url = "test-queue-url"
+
+    consumer._process_batch([_message("good"), {"MessageId": "m-bad", "Body": "not-json", "ReceiptHandle": "bad"}])
+
+    metrics = consumer.metrics()
+    assert metrics["in_flight"] == 0
+    assert metrics["received"] == 2  # noqa: PLR2004
+    assert metrics["acknowledged"] == 1
+
+
+@patch("core.tasks.consumers.current_app.send_task")
+def test_consumer_skips_redelivered_in_flight_message(mock_send_task, consumer):
+    """Test that a redelivery of a message still being handled is not dispatched again."""
+    consumer.sqs = MagicMock()
+    consumer.sqs.delete_message_batch.return_value = {}
+    consumer.queue_url = "test-queue-url"
+    consumer.inflight.track(_message("old-handle", message_id="m-1"))
+
+    consumer._process_batch([_message("new-handle", message_id="m-1")])
+
+    mock_send_task.assert_not_called()
+    consumer.sqs.delete_message_batch.assert_not_called()
+    assert consumer.inflight.receipt_handle("m-1") == "new-handle"
+
+
+def test_consumer_heartbeat_extends_visibility(consumer, settings):
+    """Test that the heartbeat resets the visibility timeout of every in-flight message."""
+    settings.S3_EVENT_VISIBILITY_TIMEOUT = 45
+    consumer.sqs = MagicMock()
+    consumer.sqs.change_message_visibility_batch.return_value = {"Failed": [{"Id": "0"}]}
+    consumer.queue_url = "test-queue-url"
+    consumer.inflight.track(_message("handle-1"))
+
+    def stop_after_one_beat(seconds):
+        consumer.enabled = False
+
+    with (
+        patch("core.tasks.consumers.time.sleep", side_effect=stop_after_one_beat),
+        patch("core.tasks.consumers.logger") as mock_logger,
+    ):
+        consumer.heartbeat()
+
+    consumer.sqs.change_message_visibility_batch.assert_called_once_with(
+        QueueUrl="test-queue-url", Entries=[{"Id": "0", "ReceiptHandle": "handle-1", "VisibilityTimeout": 45}]
+    )
+    mock_logger.error.assert_called_with("S3EventConsumer visibility extension failed for entry 0")
+    assert "in_flight" in mock_logger.info.call_args[0][0]
+
+
+def test_consumer_heartbeat_handles_exception(consumer):
+    consumer.sqs = MagicMock()
+    consumer.sqs.change_message_visibility_batch.side_effect = Exception("SQS Down")
+    consumer.inflight.track(_message("handle-1"))
+
+    def stop_after_one_beat(seconds):
+        consumer.enabled = False
+
+    with (
+        patch("core.tasks.consumers.time.sleep", side_effect=stop_after_one_beat),
+        patch("core.tasks.consumers.logger") as mock_logger,
+    ):
+        consumer.heartbeat()
+
+    mock_logger.error.assert_called_with("S3EventConsumer heartbeat error: SQS Down")
+
+
+@patch("core.tasks.consumers.current_app.send_task")
+def test_consumer_drops_duplicate_events(mock_send_task, consumer):
+    """Test that repeated notifications for the same object version are dispatched once."""
+    consumer.sqs = MagicMock()
+    consumer.sqs.delete_message_batch.return_value = {}
+    consumer.queue_url = "test-queue-url"
+    s3_object = {"key": "audit/a.csv", "eTag": "abc", "sequencer": "0055AED6DCD90281E5"}
+
+    consumer._process_batch([_message("h-1", s3_object=s3_object), _message("h-2", s3_object=s3_object)])
+
+    mock_send_task.assert_called_once()
+    # Both messages are acknowledged: the duplicate needs no further work.
+    assert len(consumer.sqs.delete_message_batch.call_args.kwargs["Entries"]) == 2  # noqa: PLR2004
+    # Dispatched, so the claim is confirmed for the full TTL instead of the pending lease
+    _, _, expires_at = consumer.dedup._latest[("b", "audit/a.csv")]
+    assert expires_at - time.monotonic() > consumer.dedup.pending_seconds
+
+
+@patch("core.tasks.consumers.current_app.send_task")
+def test_consumer_releases_dedup_claim_on_dispatch_failure(mock_send_task, consumer):
+    """Test that an event whose publish failed is dispatched again on redelivery."""
+    consumer.sqs = MagicMock()
+    consumer.sqs.delete_message_batch.return_value = {}
+    consumer.queue_url = "test-queue-url"
+    s3_object = {"key": "audit/a.csv", "eTag": "abc", "sequencer": "01"}
+    mock_send_task.side_effect = [Exception("Broker Down"), None]
+
+    consumer._process_batch([_message("h-1", s3_object=s3_object)])
+    consumer._process_batch([_message("h-2", s3_object=s3_object)])
+
+    assert mock_send_task.call_count == 2  # noqa: PLR2004
+    consumer.sqs.delete_message_batch.assert_called_once_with(
+        QueueUrl="test-queue-url", Entries=[{"Id": "0", "ReceiptHandle": "h-2"}]
+    )
+
+
+def _gate(paused: bool, depth: int = 0) -> MagicMock:
+    gate = MagicMock(paused=paused, depth=depth)
+    gate.should_pause.return_value = paused
+    return gate
+
+
+def test_consumer_pauses_polling_when_every_lane_is_over_its_watermark(consumer, settings):
+    """Test that no messages are received while no lane can take more work."""
+    settings.S3_EVENT_BACKPRESSURE_PAUSE_SECONDS = 7
+    consumer.sqs = MagicMock()
+    consumer.backpressure = {"small-queue": _gate(True, 1500), "large-queue": _gate(True, 2000)}
+
+    def stop_after_pause(seconds):
+        consumer.enabled = False
+
+    with patch("core.tasks.consumers.time.sleep", side_effect=stop_after_pause) as mock_sleep:
+        consumer.run()
+
+    mock_sleep.assert_called_once_with(7)
+    consumer.sqs.receive_message.assert_not_called()
+    assert consumer.metrics()["paused"] == {"small-queue": True, "large-queue": True}
+    assert consumer.metrics()["downstream_depth"] == {"small-queue": 1500, "large-queue": 2000}
+
+
+@patch("core.tasks.consumers.current_app.send_task")
+def test_consumer_defers_only_events_of_a_paused_lane(mock_send_task, consumer, settings):
+    """Test that a large-file backlog doesn't stop small files: only the paused lane's events wait."""
+    settings.INGESTION_QUEUE_LANES = [(1024, "small-queue"), (None, "large-queue")]
+    consumer.sqs = MagicMock()
+    consumer.sqs.receive_message.return_value = {
+        "Messages": [
+            _message("h-1", s3_object={"key": "audit/small.csv", "size": 512}),
+            _message("h-2", s3_object={"key": "audit/big.csv", "size": 4096}),
+        ]
+    }
+    consumer.sqs.delete_message_batch.return_value = {}
+    consumer.backpressure = {"small-queue": _gate(False), "large-queue": _gate(True, 2000)}
+
+    def stop_after_one_poll(**kwargs):
+        consumer.enabled = False
+        return consumer.sqs.receive_message.return_value
+
+    consumer.sqs.receive_message.side_effect = stop_after_one_poll
+    consumer.run()
+
+    assert [call.kwargs["queue"] for call in mock_send_task.call_args_list] == ["small-queue"]
+    consumer.sqs.delete_message_batch.assert_called_once_with(
+        QueueUrl=consumer.queue_url, Entries=[{"Id": "0", "ReceiptHandle": "h-1"}]
+    )
+    # The deferred event was never claimed, so its redelivery is dispatched
+    assert consumer.dedup.claim("b", "audit/big.csv", None, None)
+
+
+@patch("core.tasks.consumers.current_app.send_task")
+def test_consumer_routes_by_object_size(mock_send_task, consumer, settings):
+    """Test that the object size from the event record selects the ingestion lane."""
+    settings.INGESTION_QUEUE_LANES = [(1024, "small-queue"), (None, "large-queue")]
+    consumer.sqs = MagicMock()
+    consumer.sqs.delete_message_batch.return_value = {}
+
+    consumer._process_batch(
+        [
+            _message("h-1", s3_object={"key": "audit/small.csv", "size": 512}),
+            _message("h-2", s3_object={"key": "audit/big.csv", "size": 5 * 1024**3}),
+        ]
+    )
+
+    assert [call.kwargs["queue"] for call in mock_send_task.call_args_list] == ["small-queue", "large-queue"]
+
+
+@patch("core.tasks.consumers.current_app.send_task")
+def test_consumer_batches_small_lane_objects(mock_send_task, consumer, settings):
+    """Test that small objects share process_s3_batch tasks while large ones are dispatched alone."""
+    settings.INGESTION_QUEUE_LANES = [(1024, "small-queue"), (None, "large-queue")]
+    settings.S3_EVENT_BATCH_MAX_OBJECTS = 2
+    consumer.sqs = MagicMock()
+    consumer.sqs.delete_message_batch.return_value = {}
+
+    consumer._process_batch(
+        [_message(f"h-{i}", s3_object={"key": f"audit/{i}.csv", "size": 10}) for i in range(3)]
+        + [_message("h-big", s3_object={"key": "audit/big.csv", "size": 4096})]
+    )
+
+    calls = [(call.args[0], call.kwargs["kwargs"], call.kwargs["queue"]) for call in mock_send_task.call_args_list]
+    assert calls == [
+        ("process_s3_file", {"bucket_name": "b", "object_key": "audit/big.csv", "lane": "large-queue"}, "large-queue"),
+        (
+            "process_s3_batch",
+            {"objects": [["b", "audit/0.csv"], ["b", "audit/1.csv"]], "lane": "small-queue"},
+            "small-queue",
+        ),
+        ("process_s3_batch", {"objects": [["b", "audit/2.csv"]], "lane": "small-queue"}, "small-queue"),
+    ]
+    assert len(consumer.sqs.delete_message_batch.call_args.kwargs["Entries"]) == 4  # noqa: PLR2004
+
+
+@patch("core.tasks.consumers.current_app.send_task")
+def test_consumer_batch_dispatch_failure_keeps_messages(mock_send_task, consumer, settings):
+    """Test that messages of a failed batch dispatch are not acknowledged and can be redispatched."""
+    settings.S3_EVENT_BATCH_MAX_OBJECTS = 10
+    consumer.sqs = MagicMock()
+    mock_send_task.side_effect = Exception("Broker Down")
+    messages = [_message(f"h-{i}", s3_object={"key": f"audit/{i}.csv", "size": 10}) for i in range(2)]
+
+    with patch("core.tasks.consumers.logger") as mock_logger:
+        consumer._process_batch(messages)
+
+    mock_logger.error.assert_called_with("S3EventConsumer batch dispatch error: Broker Down")
+    consumer.sqs.delete_message_batch.assert_not_called()
+
+    mock_send_task.side_effect = None
+    consumer._process_batch(messages)
+    assert mock_send_task.call_count == 2  # noqa: PLR2004
+
+
+@patch("core.tasks.consumers.current_app.send_task")
+def test_consumer_dispatches_manifests(mock_send_task, consumer):
+    consumer.sqs = MagicMock()
+
+    consumer._process_batch([_message("h-1", s3_object={"key": "drops/2024.manifest.json", "size": 100})])
+
+    mock_send_task.assert_called_once_with(
+        "process_s3_batch",
+        kwargs={"manifest": ["b", "drops/2024.manifest.json"], "lane": "healthcare-ingestion-queue"},
+        queue="healthcare-ingestion-queue",
+        producer=ANY,
+    )
+
+
+def test_consumer_collects_messages_within_batch_window(consumer, settings):
+    """Test that batching keeps receiving until the window closes or a poll comes back empty."""
+    settings.S3_EVENT_BATCH_MAX_OBJECTS = 50
+    settings.S3_EVENT_BATCH_WINDOW_SECONDS = 3
+    consumer.sqs = MagicMock()
+    consumer.sqs.receive_message.side_effect = [
+        {"Messages": [_message("h-1")]},
+        {"Messages": [_message("h-2")]},
+        {},
+    ]
+
+    messages = consumer._receive()
+
+    assert [msg["ReceiptHandle"] for msg in messages] == ["h-1", "h-2"]
+    assert consumer.sqs.receive_message.call_count == 3  # noqa: PLR2004
+
+
+def test_consumer_batch_window_expires(consumer, settings):
+    settings.S3_EVENT_BATCH_MAX_OBJECTS = 50
+    settings.S3_EVENT_BATCH_WINDOW_SECONDS = 0
+    consumer.sqs = MagicMock()
+    consumer.sqs.receive_message.return_value = {"Messages": [_message("h-1")]}
+
+    assert len(consumer._receive()) == 1
+    consumer.sqs.receive_message.assert_called_once()
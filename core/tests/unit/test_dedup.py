@@ -0,0 +1,148 @@
+"""
+Unit tests for the S3 event de-duplication cache.
+"""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.utils import timezone
+
+from core.models import S3ObjectEvent
+from core.tasks.dedup import EventDeduplicator
+
+TTL = 60
+
+
+@pytest.fixture
+def dedup():
+    return EventDeduplicator(ttl_seconds=TTL, max_entries=2)
+
+
+def test_exact_duplicate_is_dropped(dedup):
+    assert dedup.claim("b", "k", "etag", "0A") is True
+    assert dedup.claim("b", "k", "etag", "0A") is False
+
+
+def test_only_latest_sequencer_per_key_is_kept(dedup):
+    """Test that newer sequencers pass and stale ones are dropped, regardless of length."""
+    assert dedup.claim("b", "k", "e1", "FF") is True
+    assert dedup.claim("b", "k", "e2", "0100") is True
+    assert dedup.claim("b", "k", "e1", "FF") is False
+    assert dedup.claim("b", "other", "e1", "FF") is True
+
+
+def test_events_without_sequencer_compare_etags(dedup):
+    assert dedup.claim("b", "k", "e1", None) is True
+    assert dedup.claim("b", "k", "e1", None) is False
+    assert dedup.claim("b", "k", "e2", None) is True
+
+
+def test_entries_expire_after_ttl(dedup):
+    with patch("core.tasks.dedup.time.monotonic", return_value=0):
+        dedup.claim("b", "k", "e", "01")
+    with patch("core.tasks.dedup.time.monotonic", return_value=TTL + 1):
+        assert dedup.claim("b", "k", "e", "01") is True
+
+
+def test_lru_eviction_bounds_memory(dedup):
+    dedup.claim("b", "k1", "e", "01")
+    dedup.claim("b", "k2", "e", "01")
+    dedup.claim("b", "k1", "e", "01")  # refreshes k1
+    dedup.claim("b", "k3", "e", "01")  # evicts k2
+
+    assert dedup.claim("b", "k2", "e", "01") is True
+    assert dedup.claim("b", "k3", "e", "01") is False
+
+
+def test_release_only_forgets_matching_claim(dedup):
+    dedup.claim("b", "k", "e1", "01")
+    dedup.release("b", "k", "e0", "00")
+    assert dedup.claim("b", "k", "e1", "01") is False
+
+    dedup.release("b", "k", "e1", "01")
+    assert dedup.claim("b", "k", "e1", "01") is True
+
+
+def test_prune_evicts_expired_entries(dedup):
+    with patch("core.tasks.dedup.time.monotonic", return_value=0):
+        dedup.claim("b", "k", "e", "01")
+    with patch("core.tasks.dedup.time.monotonic", return_value=TTL + 1):
+        dedup.prune()
+
+    assert len(dedup._latest) == 0
+
+
+@pytest.mark.django_db
+def test_database_backend_shares_claims_between_workers():
+    """Test that a second consumer with a cold cache is stopped by the shared table."""
+    first = EventDeduplicator(ttl_seconds=TTL, max_entries=10, use_database=True)
+    second = EventDeduplicator(ttl_seconds=TTL, max_entries=10, use_database=True)
+
+    assert first.claim("b", "k", "e1", "01") is True
+    assert second.claim("b", "k", "e1", "01") is False
+    assert second.claim("b", "k", "e2", "02") is True
+    assert first.claim("b", "k", "e1", "01") is False
+
+    event = S3ObjectEvent.objects.get(bucket="b", object_key="k")
+    assert event.sequencer.endswith("02")
+    assert event.etag == "e2"
+
+
+@pytest.mark.django_db
+def test_database_backend_reclaims_expired_and_released_events():
+    dedup = EventDeduplicator(ttl_seconds=TTL, max_entries=10, use_database=True)
+    other = EventDeduplicator(ttl_seconds=TTL, max_entries=10, use_database=True)
+
+    dedup.claim("b", "k", "e", None)
+    S3ObjectEvent.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+    assert other.claim("b", "k", "e", None) is True
+
+    other.release("b", "k", "e", None)
+    assert not S3ObjectEvent.objects.exists()
+    assert dedup.claim("b", "k", "e", None) is False  # still cached locally
+
+
+@pytest.mark.django_db
+def test_database_prune_deletes_expired_rows():
+    dedup = EventDeduplicator(ttl_seconds=TTL, max_entries=10, use_database=True)
+    dedup.claim("b", "old", "e", "01")
+    dedup.claim("b", "new", "e", "01")
+    S3ObjectEvent.objects.filter(object_key="old").update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    dedup.prune()
+
+    assert list(S3ObjectEvent.objects.values_list("object_key", flat=True)) == ["new"]
+    assert str(S3ObjectEvent.objects.get()) == f"s3://b/new ({'01'.rjust(64, '0')})"
+
+
+def test_unconfirmed_claim_lapses_after_the_pending_lease():
+    """Test that a claim whose dispatch never happened doesn't drop the redelivery."""
+    dedup = EventDeduplicator(ttl_seconds=TTL, max_entries=10, pending_seconds=5)
+
+    with patch("core.tasks.dedup.time.monotonic", return_value=0):
+        assert dedup.claim("b", "crashed", "e", "01") is True
+        assert dedup.claim("b", "sent", "e", "01") is True
+        dedup.confirm("b", "sent", "e", "01")
+        dedup.confirm("b", "crashed", "other", "01")  # not the claimed event: no effect
+
+    with patch("core.tasks.dedup.time.monotonic", return_value=6):
+        assert dedup.claim("b", "crashed", "e", "01") is True
+        assert dedup.claim("b", "sent", "e", "01") is False
+
+
+@pytest.mark.django_db
+def test_database_claim_is_pending_until_confirmed():
+    dedup = EventDeduplicator(ttl_seconds=TTL, max_entries=10, use_database=True, pending_seconds=5)
+    other = EventDeduplicator(ttl_seconds=TTL, max_entries=10, use_database=True, pending_seconds=5)
+
+    before = timezone.now()
+    dedup.claim("b", "k", "e", "01")
+    assert S3ObjectEvent.objects.get().expires_at <= before + timedelta(seconds=6)
+
+    # The consumer died before dispatching: once the lease lapsed, the redelivery is claimed again
+    S3ObjectEvent.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+    assert other.claim("b", "k", "e", "01") is True
+
+    other.confirm("b", "k", "e", "01")
+    assert S3ObjectEvent.objects.get().expires_at >= before + timedelta(seconds=TTL)
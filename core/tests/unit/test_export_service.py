@@ -0,0 +1,231 @@
+"""
+Unit tests for the streaming domain table exports: service, view and management command.
+"""
+
+import csv
+import gzip
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import AnonymousUser, Permission, User
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import RequestFactory
+from django.utils import timezone
+
+from core.models import LabResult, PharmacyClaim
+from core.services.export_service import build_export_queryset, stream_export
+from core.services.processing_service import process_artifact
+from core.services.raw_ingestion_service import ingest_file_to_raw
+from core.views import export
+
+HTTP_OK = 200
+HTTP_BAD_REQUEST = 400
+HTTP_FORBIDDEN = 403
+
+
+def _csv(*rows: str) -> bytes:
+    header = "claim_id,ncpdp_id,bin_number,service_date,total_amount_paid,transaction_code\n"
+    return (header + "".join(f"{row}\n" for row in rows)).encode()
+
+
+def _ingest(name: str, *rows: str):
+    artifact = ingest_file_to_raw(ContentFile(_csv(*rows)), name, "pharmacy")
+    process_artifact(artifact.id)
+    return artifact
+
+
+def _lab(patient_id: str, performed_at: datetime) -> LabResult:
+    return LabResult.objects.create(
+        patient_id=patient_id,
+        test_code="GLU",
+        test_name="Glucose",
+        result_value=Decimal("90.00"),
+        result_unit="mg/dL",
+        performed_at=timezone.make_aware(performed_at),
+    )
+
+
+def _read(chunks) -> str:
+    return b"".join(chunks).decode()
+
+
+@pytest.mark.django_db
+def test_csv_export_pages_by_primary_key():
+    _ingest("pharmacy/a.csv", *(f"C-{i},NCP1,BIN1,2024-01-0{i % 3 + 1},10.00,B1" for i in range(7)))
+
+    rows = list(csv.DictReader(io.StringIO(_read(stream_export(PharmacyClaim.objects.all(), page_size=3)))))
+
+    assert [row["claim_id"] for row in rows] == [f"C-{i}" for i in range(7)]
+    assert rows[0]["service_date"] == "2024-01-01"
+    assert rows[0]["total_amount_paid"] == "10.00"
+    assert list(rows[0])[:2] == ["id", "claim_id"]
+
+
+@pytest.mark.django_db
+def test_export_reads_one_page_per_query(django_assert_num_queries):
+    _ingest("pharmacy/a.csv", *(f"C-{i},NCP1,BIN1,2024-01-01,10.00,B1" for i in range(6)))
+
+    # Two full pages and the empty page that ends the export
+    with django_assert_num_queries(3):
+        _read(stream_export(PharmacyClaim.objects.all(), fmt="ndjson", page_size=3))
+
+
+@pytest.mark.django_db
+def test_empty_csv_export_has_header_only():
+    assert _read(stream_export(PharmacyClaim.objects.all())).splitlines()[0].startswith("id,claim_id,")
+    assert _read(stream_export(PharmacyClaim.objects.all(), fmt="ndjson")) == ""
+
+
+@pytest.mark.django_db
+def test_ndjson_gzip_export_round_trips():
+    _ingest("pharmacy/a.csv", "C-1,NCP1,BIN1,2024-01-01,10.50,B1")
+
+    data = gzip.decompress(b"".join(stream_export(PharmacyClaim.objects.all(), fmt="ndjson", compress=True)))
+
+    record = json.loads(data)
+    assert record["claim_id"] == "C-1"
+    assert record["service_date"] == "2024-01-01"
+    assert record["total_amount_paid"] == "10.50"
+
+
+@pytest.mark.django_db
+def test_filters_by_date_range_and_artifact():
+    first = _ingest("pharmacy/a.csv", "C-1,NCP1,BIN1,2024-01-01,10.00,B1", "C-2,NCP1,BIN1,2024-01-05,10.00,B1")
+    second = _ingest("pharmacy/b.csv", "C-3,NCP1,BIN1,2024-01-05,10.00,B1")
+
+    def claims(**filters):
+        return sorted(build_export_queryset("pharmacy", **filters).values_list("claim_id", flat=True))
+
+    assert claims(start=date(2024, 1, 2)) == ["C-2", "C-3"]
+    assert claims(end=date(2024, 1, 5)) == ["C-1", "C-2", "C-3"]
+    assert claims(end=date(2024, 1, 4)) == ["C-1"]
+    assert claims(artifact_id=first.id) == ["C-1", "C-2"]
+    assert claims(start=date(2024, 1, 5), artifact_id=second.id) == ["C-3"]
+
+
+@pytest.mark.django_db
+def test_reprocessing_moves_lineage_to_latest_artifact():
+    first = _ingest("pharmacy/a.csv", "C-1,NCP1,BIN1,2024-01-01,10.00,B1")
+    second = _ingest("pharmacy/b.csv", "C-1,NCP1,BIN1,2024-01-01,12.00,B1")
+
+    assert PharmacyClaim.objects.get().artifact_id == second.id
+    assert not build_export_queryset("pharmacy", artifact_id=first.id).exists()
+
+
+@pytest.mark.django_db
+def test_datetime_range_covers_whole_days():
+    _lab("P-1", datetime(2024, 1, 1, 23, 59))
+    _lab("P-2", datetime(2024, 1, 2, 0, 0))
+    _lab("P-3", datetime(2024, 1, 2, 23, 59))
+    _lab("P-4", datetime(2024, 1, 3, 0, 0))
+
+    queryset = build_export_queryset("lab_result", start=date(2024, 1, 2), end=date(2024, 1, 2))
+
+    assert sorted(queryset.values_list("patient_id", flat=True)) == ["P-2", "P-3"]
+
+
+def test_unknown_type_and_format_are_rejected():
+    with pytest.raises(ValueError, match="Unknown data type"):
+        build_export_queryset("nope")
+    with pytest.raises(ValueError, match="Unsupported export format"):
+        stream_export(PharmacyClaim.objects.none(), fmt="xml")
+
+
+@pytest.fixture
+def viewer(db):
+    user = User.objects.create_user("viewer")
+    user.user_permissions.add(Permission.objects.get(codename="view_pharmacyclaim"))
+    return user
+
+
+def _get(path: str, user, **params):
+    request = RequestFactory().get(path, params)
+    request.user = user
+    return export(request, path.rsplit("/", 1)[1])
+
+
+@pytest.mark.django_db
+def test_export_view_streams_csv(viewer):
+    _ingest("pharmacy/a.csv", "C-1,NCP1,BIN1,2024-01-01,10.00,B1")
+
+    response = _get("/export/pharmacy", viewer, start="2024-01-01")
+
+    assert response.status_code == HTTP_OK
+    assert response.streaming
+    assert response["Content-Type"] == "text/csv"
+    assert response["Content-Disposition"] == 'attachment; filename="pharmacy.csv"'
+    assert "C-1" in _read(response.streaming_content)
+
+
+@pytest.mark.django_db
+def test_export_view_streams_gzipped_ndjson(viewer):
+    _ingest("pharmacy/a.csv", "C-1,NCP1,BIN1,2024-01-01,10.00,B1")
+
+    response = _get("/export/pharmacy", viewer, format="ndjson", gzip="1")
+
+    assert response["Content-Type"] == "application/gzip"
+    assert response["Content-Disposition"] == 'attachment; filename="pharmacy.ndjson.gz"'
+    assert json.loads(gzip.decompress(b"".join(response.streaming_content)))["claim_id"] == "C-1"
+
+
+@pytest.mark.django_db
+def test_export_view_requires_view_permission(viewer):
+    assert _get("/export/pharmacy", AnonymousUser()).status_code == HTTP_FORBIDDEN
+    assert _get("/export/audit", viewer).status_code == HTTP_FORBIDDEN
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ("path", "params"),
+    [
+        ("/export/nope", {}),
+        ("/export/pharmacy", {"format": "xml"}),
+        ("/export/pharmacy", {"start": "yesterday"}),
+        ("/export/pharmacy", {"artifact": "abc"}),
+    ],
+)
+def test_export_view_rejects_bad_parameters(viewer, path, params):
+    response = _get(path, viewer, **params)
+
+    assert response.status_code == HTTP_BAD_REQUEST
+    assert "error" in json.loads(response.content)
+
+
+@pytest.mark.django_db
+def test_export_data_command_writes_file(tmp_path):
+    artifact = _ingest("pharmacy/a.csv", "C-1,NCP1,BIN1,2024-01-01,10.00,B1")
+    output = tmp_path / "claims.ndjson.gz"
+    out = StringIO()
+
+    call_command(
+        "export_data",
+        str(output),
+        "--type",
+        "pharmacy",
+        "--format",
+        "ndjson",
+        "--gzip",
+        "--artifact",
+        str(artifact.id),
+        "--start",
+        "2024-01-01",
+        "--page-size",
+        "1",
+        stdout=out,
+    )
+
+    assert "Exported pharmacy" in out.getvalue()
+    assert json.loads(gzip.decompress(output.read_bytes()))["claim_id"] == "C-1"
+
+
+def test_export_data_command_unknown_type(tmp_path):
+    out = StringIO()
+    call_command("export_data", str(tmp_path / "x.csv"), "--type", "nope", stdout=out)
+
+    assert "Unknown data type: nope" in out.getvalue()
+    assert not (tmp_path / "x.csv").exists()
@@ -0,0 +1,95 @@
+"""
+Unit tests for the cached readiness probe.
+"""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.health import ReadinessProbe
+
+
+class InlineThread:
+    """Runs the background refresh synchronously on start()."""
+
+    def __init__(self, target, **kwargs):
+        self.target = target
+
+    def start(self):
+        self.target()
+
+
+@pytest.fixture
+def database():
+    return MagicMock()
+
+
+@pytest.fixture
+def probe(database):
+    return ReadinessProbe({"database": database})
+
+
+def test_result_is_cached_within_ttl(settings, probe, database):
+    settings.HEALTH_CHECK_TTL = 60
+
+    first = probe.status()
+    second = probe.status()
+
+    assert first["healthy"] and second["healthy"]
+    database.assert_called_once()
+
+
+def test_expired_result_is_served_while_refreshing_in_background(settings, probe, database):
+    settings.HEALTH_CHECK_TTL = 0
+    probe.status()
+    database.side_effect = Exception("DB Down")
+
+    with patch("core.health.threading.Thread", InlineThread):
+        # The refresh runs "in the background": this call still serves the previous result
+        stale = probe.status()
+        refreshed = probe.status()
+
+    assert stale["healthy"]
+    assert not refreshed["healthy"]
+    assert refreshed["components"]["database"]["status"] == "error: DB Down"
+
+
+def test_only_one_background_refresh_at_a_time(settings, probe):
+    settings.HEALTH_CHECK_TTL = 0
+    probe.status()
+
+    # The mocked thread never runs, so the first refresh stays in progress
+    with patch("core.health.threading.Thread") as mock_thread:
+        probe.status()
+        probe.status()
+
+    mock_thread.assert_called_once()
+
+
+def test_result_older_than_max_age_is_unhealthy(settings, probe):
+    settings.HEALTH_CHECK_TTL = 0
+    settings.HEALTH_CHECK_MAX_AGE = 0
+    probe.status()
+
+    # A refresh that never finishes leaves the old result in place
+    with patch("core.health.threading.Thread"):
+        assert not probe.status()["healthy"]
+
+
+def test_concurrent_first_probes_run_checks_once(probe, database):
+    barrier = threading.Barrier(4)
+    results = []
+
+    def hit():
+        barrier.wait()
+        results.append(probe.status())
+
+    threads = [threading.Thread(target=hit) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 4  # noqa: PLR2004
+    database.assert_called_once()
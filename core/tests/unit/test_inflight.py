@@ -0,0 +1,69 @@
+"""
+Unit tests for the consumer's in-flight message registry.
+"""
+
+from unittest.mock import patch
+
+from core.tasks.inflight import InFlightRegistry
+
+
+def _message(message_id, handle, sent_timestamp=None):
+    msg = {"MessageId": message_id, "ReceiptHandle": handle}
+    if sent_timestamp:
+        msg["Attributes"] = {"SentTimestamp": str(sent_timestamp)}
+    return msg
+
+
+def test_track_detects_redelivery_and_keeps_latest_handle():
+    registry = InFlightRegistry()
+
+    assert registry.track(_message("m-1", "h-1")) is True
+    assert registry.track(_message("m-1", "h-2")) is False
+
+    assert registry.receipt_handle("m-1") == "h-2"
+    assert registry.receipt_handles() == ["h-2"]
+    assert registry.metrics()["redelivered"] == 1
+
+
+def test_release_counts_acknowledgements():
+    registry = InFlightRegistry()
+    registry.track(_message("m-1", "h-1"))
+    registry.track(_message("m-2", "h-2"))
+
+    registry.release(["m-1"], acknowledged=True)
+    registry.release(["m-2", "unknown"], acknowledged=False)
+
+    metrics = registry.metrics()
+    assert metrics["in_flight"] == 0
+    assert metrics["acknowledged"] == 1
+    assert metrics["oldest_age_seconds"] == 0
+
+
+def test_metrics_report_lag_and_oldest_age():
+    """Test lag (enqueue -> receipt) and age of the oldest in-flight message."""
+    registry = InFlightRegistry()
+
+    with patch("core.tasks.inflight.time.time", return_value=1000.0):
+        registry.track(_message("m-1", "h-1", sent_timestamp=990_000))
+        registry.track(_message("m-2", "h-2"))
+
+    with patch("core.tasks.inflight.time.time", return_value=1030.0):
+        metrics = registry.metrics()
+
+    assert metrics == {
+        "in_flight": 2,
+        "oldest_age_seconds": 30.0,
+        "lag_seconds": 0.0,
+        "received": 2,
+        "acknowledged": 0,
+        "redelivered": 0,
+    }
+
+
+def test_lag_from_sent_timestamp():
+    registry = InFlightRegistry()
+
+    with patch("core.tasks.inflight.time.time", return_value=1000.0):
+        registry.track(_message("m-1", "h-1", sent_timestamp=990_000))
+
+    assert registry.metrics()["lag_seconds"] >= 10.0  # noqa: PLR2004
@@ -39,7 +39,7 @@ def test_schema_validator_error():
     assert "Result value implies potential error" in str(exc.value)
 
 def test_strategy_transform_low_flag():
-    """Test logic for [LOW] flagging."""
+    """Test logic for LOW flagging."""
     strategy = LabResultStrategy()
     data = {
         "patient_id": "P1",
@@ -52,7 +52,8 @@ def test_strategy_transform_low_flag():
     }
     schema = LabResultSchema(**data)
     result = strategy.transform(schema)
-    assert result["test_name"] == "Glucose [LOW]"
+    assert result["abnormal_flag"] == "LOW"
+    assert result["test_name"] == "Glucose"
 
 def test_strategy_transform_exception_handling():
     """Test exception handling in reference range parsing."""
@@ -70,3 +71,4 @@ def test_strategy_transform_exception_handling():
     # Should not raise exception, but catch it and return data as-is
     result = strategy.transform(schema)
     assert result["test_name"] == "Glucose"
+    assert result["abnormal_flag"] is None
@@ -1,10 +1,14 @@
-from datetime import datetime, timezone
+from datetime import UTC, datetime, timezone
 from decimal import Decimal
 
 import pytest
+from django.core.files.base import ContentFile
 
+from core.models import LatestLabResult
 from core.models.lab_result import LabResult
 from core.schemas.lab_result import LabResultSchema
+from core.services.processing_service import process_artifact
+from core.services.raw_ingestion_service import ingest_file_to_raw
 from core.strategies.lab_result import LabResultStrategy
 
 
@@ -49,6 +53,24 @@ class TestLabResultStrategy:
         schema_instance = LabResultSchema(**data)
         result = strategy.transform(schema_instance)
         
+        assert result["abnormal_flag"] == LabResult.HIGH
+        assert result["test_name"] == "Glucose"
+
+    def test_transform_flagging_suffix_option(self, settings):
+        settings.LAB_RESULT_FLAG_SUFFIX = True
+        strategy = LabResultStrategy()
+        data = {
+            "patient_id": "P123",
+            "test_code": "L001",
+            "test_name": "Glucose",
+            "result_value": Decimal("150.0"),
+            "result_unit": "mg/dL",
+            "reference_range": "70-100",
+            "performed_at": datetime(2024, 1, 1, 12, 0, 0, tzinfo=UTC),
+        }
+        result = strategy.transform(LabResultSchema(**data))
+
+        assert result["abnormal_flag"] == LabResult.HIGH
         assert result["test_name"] == "Glucose [HIGH]"
 
     def test_integration_save(self):
@@ -68,3 +90,20 @@ class TestLabResultStrategy:
         record = LabResult.objects.create(**transformed)
         assert record.pk is not None
         assert record.result_unit == "UNITS"
+
+    def test_reprocessing_updates_abnormal_flag(self):
+        def ingest(name, value):
+            content = (
+                "patient_id,test_code,test_name,result_value,result_unit,reference_range,performed_at\n"
+                f"P1,T1,Glucose,{value},mg/dL,70-100,2024-01-01T12:00:00Z\n"
+            )
+            process_artifact(ingest_file_to_raw(ContentFile(content.encode()), name, "lab_result").id)
+
+        ingest("labs/a.csv", 150)
+        assert LabResult.objects.get().abnormal_flag == LabResult.HIGH
+        assert LatestLabResult.objects.get().abnormal_flag == LabResult.HIGH
+
+        # The corrected result is back in range: the derived flag is cleared by the upsert
+        ingest("labs/b.csv", 90)
+        assert LabResult.objects.get().abnormal_flag is None
+        assert LatestLabResult.objects.get().abnormal_flag is None
@@ -0,0 +1,72 @@
+"""
+Unit tests for the lab unit conversion registry and the reference range parser.
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from core.lab_rules import UNIT_CONVERSIONS, ReferenceRange, convert, parse_reference_range, register_conversion
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("70-100", ReferenceRange(low=Decimal("70"), high=Decimal("100"))),
+        (" 3.5 - 5.1 ", ReferenceRange(low=Decimal("3.5"), high=Decimal("5.1"))),
+        ("-2-2", ReferenceRange(low=Decimal("-2"), high=Decimal("2"))),
+        ("<5", ReferenceRange(high=Decimal("5"), high_inclusive=False)),
+        ("<= 5", ReferenceRange(high=Decimal("5"))),
+        ("≤5", ReferenceRange(high=Decimal("5"))),
+        (">40", ReferenceRange(low=Decimal("40"), low_inclusive=False)),
+        (">=.5", ReferenceRange(low=Decimal("0.5"))),
+        ("≥40", ReferenceRange(low=Decimal("40"))),
+        ("100-70", None),
+        ("invalid-range-format", None),
+        ("negative", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_parse_reference_range(text, expected):
+    assert parse_reference_range(text) == expected
+
+
+@pytest.mark.parametrize(
+    ("text", "value", "flag"),
+    [
+        ("70-100", "69.99", "LOW"),
+        ("70-100", "70", None),
+        ("70-100", "100", None),
+        ("70-100", "100.01", "HIGH"),
+        ("<5", "4.99", None),
+        ("<5", "5", "HIGH"),
+        ("≤5", "5", None),
+        (">40", "40", "LOW"),
+        (">=40", "40", None),
+        ("≥40", "39", "LOW"),
+    ],
+)
+def test_reference_range_flag(text, value, flag):
+    assert parse_reference_range(text).flag(Decimal(value)) == flag
+
+
+def test_parse_reference_range_is_cached():
+    parse_reference_range.cache_clear()
+
+    for _ in range(3):
+        parse_reference_range("12-17.5")
+
+    info = parse_reference_range.cache_info()
+    assert (info.hits, info.misses) == (2, 1)
+
+
+def test_conversion_registry(monkeypatch):
+    monkeypatch.setattr("core.lab_rules.UNIT_CONVERSIONS", {k: dict(v) for k, v in UNIT_CONVERSIONS.items()})
+
+    assert convert("L001", Decimal("5"), "MMOL/L") == (Decimal("90.0910"), "mg/dL")
+    assert convert("L001", Decimal("90"), "mg/dL") == (Decimal("90"), "mg/dL")
+    assert convert("L002", Decimal("4"), "mmol/L") == (Decimal("4"), "mmol/L")
+
+    register_conversion("L004", "umol/L", "mg/dL", "0.0113")
+    assert convert("L004", Decimal("100"), "umol/l") == (Decimal("1.1300"), "mg/dL")
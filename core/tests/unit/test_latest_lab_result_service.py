@@ -0,0 +1,129 @@
+"""
+Unit tests for the LatestLabResult index maintained by LabResult flushes, and its read API.
+"""
+
+import json
+from datetime import datetime
+from decimal import Decimal
+from itertools import count
+
+import pytest
+from django.contrib.auth.models import AnonymousUser, Permission, User
+from django.core.files.base import ContentFile
+from django.test import RequestFactory
+
+from core.models import LabResult, LatestLabResult
+from core.services.latest_lab_result_service import get_latest_results, upsert_latest_results
+from core.services.processing_service import process_artifact
+from core.services.raw_ingestion_service import ingest_file_to_raw
+from core.views import latest_lab_results
+
+HEADER = "patient_id,test_code,test_name,result_value,result_unit,reference_range,performed_at\n"
+HTTP_OK = 200
+HTTP_FORBIDDEN = 403
+
+_files = count()
+
+
+def _ingest(*rows: str):
+    content = (HEADER + "".join(f"{row}\n" for row in rows)).encode()
+    artifact = ingest_file_to_raw(ContentFile(content), f"labs/{next(_files)}.csv", "lab_result")
+    return process_artifact(artifact.id)
+
+
+def _latest(patient_id: str) -> dict[str, tuple]:
+    return {r.test_code: (r.result_value, r.performed_at.isoformat()) for r in get_latest_results(patient_id)}
+
+
+@pytest.mark.django_db
+def test_flush_keeps_newest_result_per_test():
+    _ingest(
+        "P-1,GLU,Glucose,90,mg/dL,70-100,2024-01-01T08:00:00Z",
+        "P-1,GLU,Glucose,95,mg/dL,70-100,2024-01-03T08:00:00Z",
+        "P-1,HBA,HbA1c,5.4,%,4-5.6,2024-01-02T08:00:00Z",
+        "P-2,GLU,Glucose,110,mg/dL,70-100,2024-01-01T08:00:00Z",
+    )
+
+    assert _latest("P-1") == {
+        "GLU": (Decimal("95.00"), "2024-01-03T08:00:00+00:00"),
+        "HBA": (Decimal("5.40"), "2024-01-02T08:00:00+00:00"),
+    }
+    assert _latest("P-2") == {"GLU": (Decimal("110.00"), "2024-01-01T08:00:00+00:00")}
+
+
+@pytest.mark.django_db
+def test_older_results_never_replace_the_latest():
+    _ingest("P-1,GLU,Glucose,95,mg/dL,70-100,2024-01-03T08:00:00Z")
+    # A late file with older history, and a newer result for another test
+    _ingest("P-1,GLU,Glucose,80,mg/dL,70-100,2024-01-01T08:00:00Z", "P-1,HBA,HbA1c,5.4,%,4-5.6,2024-01-02T08:00:00Z")
+
+    assert _latest("P-1") == {
+        "GLU": (Decimal("95.00"), "2024-01-03T08:00:00+00:00"),
+        "HBA": (Decimal("5.40"), "2024-01-02T08:00:00+00:00"),
+    }
+
+
+@pytest.mark.django_db
+def test_correction_of_the_latest_result_is_applied():
+    _ingest("P-1,GLU,Glucose,95,mg/dL,70-100,2024-01-03T08:00:00Z")
+    _ingest("P-1,GLU,Glucose,97,mg/dL,70-100,2024-01-03T08:00:00Z")
+
+    assert _latest("P-1") == {"GLU": (Decimal("97.00"), "2024-01-03T08:00:00+00:00")}
+    assert LabResult.objects.get().result_value == Decimal("97.00")
+
+
+@pytest.mark.django_db
+def test_upsert_accepts_naive_timestamps_and_empty_input():
+    result = LabResult(
+        patient_id="P-1",
+        test_code="GLU",
+        test_name="Glucose",
+        result_value=Decimal("90"),
+        result_unit="mg/dL",
+        performed_at=datetime(2024, 1, 1, 8, 0),
+    )
+
+    assert upsert_latest_results([]) == 0
+    assert upsert_latest_results([result]) == 1
+    assert LatestLabResult.objects.get().performed_at.tzinfo is not None
+
+
+@pytest.mark.django_db
+def test_get_latest_results_filters_test_codes():
+    _ingest("P-1,GLU,Glucose,90,mg/dL,,2024-01-01T08:00:00Z", "P-1,HBA,HbA1c,5.4,%,,2024-01-01T08:00:00Z")
+
+    assert [r.test_code for r in get_latest_results("P-1")] == ["GLU", "HBA"]
+    assert [r.test_code for r in get_latest_results("P-1", ["HBA"])] == ["HBA"]
+
+
+@pytest.mark.django_db
+def test_latest_lab_results_view():
+    _ingest("P-1,GLU,Glucose,90,mg/dL,70-100,2024-01-01T08:00:00Z", "P-1,HBA,HbA1c,5.4,%,4-5.6,2024-01-01T08:00:00Z")
+    user = User.objects.create_user("clinician")
+    user.user_permissions.add(Permission.objects.get(codename="view_latestlabresult"))
+
+    request = RequestFactory().get("/patients/P-1/latest-lab-results", {"test_code": "GLU"})
+    request.user = user
+    response = latest_lab_results(request, "P-1")
+
+    assert response.status_code == HTTP_OK
+    data = json.loads(response.content)
+    assert data["patient_id"] == "P-1"
+    assert data["results"] == [
+        {
+            "test_code": "GLU",
+            "test_name": "Glucose",
+            "result_value": "90.00",
+            "result_unit": "MG/DL",
+            "reference_range": "70-100",
+            "performed_at": "2024-01-01T08:00:00Z",
+            "abnormal_flag": None,
+        }
+    ]
+
+
+def test_latest_lab_results_view_requires_permission():
+    request = RequestFactory().get("/patients/P-1/latest-lab-results")
+    request.user = AnonymousUser()
+
+    assert latest_lab_results(request, "P-1").status_code == HTTP_FORBIDDEN
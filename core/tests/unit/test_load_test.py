@@ -0,0 +1,100 @@
+"""
+Unit tests for the in-process event load test harness.
+"""
+
+import json
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from celery import current_app
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from core.aws import get_client, reset_clients
+from core.benchmarks import drain_events, generate_rows, publish_events
+from core.benchmarks.load import BUCKET, event_queue_url
+from core.models import Artifact, PharmacyClaim
+
+EVENTS = 6
+ROWS_PER_FILE = 5
+
+
+@pytest.fixture(autouse=True)
+def memory_backend(settings):
+    settings.AWS_CLIENT_BACKEND = "memory"
+    reset_clients()
+    yield
+    reset_clients()
+
+
+def test_generate_rows_start_offset():
+    """Test that files generated with disjoint ranges do not share unique keys."""
+    first = [row["claim_id"] for row in generate_rows("pharmacy", 3)]
+    second = [row["claim_id"] for row in generate_rows("pharmacy", 3, start=3)]
+
+    assert not set(first) & set(second)
+
+
+def test_publish_events_uploads_files_and_notifications():
+    rows = publish_events("lab_result", 2, ROWS_PER_FILE)
+
+    assert rows == 2 * ROWS_PER_FILE
+    messages = get_client("sqs").receive_message(QueueUrl=event_queue_url(), MaxNumberOfMessages=10)["Messages"]
+    records = [json.loads(msg["Body"])["Records"][0]["s3"] for msg in messages]
+    assert [record["object"]["key"] for record in records] == ["labs/load-000000.csv", "labs/load-000001.csv"]
+
+    body = get_client("s3").get_object(Bucket=BUCKET, Key="labs/load-000000.csv")["Body"].read()
+    assert records[0]["object"]["size"] == len(body)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_drain_events_runs_full_flow(settings):
+    """Test that every published object is ingested, processed and its event acknowledged."""
+    settings.S3_EVENT_BATCH_MAX_OBJECTS = 3
+    settings.S3_EVENT_BATCH_WINDOW_SECONDS = 0.1
+    publish_events("pharmacy", EVENTS, ROWS_PER_FILE)
+
+    result = drain_events(EVENTS, pollers=2, workers=2, timeout=30)
+
+    assert not result["timed_out"]
+    assert result["objects"] == EVENTS
+    assert result["files_ok"] == EVENTS
+    assert result["events_left"] == 0
+    assert result["consumer"]["acknowledged"] == EVENTS
+    assert Artifact.objects.filter(status=Artifact.COMPLETED).count() == EVENTS
+    assert PharmacyClaim.objects.count() == EVENTS * ROWS_PER_FILE
+    assert current_app.conf.task_always_eager is False
+
+
+@pytest.mark.django_db(transaction=True)
+def test_drain_events_times_out_and_counts_failed_tasks():
+    publish_events("audit", 1, ROWS_PER_FILE)
+
+    with patch("core.tasks.s3_processing.ingest_file_to_raw", side_effect=RuntimeError("boom")):
+        result = drain_events(2, pollers=1, workers=1, timeout=0.5)
+
+    assert result["timed_out"]
+    assert result["objects"] == 1
+    assert result["files_failed"] == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_load_test_command():
+    out = StringIO()
+    call_command(
+        "load_test_events", "--events", "2", "--rows-per-file", "3", "--pollers", "1", "--workers", "1", stdout=out
+    )
+
+    output = out.getvalue()
+    assert "Publishing 2 pharmacy events of 3 rows" in output
+    assert "Drained after" in output
+    assert "Objects: 2/2, Files ok: 2, Files failed: 0, Events left: 0" in output
+    assert "events/s" in output
+
+
+def test_load_test_command_requires_memory_backend(settings):
+    settings.AWS_CLIENT_BACKEND = "boto3"
+
+    with pytest.raises(CommandError, match="AWS_CLIENT_BACKEND=memory"):
+        call_command("load_test_events", stdout=StringIO())
@@ -0,0 +1,143 @@
+"""
+Unit tests for the Prometheus pipeline metrics and their /metrics endpoints.
+"""
+
+import importlib
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.core.files.base import ContentFile
+from django.test import RequestFactory
+from prometheus_client import REGISTRY, CollectorRegistry
+
+from core import metrics
+from core.services.processing_service import process_artifact
+from core.services.raw_ingestion_service import ingest_file_to_raw
+from core.tasks.consumers import S3EventConsumer
+from core.tasks.monitoring import observe_queue_wait, stamp_published_at, start_metrics_exporter
+from core.tasks.s3_processing import _download
+from core.views import metrics as metrics_view
+
+CSV = (
+    b"claim_id,ncpdp_id,bin_number,service_date,total_amount_paid,transaction_code\n"
+    b"M-1,NCP1,BIN1,2024-01-01,10.00,B1\n"
+    b"M-2,NCP1,BIN1,not-a-date,10.00,B1\n"
+)
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.django_db
+def test_row_counters_and_flush_latency_per_content_type():
+    before = {
+        name: _sample(name, content_type="pharmacy")
+        for name in (
+            "etl_rows_ingested_total",
+            "etl_rows_processed_total",
+            "etl_rows_failed_total",
+            "etl_batch_flush_seconds_count",
+        )
+    }
+
+    artifact = ingest_file_to_raw(ContentFile(CSV), "pharmacy/m.csv", "pharmacy")
+    process_artifact(artifact.id)
+
+    delta = {name: _sample(name, content_type="pharmacy") - value for name, value in before.items()}
+    assert delta == {
+        "etl_rows_ingested_total": 2,
+        "etl_rows_processed_total": 1,
+        "etl_rows_failed_total": 1,
+        "etl_batch_flush_seconds_count": 1,
+    }
+
+
+def test_s3_download_bytes_and_duration():
+    s3 = MagicMock()
+    s3.get_object.return_value = {"Body": MagicMock(read=MagicMock(return_value=b"12345"))}
+    bytes_before = _sample("etl_s3_download_bytes_total")
+    count_before = _sample("etl_s3_download_seconds_count")
+
+    assert _download(s3, "bucket", "key") == b"12345"
+
+    assert _sample("etl_s3_download_bytes_total") - bytes_before == 5  # noqa: PLR2004
+    assert _sample("etl_s3_download_seconds_count") - count_before == 1
+
+
+def test_consumer_poll_and_dispatch_counters(settings):
+    settings.S3_EVENT_DEDUP_DATABASE = False
+    consumer = S3EventConsumer(MagicMock())
+    consumer.sqs = MagicMock()
+    consumer.sqs.receive_message.return_value = {"Messages": [{"MessageId": "1"}, {"MessageId": "2"}]}
+    polls, received = _sample("etl_consumer_polls_total"), _sample("etl_consumer_messages_received_total")
+    dispatched = _sample("etl_consumer_dispatches_total", task="process_s3_file")
+
+    consumer._receive_messages(wait_seconds=0)
+    with patch("core.tasks.consumers.current_app"):
+        consumer._dispatch_task({"s3": {"bucket": {"name": "b"}, "object": {"key": "pharmacy/x.csv"}}}, MagicMock())
+
+    assert _sample("etl_consumer_polls_total") - polls == 1
+    assert _sample("etl_consumer_messages_received_total") - received == 2  # noqa: PLR2004
+    assert _sample("etl_consumer_dispatches_total", task="process_s3_file") - dispatched == 1
+
+
+def test_queue_wait_is_observed_from_publish_header():
+    headers = {}
+    stamp_published_at(headers=headers)
+    stamp_published_at(headers=None)
+    before = _sample("etl_task_queue_wait_seconds_count", task="some_task")
+
+    task = SimpleNamespace(name="some_task", request=SimpleNamespace(published_at=headers["published_at"], eta=None))
+    observe_queue_wait(task=task)
+    # Tasks that waited on purpose or were never published are skipped
+    observe_queue_wait(task=SimpleNamespace(name="some_task", request=SimpleNamespace(published_at=time.time(), eta=1)))
+    observe_queue_wait(task=SimpleNamespace(name="some_task", request=SimpleNamespace()))
+
+    assert _sample("etl_task_queue_wait_seconds_count", task="some_task") - before == 1
+
+
+def test_worker_exporter_starts_only_with_a_port(settings):
+    with patch("core.tasks.monitoring.start_http_server") as mock_server:
+        settings.METRICS_WORKER_PORT = None
+        start_metrics_exporter()
+        mock_server.assert_not_called()
+
+        settings.METRICS_WORKER_PORT = 9100
+        start_metrics_exporter()
+        mock_server.assert_called_once_with(9100, registry=REGISTRY)
+
+
+def test_multiprocess_registry_aggregates_from_directory(tmp_path):
+    with patch("core.metrics.MULTIPROC_DIR", str(tmp_path)):
+        registry = metrics.get_registry()
+
+    assert isinstance(registry, CollectorRegistry)
+    assert registry is not REGISTRY
+
+
+def test_multiprocess_dir_is_created_on_import(tmp_path, monkeypatch):
+    """Test that the directory exists before any process writes its samples there."""
+    directory = tmp_path / "prometheus"
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(directory))
+    original = dict(vars(metrics))
+
+    try:
+        # Don't register the reloaded duplicates; the original collectors stay in place
+        with patch.object(REGISTRY, "register"):
+            importlib.reload(metrics)
+    finally:
+        vars(metrics).update(original)
+
+    assert directory.is_dir()
+    assert metrics.MULTIPROC_DIR is None
+
+
+def test_metrics_view_serves_prometheus_text():
+    response = metrics_view(RequestFactory().get("/metrics"))
+
+    assert response.status_code == 200  # noqa: PLR2004
+    assert response["Content-Type"].startswith("text/plain")
+    assert b"etl_rows_ingested_total" in response.content
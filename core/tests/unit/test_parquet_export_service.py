@@ -0,0 +1,198 @@
+"""
+Unit tests for the incremental, day-partitioned Parquet export.
+"""
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest.mock import MagicMock, patch
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.models import ExportWatermark, LabResult, PharmacyClaim
+from core.services.parquet_export_service import arrow_schema, export_parquet
+from core.services.processing_service import process_artifact
+from core.services.raw_ingestion_service import ingest_file_to_raw
+from core.tasks.maintenance import export_parquet_task
+
+
+def _ingest(name: str, *rows: str):
+    header = "claim_id,ncpdp_id,bin_number,service_date,total_amount_paid,transaction_code\n"
+    artifact = ingest_file_to_raw(ContentFile((header + "".join(f"{r}\n" for r in rows)).encode()), name, "pharmacy")
+    process_artifact(artifact.id)
+    return artifact
+
+
+def _age(seconds: int = 3600):
+    """Moves every claim's updated_at into the past, beyond the settle window."""
+    PharmacyClaim.objects.update(updated_at=timezone.now() - timedelta(seconds=seconds))
+
+
+def _day_file(tmp_path, day: str):
+    return tmp_path / "pharmacy" / f"service_date={day}" / "part-0.parquet"
+
+
+@pytest.mark.django_db
+def test_exports_one_file_per_day_with_row_groups_per_page(tmp_path):
+    _ingest("pharmacy/a.csv", *(f"C-{i},NCP1,BIN1,2024-01-0{i % 2 + 1},10.5,B1" for i in range(5)))
+    _age()
+
+    stats = export_parquet("pharmacy", str(tmp_path), page_size=2)
+
+    assert stats["days"] == 2  # noqa: PLR2004
+    assert stats["rows"] == 5  # noqa: PLR2004
+    assert stats["high_water_mark"] == ExportWatermark.objects.get().high_water_mark
+
+    parquet_file = pq.ParquetFile(_day_file(tmp_path, "2024-01-01"))
+    assert parquet_file.metadata.num_row_groups == 2  # noqa: PLR2004
+    table = parquet_file.read()
+    assert table.column("claim_id").to_pylist() == ["C-0", "C-2", "C-4"]
+    assert table.column("service_date").to_pylist()[0] == date(2024, 1, 1)
+    assert table.column("total_amount_paid").to_pylist()[0] == Decimal("10.50")
+    assert table.schema.field("total_amount_paid").type == pa.decimal128(10, 2)
+    assert pq.read_table(_day_file(tmp_path, "2024-01-02")).num_rows == 2  # noqa: PLR2004
+
+
+@pytest.mark.django_db
+def test_incremental_run_rewrites_only_changed_days(tmp_path):
+    _ingest("pharmacy/a.csv", "C-1,NCP1,BIN1,2024-01-01,10.00,B1", "C-2,NCP1,BIN1,2024-01-02,10.00,B1")
+    _age(7200)
+    export_parquet("pharmacy", str(tmp_path))
+    untouched_mtime = _day_file(tmp_path, "2024-01-01").stat().st_mtime_ns
+
+    assert export_parquet("pharmacy", str(tmp_path))["days"] == 0
+
+    # Re-ingesting a claim advances its updated_at; its day file is rebuilt with every claim of that day
+    _ingest("pharmacy/b.csv", "C-2,NCP1,BIN1,2024-01-02,12.00,B1", "C-3,NCP1,BIN1,2024-01-02,1.00,B1")
+    PharmacyClaim.objects.filter(claim_id__in=["C-2", "C-3"]).update(
+        updated_at=timezone.now() - timedelta(seconds=3600)
+    )
+    stats = export_parquet("pharmacy", str(tmp_path))
+
+    assert (stats["days"], stats["rows"]) == (1, 2)
+    table = pq.read_table(_day_file(tmp_path, "2024-01-02"))
+    assert sorted(
+        zip(table.column("claim_id").to_pylist(), table.column("total_amount_paid").to_pylist(), strict=True)
+    ) == [
+        ("C-2", Decimal("12.00")),
+        ("C-3", Decimal("1.00")),
+    ]
+    assert _day_file(tmp_path, "2024-01-01").stat().st_mtime_ns == untouched_mtime
+
+
+@pytest.mark.django_db
+def test_unsettled_changes_wait_for_the_next_run(tmp_path):
+    _ingest("pharmacy/a.csv", "C-1,NCP1,BIN1,2024-01-01,10.00,B1")
+
+    assert export_parquet("pharmacy", str(tmp_path))["days"] == 0
+    assert export_parquet("pharmacy", str(tmp_path), settle_seconds=0)["days"] == 1
+
+
+@pytest.mark.django_db
+def test_full_export_ignores_high_water_mark(tmp_path):
+    _ingest("pharmacy/a.csv", "C-1,NCP1,BIN1,2024-01-01,10.00,B1")
+    _age()
+    export_parquet("pharmacy", str(tmp_path))
+
+    assert export_parquet("pharmacy", str(tmp_path), full=True)["days"] == 1
+
+
+@pytest.mark.django_db
+def test_datetime_partitions_use_local_day(tmp_path, settings):
+    settings.TIME_ZONE = "America/New_York"
+    with timezone.override("America/New_York"):
+        LabResult.objects.create(
+            patient_id="P-1",
+            test_code="GLU",
+            test_name="Glucose",
+            result_value=Decimal("90.00"),
+            result_unit="mg/dL",
+            performed_at=timezone.make_aware(datetime(2024, 1, 1, 23, 30)),
+        )
+        LabResult.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+
+        export_parquet("lab_result", str(tmp_path))
+
+    table = pq.read_table(tmp_path / "lab_result" / "performed_at=2024-01-01" / "part-0.parquet")
+    assert table.column("patient_id").to_pylist() == ["P-1"]
+    assert table.schema.field("performed_at").type == pa.timestamp("us", tz="UTC")
+
+
+@pytest.mark.django_db
+def test_exports_to_s3_prefix():
+    _ingest("pharmacy/a.csv", "C-1,NCP1,BIN1,2024-01-01,10.00,B1")
+    _age()
+    s3 = MagicMock()
+
+    with patch("core.services.storage.get_client", return_value=s3):
+        export_parquet("pharmacy", "s3://analytics/etl")
+
+    call = s3.put_object.call_args.kwargs
+    assert call["Bucket"] == "analytics"
+    assert call["Key"] == "etl/pharmacy/service_date=2024-01-01/part-0.parquet"
+    assert ExportWatermark.objects.get().destination == "s3://analytics/etl"
+
+
+@pytest.mark.django_db
+def test_exports_to_s3_bucket_root():
+    _ingest("pharmacy/a.csv", "C-1,NCP1,BIN1,2024-01-01,10.00,B1")
+    _age()
+    payloads = []
+    s3 = MagicMock()
+    s3.put_object.side_effect = lambda Body, **kwargs: payloads.append(Body.read())  # noqa: N803
+
+    with patch("core.services.storage.get_client", return_value=s3):
+        export_parquet("pharmacy", "s3://analytics")
+
+    assert s3.put_object.call_args.kwargs["Key"] == "pharmacy/service_date=2024-01-01/part-0.parquet"
+    assert pq.read_table(BytesIO(payloads[0])).column("claim_id").to_pylist() == ["C-1"]
+
+
+def test_arrow_schema_is_stable_and_nullable_where_the_model_is():
+    schema = arrow_schema(PharmacyClaim)
+
+    assert schema.names[:2] == ["id", "claim_id"]
+    assert schema.field("artifact_id").type == pa.int64()
+    assert schema.field("artifact_id").nullable
+    assert not schema.field("claim_id").nullable
+    assert arrow_schema(User).field("is_active").type == pa.bool_()
+
+
+@pytest.mark.django_db
+def test_export_parquet_command(tmp_path):
+    _ingest("pharmacy/a.csv", "C-1,NCP1,BIN1,2024-01-01,10.00,B1")
+    out = StringIO()
+
+    call_command("export_parquet", str(tmp_path), "--type", "pharmacy", "--settle-seconds", "0", stdout=out)
+
+    assert "Days: 1, Rows: 1" in out.getvalue()
+    assert _day_file(tmp_path, "2024-01-01").exists()
+
+
+def test_export_parquet_command_unknown_type(tmp_path):
+    out = StringIO()
+    call_command("export_parquet", str(tmp_path), "--type", "nope", stdout=out)
+
+    assert "Unknown data type: nope" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_export_parquet_task(settings, tmp_path):
+    settings.PARQUET_EXPORT_DESTINATION = None
+    assert export_parquet_task.apply().get() == {}
+
+    _ingest("pharmacy/a.csv", "C-1,NCP1,BIN1,2024-01-01,10.00,B1")
+    settings.PARQUET_EXPORT_DESTINATION = str(tmp_path)
+    settings.PARQUET_EXPORT_TYPES = ["pharmacy", "audit"]
+    settings.PARQUET_EXPORT_SETTLE_SECONDS = 0
+
+    result = export_parquet_task.apply().get()
+
+    assert result["pharmacy"]["rows"] == 1
+    assert result["audit"]["rows"] == 0
@@ -29,6 +29,8 @@ def test_process_artifact_success():
     assert PharmacyClaim.objects.filter(claim_id="C999").exists()
     row = RawData.objects.get(artifact=artifact, row_index=1)
     assert row.status == "PROCESSED"
+    artifact.refresh_from_db()
+    assert artifact.processed_at is not None
 
 
 @pytest.mark.django_db
@@ -112,3 +114,67 @@ def test_process_artifact_runtime_exception():
     row = RawData.objects.get(artifact=artifact, row_index=1)
     assert row.status == "FAILED"
     assert "Runtime Boom" in row.error_message
+
+
+def _claim_row(artifact, row_index):
+    return RawData.objects.create(
+        artifact=artifact,
+        row_index=row_index,
+        data={
+            "claim_id": f"S{row_index}",
+            "ncpdp_id": "NCPDP99",
+            "bin_number": "BIN99",
+            "service_date": "2023-12-31",
+            "total_amount_paid": "9.99",
+            "transaction_code": "T99",
+        },
+    )
+
+
+@pytest.mark.django_db
+def test_process_artifact_follows_ingestion_watermark(settings):
+    """Test that only committed rows are processed and the artifact completes once both stages drain."""
+    settings.STREAMING_HANDOFF_POLL_INTERVAL = 0
+    artifact = Artifact.objects.create(file="stream.csv", content_type="pharmacy", status=Artifact.PROCESSING)
+    _claim_row(artifact, 1)
+    _claim_row(artifact, 2)
+    Artifact.objects.filter(id=artifact.id).update(committed_rows=1)
+    processed_before_commit = []
+
+    def ingest_remaining_rows(seconds):
+        # Row 2 exists but is above the watermark until ingestion commits the rest of the file
+        processed_before_commit.append(RawData.objects.get(artifact=artifact, row_index=2).status)
+        _claim_row(artifact, 3)
+        Artifact.objects.filter(id=artifact.id).update(committed_rows=3, ingestion_complete=True)
+
+    with patch("core.services.processing_service.time.sleep", side_effect=ingest_remaining_rows):
+        assert process_artifact(artifact.id, follow_ingestion=True) == (3, 0)
+
+    assert processed_before_commit == [RawData.PENDING]
+    artifact.refresh_from_db()
+    assert artifact.status == Artifact.COMPLETED
+    assert artifact.processed_at is not None
+
+
+@pytest.mark.django_db
+def test_process_artifact_follow_stops_on_failed_ingestion():
+    artifact = Artifact.objects.create(file="stream.csv", content_type="pharmacy", status=Artifact.FAILED)
+    _claim_row(artifact, 1)
+    Artifact.objects.filter(id=artifact.id).update(committed_rows=1)
+
+    assert process_artifact(artifact.id, follow_ingestion=True) == (0, 0)
+    assert not PharmacyClaim.objects.exists()
+
+
+@pytest.mark.django_db
+def test_process_artifact_follow_gives_up_on_stalled_ingestion(settings):
+    settings.STREAMING_HANDOFF_IDLE_TIMEOUT = 0
+    artifact = Artifact.objects.create(file="stream.csv", content_type="pharmacy", status=Artifact.PROCESSING)
+
+    with patch("core.services.processing_service.logger") as mock_logger:
+        assert process_artifact(artifact.id, follow_ingestion=True) == (0, 0)
+
+    mock_logger.warning.assert_called_once()
+    artifact.refresh_from_db()
+    assert artifact.status == Artifact.FAILED
+    assert artifact.processed_at is None
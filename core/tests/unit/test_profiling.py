@@ -0,0 +1,134 @@
+"""
+Unit tests for the opt-in per-stage profiling hooks.
+"""
+
+import json
+import logging
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.core.files.base import ContentFile
+
+from core import profiling
+from core.models import Artifact
+from core.services.processing_service import process_artifact
+from core.services.raw_ingestion_service import ingest_file_to_raw
+from core.tasks import process_artifact_task, process_s3_file
+
+CSV = b"claim_id,ncpdp_id,bin_number,service_date,total_amount_paid,transaction_code\n" + b"".join(
+    f"P-{i},NCP1,BIN1,2024-01-01,10.00,B1\n".encode() for i in range(5)
+)
+
+
+@pytest.fixture
+def profile_logs(caplog):
+    caplog.set_level(logging.INFO, logger="core.profiling")
+    return caplog
+
+
+def _stages(caplog) -> dict[str, dict]:
+    return {
+        record.getMessage().split("[")[1].split("]")[0]: json.loads(record.getMessage().split("]: ")[1])
+        for record in caplog.records
+        if record.name == "core.profiling" and "]: " in record.getMessage()
+    }
+
+
+def test_stage_is_a_noop_without_profile(settings):
+    settings.PIPELINE_PROFILING = False
+
+    with profiling.profile("off") as profiler, profiling.stage("anything"):
+        pass
+
+    assert profiler is None
+
+
+@pytest.mark.django_db
+def test_profile_records_stages_batches_and_queries(profile_logs):
+    with profiling.profile("pipeline", enabled=True) as profiler:
+        artifact = ingest_file_to_raw(ContentFile(CSV), "pharmacy/p.csv", "pharmacy")
+        process_artifact(artifact.id)
+
+    stages = profiler.stages
+    assert set(stages) == {
+        "ingest_file_to_raw",
+        "raw_insert",
+        "process_artifact",
+        "fetch_rows",
+        "prepare_batch",
+        "flush_batch",
+    }
+    assert stages["raw_insert"]["rows"] == 5  # noqa: PLR2004
+    assert stages["prepare_batch"]["queries"] == 0
+    assert stages["flush_batch"]["queries"] >= 2  # noqa: PLR2004
+    assert stages["flush_batch"]["query_bytes"] > 0
+    # Nested stages count the same query: the outer stage sees at least what its children see
+    assert stages["process_artifact"]["queries"] >= stages["flush_batch"]["queries"]
+    assert stages["process_artifact"]["cpu_seconds"] >= 0
+    assert [batch["stage"] for batch in profiler.batches].count("fetch_rows") == 2  # noqa: PLR2004
+
+    assert _stages(profile_logs)["flush_batch"]["calls"] == 1
+
+
+@pytest.mark.django_db
+def test_nested_profile_reports_into_outer(settings):
+    settings.PIPELINE_PROFILING = True
+
+    with profiling.profile("outer") as outer, profiling.profile("inner") as inner, profiling.stage("work", rows=3):
+        pass
+
+    assert inner is outer
+    assert outer.stages["work"]["rows"] == 3  # noqa: PLR2004
+
+
+@pytest.mark.django_db
+def test_sampled_profile_dumps_report_cprofile_and_tracemalloc(settings, tmp_path):
+    settings.PIPELINE_PROFILING_DUMP_DIR = str(tmp_path / "profiles")
+    settings.PIPELINE_PROFILING_DUMP_SAMPLE_RATE = 1.0
+
+    with profiling.profile("s3://bucket/pharmacy/a b.csv", enabled=True), profiling.stage("work", rows=1):
+        Artifact.objects.count()
+
+    dumps = sorted(path.suffix for path in (tmp_path / "profiles").iterdir())
+    assert dumps == [".json", ".prof", ".tracemalloc"]
+
+    report_path = next((tmp_path / "profiles").glob("*.json"))
+    assert report_path.name.startswith("s3_bucket_pharmacy_a_b.csv.")
+    report = json.loads(report_path.read_text())
+    assert report["batches"][0]["queries"] == 1
+
+
+def test_unsampled_profile_does_not_dump(settings, tmp_path):
+    settings.PIPELINE_PROFILING_DUMP_DIR = str(tmp_path)
+    settings.PIPELINE_PROFILING_DUMP_SAMPLE_RATE = 0.0
+
+    with profiling.profile("quiet", enabled=True), profiling.stage("work"):
+        pass
+
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.django_db
+def test_process_s3_file_profile_argument(settings, profile_logs):
+    """Test that profile=True enables profiling for one task regardless of PIPELINE_PROFILING."""
+    settings.PIPELINE_PROFILING = False
+    s3 = MagicMock()
+    s3.get_object.return_value = {"Body": MagicMock(read=MagicMock(return_value=CSV))}
+
+    with (
+        patch("core.tasks.s3_processing.get_client", return_value=s3),
+        patch("core.tasks.s3_processing.process_artifact_task"),
+    ):
+        process_s3_file.apply(kwargs={"bucket_name": "b", "object_key": "pharmacy/p.csv", "profile": True}).get()
+
+    assert {"s3_download", "ingest_file_to_raw", "raw_insert"} <= set(_stages(profile_logs))
+
+
+@pytest.mark.django_db
+def test_process_artifact_task_profiled_by_setting(settings, profile_logs):
+    settings.PIPELINE_PROFILING = True
+    artifact = ingest_file_to_raw(ContentFile(CSV), "pharmacy/p.csv", "pharmacy")
+
+    process_artifact_task.apply(args=[artifact.id]).get()
+
+    assert _stages(profile_logs)["prepare_batch"]["rows"] == 5  # noqa: PLR2004
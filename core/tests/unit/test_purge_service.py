@@ -0,0 +1,185 @@
+"""
+Unit tests for the RawData purge/archival pipeline.
+"""
+
+import gzip
+import json
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.models import Artifact, RawData
+from core.services.purge_service import purge_processed_raw_data
+from core.tasks.maintenance import purge_raw_data_task
+
+ROWS_PER_ARTIFACT = 3
+CHUNK_SIZE = 2
+
+
+def _make_artifact(status=Artifact.COMPLETED, processed=ROWS_PER_ARTIFACT, failed=0, processed_at=True):
+    artifact = Artifact.objects.create(
+        file="purge.csv",
+        content_type="pharmacy",
+        status=status,
+        processed_at=timezone.now() if processed_at else None,
+    )
+    for i in range(processed):
+        RawData.objects.create(artifact=artifact, row_index=i, data={"n": i}, status=RawData.PROCESSED)
+    for i in range(failed):
+        RawData.objects.create(
+            artifact=artifact, row_index=processed + i, data={}, status=RawData.FAILED, error_message="bad"
+        )
+    return artifact
+
+
+@pytest.mark.django_db
+def test_purge_only_processed_rows_of_processed_artifacts(tmp_path):
+    """Test that FAILED rows, non-COMPLETED and not yet processed artifacts are left untouched."""
+    completed = _make_artifact(failed=1)
+    in_progress = _make_artifact(status=Artifact.PROCESSING)
+    # Streaming off: COMPLETED once ingested, while process_artifact may still need the rows
+    unprocessed = _make_artifact(processed_at=False)
+
+    stats = purge_processed_raw_data(chunk_size=CHUNK_SIZE, archive_to=str(tmp_path))
+
+    assert stats == {"artifacts": 1, "chunks": 2, "rows": ROWS_PER_ARTIFACT}
+    assert list(completed.raw_rows.values_list("status", flat=True)) == [RawData.FAILED]
+    assert in_progress.raw_rows.count() == ROWS_PER_ARTIFACT
+    assert unprocessed.raw_rows.count() == ROWS_PER_ARTIFACT
+
+
+@pytest.mark.django_db
+def test_purge_keeps_success_count():
+    artifact = _make_artifact(failed=1)
+
+    purge_processed_raw_data(chunk_size=CHUNK_SIZE)
+
+    artifact.refresh_from_db()
+    assert artifact.purged_count == ROWS_PER_ARTIFACT
+    assert (artifact.success_count, artifact.failure_count) == (ROWS_PER_ARTIFACT, 1)
+
+
+@pytest.mark.django_db
+def test_purge_writes_gzipped_ndjson_archives(tmp_path):
+    """Test that every purged row ends up in a compressed archive on disk."""
+    artifact = _make_artifact()
+
+    purge_processed_raw_data(chunk_size=CHUNK_SIZE, archive_to=str(tmp_path))
+
+    archives = sorted((tmp_path / f"artifact_{artifact.id}").glob("*.ndjson.gz"))
+    assert len(archives) == 2  # noqa: PLR2004
+
+    rows = [json.loads(line) for path in archives for line in gzip.decompress(path.read_bytes()).splitlines()]
+    assert sorted(row["data"]["n"] for row in rows) == [0, 1, 2]
+
+
+@pytest.mark.django_db
+def test_purge_without_archive_deletes_rows():
+    artifact = _make_artifact()
+
+    stats = purge_processed_raw_data(chunk_size=CHUNK_SIZE)
+
+    assert stats["rows"] == ROWS_PER_ARTIFACT
+    assert not artifact.raw_rows.exists()
+
+
+@pytest.mark.django_db
+def test_purge_archives_to_s3():
+    """Test that s3:// destinations are written with put_object under the given prefix."""
+    artifact = _make_artifact(processed=1)
+
+    with patch("core.services.storage.get_client") as mock_client:
+        purge_processed_raw_data(archive_to="s3://archive-bucket/raw")
+
+    mock_client.return_value.put_object.assert_called_once()
+    kwargs = mock_client.return_value.put_object.call_args.kwargs
+    assert kwargs["Bucket"] == "archive-bucket"
+    assert kwargs["Key"].startswith(f"raw/artifact_{artifact.id}/")
+    # Stored as a .gz file: a Content-Encoding header would make HTTP clients decompress it on download
+    assert kwargs["ContentType"] == "application/gzip"
+    assert "ContentEncoding" not in kwargs
+
+
+@pytest.mark.django_db
+def test_purge_max_chunks_and_rerun():
+    """Test that a bounded run stops early and a rerun picks up every artifact that still has rows."""
+    first = _make_artifact(processed=1)
+    second = _make_artifact(processed=1)
+
+    stats = purge_processed_raw_data(max_chunks=1)
+
+    assert stats["rows"] == 1
+    assert not first.raw_rows.exists()
+    assert second.raw_rows.exists()
+
+    with patch("core.services.purge_service.time.sleep") as mock_sleep:
+        stats = purge_processed_raw_data(sleep_seconds=0.1)
+
+    assert stats == {"artifacts": 1, "chunks": 1, "rows": 1}
+    assert not RawData.objects.exists()
+    mock_sleep.assert_called_once_with(0.1)
+
+
+@pytest.mark.django_db
+def test_purge_picks_up_artifacts_finishing_out_of_order():
+    """Test that a lower-id artifact processed after a higher-id one is still purged."""
+    slow = _make_artifact(processed=1, processed_at=False)
+    _make_artifact(processed=1)
+
+    assert purge_processed_raw_data()["artifacts"] == 1
+
+    Artifact.objects.filter(id=slow.id).update(processed_at=timezone.now())
+
+    assert purge_processed_raw_data() == {"artifacts": 1, "chunks": 1, "rows": 1}
+    assert not slow.raw_rows.exists()
+
+
+@pytest.mark.django_db
+def test_purge_command_requires_archive_choice():
+    _make_artifact()
+
+    out = StringIO()
+    call_command("purge_raw_data", stdout=out)
+
+    assert "Refusing to delete" in out.getvalue()
+    assert RawData.objects.count() == ROWS_PER_ARTIFACT
+
+
+@pytest.mark.django_db
+def test_purge_command_success(tmp_path):
+    _make_artifact()
+
+    out = StringIO()
+    call_command("purge_raw_data", "--archive-to", str(tmp_path), "--chunk-size", "10", stdout=out)
+
+    assert "Purge complete. Rows: 3, Chunks: 1, Artifacts: 1" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_purge_raw_data_task(settings, tmp_path):
+    settings.RAW_DATA_PURGE_ARCHIVE_TO = str(tmp_path)
+    settings.RAW_DATA_PURGE_SLEEP_SECONDS = 0
+    _make_artifact()
+
+    result = purge_raw_data_task.apply(kwargs={"max_chunks": 5}).get()
+
+    assert result["rows"] == ROWS_PER_ARTIFACT
+    assert list(tmp_path.glob("artifact_*/*.ndjson.gz"))
+
+
+@pytest.mark.django_db
+def test_purge_raw_data_task_requires_archive_choice(settings):
+    settings.RAW_DATA_PURGE_ARCHIVE_TO = None
+    settings.RAW_DATA_PURGE_NO_ARCHIVE = False
+    settings.RAW_DATA_PURGE_SLEEP_SECONDS = 0
+    _make_artifact()
+
+    assert purge_raw_data_task.apply().get() == {}
+    assert RawData.objects.count() == ROWS_PER_ARTIFACT
+
+    settings.RAW_DATA_PURGE_NO_ARCHIVE = True
+
+    assert purge_raw_data_task.apply().get()["rows"] == ROWS_PER_ARTIFACT
@@ -2,6 +2,8 @@ from unittest.mock import patch
 
 import pytest
 from django.core.files.base import ContentFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from core.models import Artifact, RawData
 from core.services.raw_ingestion_service import ingest_file_to_raw
@@ -86,3 +88,78 @@ def test_ingest_file_to_raw_no_seek():
 
     assert artifact.status == "COMPLETED"
     assert RawData.objects.filter(artifact=artifact).count() == 1
+
+
+@pytest.mark.django_db
+def test_ingest_file_to_raw_publishes_watermark_and_hands_off():
+    """Test that the handoff sees the new artifact first and leaves completion to processing."""
+    csv_content = "claim_id\nC1\nC2\nC3"
+    file_obj = ContentFile(csv_content.encode("utf-8"), name="stream.csv")
+    handed_off = []
+    watermarks = []
+    bulk_create = RawData.objects.bulk_create
+
+    def handoff(artifact):
+        handed_off.append((artifact.id, RawData.objects.filter(artifact=artifact).count()))
+
+    def record_watermark(rows):
+        watermarks.append(Artifact.objects.get(id=rows[0].artifact_id).committed_rows)
+        return bulk_create(rows)
+
+    with (
+        patch("core.services.raw_ingestion_service.BATCH_SIZE", BATCH_TEST_SIZE),
+        patch("core.models.RawData.objects.bulk_create", side_effect=record_watermark),
+    ):
+        artifact = ingest_file_to_raw(file_obj, "stream.csv", "pharmacy", handoff=handoff)
+
+    assert handed_off == [(artifact.id, 0)]
+    # The second batch is written once the first one is published as committed
+    assert watermarks == [0, BATCH_TEST_SIZE]
+    artifact.refresh_from_db()
+    assert artifact.status == Artifact.PROCESSING
+    assert artifact.committed_rows == TOTAL_BATCH_ITEMS
+    assert artifact.ingestion_complete is True
+
+
+@pytest.mark.django_db
+def test_ingest_file_to_raw_keeps_status_set_by_follower():
+    """Test that completing ingestion does not revive an artifact the follower gave up on."""
+    file_obj = ContentFile(b"claim_id\nC1", name="stream.csv")
+
+    def handoff(artifact):
+        Artifact.objects.filter(id=artifact.id).update(status=Artifact.FAILED)
+
+    artifact = ingest_file_to_raw(file_obj, "stream.csv", "pharmacy", handoff=handoff)
+
+    artifact.refresh_from_db()
+    assert artifact.status == Artifact.FAILED
+    assert artifact.ingestion_complete is True
+
+
+@pytest.mark.django_db
+def test_ingest_file_to_raw_fails_artifact_when_handoff_fails():
+    """Test that a failed follower publish fails the artifact instead of leaving it PROCESSING."""
+    file_obj = ContentFile(b"claim_id\nC1", name="stream.csv")
+
+    def handoff(artifact):
+        raise ConnectionError("Broker Down")
+
+    artifact = ingest_file_to_raw(file_obj, "stream.csv", "pharmacy", handoff=handoff)
+
+    assert artifact.status == Artifact.FAILED
+    assert not RawData.objects.exists()
+
+
+@pytest.mark.django_db
+def test_ingest_file_to_raw_skips_watermark_updates_without_follower():
+    file_obj = ContentFile(b"claim_id\nC1\nC2\nC3", name="plain.csv")
+
+    with (
+        patch("core.services.raw_ingestion_service.BATCH_SIZE", BATCH_TEST_SIZE),
+        CaptureQueriesContext(connection) as queries,
+    ):
+        artifact = ingest_file_to_raw(file_obj, "plain.csv", "pharmacy")
+
+    watermark_updates = [q for q in queries if q["sql"].startswith("UPDATE") and "committed_rows" in q["sql"]]
+    assert len(watermark_updates) == 1  # the final save only
+    assert artifact.committed_rows == TOTAL_BATCH_ITEMS
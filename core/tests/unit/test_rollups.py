@@ -0,0 +1,266 @@
+"""
+Unit tests for the incrementally maintained daily rollups and their rebuild command.
+"""
+
+import threading
+from datetime import UTC, date, datetime, timedelta, timezone
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection, transaction
+
+from core.models import AuditRecord, LabResult, PharmacyClaim, PharmacyDailyTotal, ProviderDailyTotal, RawData
+from core.services.processing_service import _flush_batch, get_update_fields, process_artifact
+from core.services.raw_ingestion_service import ingest_file_to_raw
+from core.strategies.audit_record import AuditRecordStrategy
+from core.strategies.lab_result import LabResultStrategy
+from core.strategies.pharmacy_claim import PharmacyClaimStrategy
+
+PHARMACY_HEADER = "claim_id,ncpdp_id,bin_number,service_date,total_amount_paid,transaction_code\n"
+AUDIT_HEADER = "provider_npi,billing_amount,service_date,status\n"
+
+
+def _ingest(content_type: str, header: str, *rows: str):
+    content = (header + "".join(f"{row}\n" for row in rows)).encode()
+    artifact = ingest_file_to_raw(ContentFile(content), f"{content_type}/{len(rows)}.csv", content_type)
+    return process_artifact(artifact.id)
+
+
+def _totals(model, key_field: str) -> dict[tuple, tuple]:
+    return {
+        (row.service_date.isoformat(), getattr(row, key_field)): (row.record_count, row.total_amount)
+        for row in model.objects.all()
+        if row.record_count or row.total_amount
+    }
+
+
+def _pharmacy_totals():
+    return _totals(PharmacyDailyTotal, "ncpdp_id")
+
+
+@pytest.mark.django_db
+def test_inserts_add_to_daily_totals_per_pharmacy():
+    _ingest(
+        "pharmacy",
+        PHARMACY_HEADER,
+        "C-1,NCP1,BIN1,2024-01-01,10.00,B1",
+        "C-2,NCP1,BIN1,2024-01-01,5.25,B1",
+        "C-3,NCP2,BIN1,2024-01-01,1.00,B1",
+        "C-4,NCP1,BIN1,2024-01-02,2.00,B1",
+    )
+
+    assert _pharmacy_totals() == {
+        ("2024-01-01", "NCP1"): (2, Decimal("15.25")),
+        ("2024-01-01", "NCP2"): (1, Decimal("1.00")),
+        ("2024-01-02", "NCP1"): (1, Decimal("2.00")),
+    }
+
+
+@pytest.mark.django_db
+def test_updates_apply_deltas_and_move_between_groups():
+    _ingest("pharmacy", PHARMACY_HEADER, "C-1,NCP1,BIN1,2024-01-01,10.00,B1", "C-2,NCP1,BIN1,2024-01-01,5.00,B1")
+
+    # C-1 changes amount, C-2 moves to another pharmacy and day, C-3 is new
+    _ingest(
+        "pharmacy",
+        PHARMACY_HEADER,
+        "C-1,NCP1,BIN1,2024-01-01,12.50,B1",
+        "C-2,NCP2,BIN1,2024-01-03,5.00,B1",
+        "C-3,NCP1,BIN1,2024-01-01,1.00,B1",
+    )
+
+    assert _pharmacy_totals() == {
+        ("2024-01-01", "NCP1"): (2, Decimal("13.50")),
+        ("2024-01-03", "NCP2"): (1, Decimal("5.00")),
+    }
+
+
+@pytest.mark.django_db
+def test_reprocessing_identical_rows_leaves_totals_unchanged():
+    row = "C-1,NCP1,BIN1,2024-01-01,10.00,B1"
+    _ingest("pharmacy", PHARMACY_HEADER, row)
+    _ingest("pharmacy", PHARMACY_HEADER, row, "C-2,NCP1,BIN1,2024-01-01,0.01,B1")
+
+    assert _pharmacy_totals() == {("2024-01-01", "NCP1"): (2, Decimal("10.01"))}
+
+
+@pytest.mark.django_db
+def test_audit_totals_per_provider_with_composite_identity():
+    _ingest("audit", AUDIT_HEADER, "1234567890,100.00,2024-01-01,open", "1234567890,50.00,2024-01-01,open")
+    # Same identity (provider, date, amount): only the status changes
+    _ingest("audit", AUDIT_HEADER, "1234567890,100.00,2024-01-01,closed")
+
+    assert _totals(ProviderDailyTotal, "provider_npi") == {("2024-01-01", "1234567890"): (2, Decimal("150.00"))}
+
+
+@pytest.mark.django_db
+def test_deltas_use_the_stored_precision():
+    _ingest("pharmacy", PHARMACY_HEADER, "C-1,NCP1,BIN1,2024-01-01,10.005,B1", "C-2,NCP1,BIN1,2024-01-01,1.004,B1")
+    incremental = _pharmacy_totals()
+
+    PharmacyClaimStrategy.rollup.rebuild()
+
+    assert incremental == _pharmacy_totals() == {("2024-01-01", "NCP1"): (2, Decimal("11.01"))}
+
+
+@pytest.mark.django_db
+def test_failed_flush_rolls_back_rollup():
+    with (
+        patch.object(RawData.objects, "bulk_update", side_effect=RuntimeError("boom")),
+        pytest.raises(RuntimeError),
+    ):
+        _ingest("pharmacy", PHARMACY_HEADER, "C-1,NCP1,BIN1,2024-01-01,10.00,B1")
+
+    assert not PharmacyDailyTotal.objects.exists()
+
+
+@pytest.mark.django_db
+def test_rebuild_restores_totals_within_date_range():
+    _ingest(
+        "pharmacy",
+        PHARMACY_HEADER,
+        "C-1,NCP1,BIN1,2024-01-01,10.00,B1",
+        "C-2,NCP1,BIN1,2024-01-02,5.00,B1",
+    )
+    expected = _pharmacy_totals()
+    PharmacyDailyTotal.objects.update(record_count=99, total_amount=0)
+
+    assert PharmacyClaimStrategy.rollup.rebuild(start=date(2024, 1, 2), end=date(2024, 1, 2)) == 1
+    assert PharmacyDailyTotal.objects.get(service_date=date(2024, 1, 1)).record_count == 99  # noqa: PLR2004
+
+    assert PharmacyClaimStrategy.rollup.rebuild() == 2  # noqa: PLR2004
+    assert _pharmacy_totals() == expected
+
+
+@pytest.mark.django_db
+def test_rebuild_rollups_command():
+    _ingest("pharmacy", PHARMACY_HEADER, "C-1,NCP1,BIN1,2024-01-01,10.00,B1")
+    _ingest("audit", AUDIT_HEADER, "1234567890,100.00,2024-01-01,open")
+    PharmacyDailyTotal.objects.all().delete()
+    ProviderDailyTotal.objects.all().delete()
+
+    out = StringIO()
+    call_command("rebuild_rollups", stdout=out)
+
+    assert "Rebuilt PharmacyDailyTotal from pharmacy: 1 rollup rows" in out.getvalue()
+    assert "Rebuilt ProviderDailyTotal from audit: 1 rollup rows" in out.getvalue()
+    assert PharmacyDailyTotal.objects.get().total_amount == Decimal("10.00")
+
+    out = StringIO()
+    call_command("rebuild_rollups", "--type", "audit", "--start", "2024-01-01", "--end", "2024-01-31", stdout=out)
+    assert "PharmacyDailyTotal" not in out.getvalue()
+    assert "Rebuilt ProviderDailyTotal" in out.getvalue()
+
+
+def test_rebuild_rollups_command_unknown_type():
+    out = StringIO()
+    call_command("rebuild_rollups", "--type", "lab_result", stdout=out)
+
+    assert "No rollup for data type: lab_result" in out.getvalue()
+
+
+def test_strategies_without_rollup_or_identity_capture_nothing():
+    assert LabResultStrategy().before_flush([LabResult()]) is None
+    assert PharmacyClaimStrategy.rollup.capture([PharmacyClaim()], unique_fields=[]) == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_flushes_inserting_the_same_record_count_it_once():
+    """Test that a flush inserting a record another open flush is inserting waits and sees it as an update."""
+    strategy = PharmacyClaimStrategy()
+    update_fields = get_update_fields(strategy)
+    first_applied, release_first = threading.Event(), threading.Event()
+
+    def flush(amount: str, hold: bool):
+        claim = PharmacyClaim(
+            claim_id="C-1",
+            ncpdp_id="NCP1",
+            bin_number="BIN1",
+            service_date=date(2024, 1, 1),
+            total_amount_paid=Decimal(amount),
+            transaction_code="B1",
+        )
+        try:
+            with transaction.atomic():
+                _flush_batch(strategy, [claim], [], [], update_fields)
+                if hold:
+                    first_applied.set()
+                    release_first.wait(5)
+        finally:
+            connection.close()
+
+    first = threading.Thread(target=flush, args=("10.00", True))
+    first.start()
+    assert first_applied.wait(5)
+
+    second = threading.Thread(target=flush, args=("12.00", False))
+    second.start()
+    second.join(0.5)
+    # Blocked on the key lock until the first flush commits
+    assert second.is_alive()
+
+    release_first.set()
+    first.join(5)
+    second.join(5)
+
+    assert PharmacyClaim.objects.count() == 1
+    assert _pharmacy_totals() == {("2024-01-01", "NCP1"): (1, Decimal("12.00"))}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_flushes_of_one_record_written_in_different_forms_count_it_once():
+    """Test that 100.5 and 100.50 take the same key lock, as they upsert the same row."""
+    strategy = AuditRecordStrategy()
+    update_fields = get_update_fields(strategy)
+    first_applied, release_first = threading.Event(), threading.Event()
+
+    def flush(amount: str, hold: bool):
+        record = AuditRecord(
+            provider_npi="NPI1", service_date=date(2024, 1, 1), billing_amount=Decimal(amount), status="OPEN"
+        )
+        try:
+            with transaction.atomic():
+                _flush_batch(strategy, [record], [], [], update_fields)
+                if hold:
+                    first_applied.set()
+                    release_first.wait(5)
+        finally:
+            connection.close()
+
+    first = threading.Thread(target=flush, args=("100.5", True))
+    first.start()
+    assert first_applied.wait(5)
+
+    second = threading.Thread(target=flush, args=("100.50", False))
+    second.start()
+    second.join(0.5)
+    release_first.set()
+    first.join(5)
+    second.join(5)
+
+    assert AuditRecord.objects.count() == 1
+    assert _totals(ProviderDailyTotal, "provider_npi") == {("2024-01-01", "NPI1"): (1, Decimal("100.50"))}
+
+
+def test_lock_key_normalizes_values_as_stored():
+    rollup = AuditRecordStrategy.rollup
+    fields = [AuditRecord._meta.get_field(field) for field in AuditRecordStrategy.unique_fields]
+
+    def key(**values):
+        record = {"provider_npi": "NPI1", "service_date": date(2024, 1, 1), "billing_amount": Decimal("100.5")}
+        return rollup._lock_key(AuditRecord(**{**record, **values}), fields)
+
+    assert key() == key(billing_amount=Decimal("100.50")) == key(billing_amount="100.500")
+    assert key() != key(billing_amount=Decimal("100.51"))
+
+    # Same instant in two time zones
+    utc = datetime(2024, 1, 1, 12, tzinfo=UTC)
+    eastern = utc.astimezone(timezone(timedelta(hours=-5)))
+    performed_at = [LabResult._meta.get_field("performed_at")]
+    assert rollup._lock_key(LabResult(performed_at=utc), performed_at) == rollup._lock_key(
+        LabResult(performed_at=eastern), performed_at
+    )
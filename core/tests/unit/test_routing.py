@@ -0,0 +1,30 @@
+"""
+Unit tests for size-aware ingestion lane routing.
+"""
+
+import pytest
+
+from core.tasks.routing import lane_queues, queue_for_size
+
+
+@pytest.fixture(autouse=True)
+def lanes(settings):
+    settings.INGESTION_QUEUE_LANES = [(100, "tiny"), (1000, "medium"), (None, "large")]
+    settings.CELERY_TASK_DEFAULT_QUEUE = "default"
+
+
+@pytest.mark.parametrize(
+    "size, expected_queue",
+    [(0, "tiny"), (100, "tiny"), (101, "medium"), (1000, "medium"), (10**10, "large"), (None, "default")],
+)
+def test_queue_for_size(size, expected_queue):
+    assert queue_for_size(size) == expected_queue
+
+
+def test_sizes_beyond_last_bounded_lane_use_default(settings):
+    settings.INGESTION_QUEUE_LANES = [(100, "tiny")]
+    assert queue_for_size(101) == "default"
+
+
+def test_lane_queues():
+    assert lane_queues() == ["tiny", "medium", "large"]
@@ -0,0 +1,114 @@
+"""
+Unit tests for the memoized schema types: results and errors must match Pydantic's own parsers.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from pydantic import TypeAdapter, ValidationError
+
+from core.schemas import PharmacyClaimSchema
+from core.schemas.types import CachedDate, CachedDatetime, CachedDecimal, parse_date
+
+INPUTS = {
+    (date, CachedDate): [
+        "2024-01-31",
+        "2024-02-30",
+        "2024-1-5",
+        "20240131",
+        "2024-01-31T00:00:00",
+        "1706659200",
+        " 2024-01-31",
+        "not-a-date",
+        "",
+        date(2024, 1, 31),
+        datetime(2024, 1, 31),
+        19753,
+    ],
+    (datetime, CachedDatetime): [
+        "2024-01-01T12:00:00Z",
+        "2024-01-01T12:00:00.123456+05:30",
+        "2024-01-01T12:00:00-08:00",
+        "2024-01-01 12:00:00",
+        "2024-01-01T12:00:00",
+        "2024-01-01T12:00:00.1234567Z",
+        "2024-01-01T24:00:00",
+        "2024-01-01",
+        "2024-01-01T12:00Z",
+        "1704110400",
+        "yesterday",
+        datetime(2024, 1, 1, 12),
+    ],
+    (Decimal, CachedDecimal): [
+        "10.50",
+        "010",
+        "-0",
+        "0",
+        "1e3",
+        " 5 ",
+        "+5",
+        "1_000",
+        "NaN",
+        "inf",
+        "12AB",
+        "",
+        10,
+        1.5,
+        Decimal("2.50"),
+    ],
+}
+
+
+def _outcome(adapter, value):
+    try:
+        result = adapter.validate_python(value)
+    except ValidationError as error:
+        return "error", [(e["type"], e["msg"]) for e in error.errors()]
+    return "ok", result, type(result), str(result), getattr(result, "tzinfo", None).__class__
+
+
+@pytest.mark.parametrize(
+    ("plain", "cached", "value"),
+    [(plain, cached, value) for (plain, cached), values in INPUTS.items() for value in values],
+)
+def test_cached_types_match_pydantic(plain, cached, value):
+    expected = _outcome(TypeAdapter(plain), value)
+    adapter = TypeAdapter(cached)
+
+    # Twice: the second call is served from the cache
+    assert _outcome(adapter, value) == expected
+    assert _outcome(adapter, value) == expected
+
+
+def test_parse_cache_hits():
+    parse_date.cache_clear()
+
+    for _ in range(3):
+        PharmacyClaimSchema.model_validate(
+            {
+                "claim_id": "C1",
+                "ncpdp_id": "1234567",
+                "bin_number": "610014",
+                "service_date": "2024-03-01",
+                "total_amount_paid": "10.00",
+                "transaction_code": "B1",
+            }
+        )
+
+    info = parse_date.cache_info()
+    assert (info.hits, info.misses) == (2, 1)
+
+
+def test_schema_validators_still_apply():
+    with pytest.raises(ValidationError, match="must be positive"):
+        PharmacyClaimSchema.model_validate(
+            {
+                "claim_id": "C1",
+                "ncpdp_id": "1234567",
+                "bin_number": "610014",
+                "service_date": "2024-03-01",
+                "total_amount_paid": "-1.00",
+                "transaction_code": "B1",
+            }
+        )
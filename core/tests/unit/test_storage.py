@@ -0,0 +1,41 @@
+"""
+Unit tests for the shared archive/export writer.
+"""
+
+from io import BytesIO
+from unittest.mock import patch
+
+from core.services.storage import build_writer
+
+
+def test_writes_to_local_directory(tmp_path):
+    write = build_writer(str(tmp_path))
+
+    location = write("a/b/part-0.parquet", BytesIO(b"first"))
+    write("a/b/part-0.parquet", BytesIO(b"second"))
+
+    assert location == str(tmp_path / "a" / "b" / "part-0.parquet")
+    assert (tmp_path / "a" / "b" / "part-0.parquet").read_bytes() == b"second"
+    assert [path.name for path in (tmp_path / "a" / "b").iterdir()] == ["part-0.parquet"]
+
+
+def test_writes_to_s3_prefix_with_content_type():
+    with patch("core.services.storage.get_client") as mock_client:
+        write = build_writer("s3://bucket/raw/", content_type="application/gzip")
+        body = BytesIO(b"payload")
+
+        assert write("artifact_1/rows.ndjson.gz", body) == "s3://bucket/raw/artifact_1/rows.ndjson.gz"
+
+    mock_client.assert_called_once_with("s3")
+    mock_client.return_value.put_object.assert_called_once_with(
+        Bucket="bucket", Key="raw/artifact_1/rows.ndjson.gz", Body=body, ContentType="application/gzip"
+    )
+
+
+def test_writes_to_s3_bucket_root():
+    with patch("core.services.storage.get_client") as mock_client:
+        write = build_writer("s3://bucket")
+
+        assert write("part-0.parquet", BytesIO(b"payload")) == "s3://bucket/part-0.parquet"
+
+    assert "ContentType" not in mock_client.return_value.put_object.call_args.kwargs
@@ -0,0 +1,102 @@
+"""
+Unit tests for the execution plans compiled by register_strategy.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import User
+from django.db.models.signals import post_init
+from pydantic import BaseModel
+
+from core.models import Artifact, PharmacyClaim
+from core.services.processing_service import get_update_fields
+from core.strategies import STRATEGY_REGISTRY, IngestionStrategy, get_strategy
+from core.strategies.base import compile_plan
+
+CLAIM = {
+    "claim_id": "C1",
+    "ncpdp_id": "1234567",
+    "bin_number": "610014",
+    "service_date": date(2024, 1, 1),
+    "total_amount_paid": Decimal("1.00"),
+    "transaction_code": "B1",
+}
+
+
+def _fields(instance) -> dict:
+    return {key: value for key, value in vars(instance).items() if key != "_state"}
+
+
+def test_get_strategy_returns_shared_instances():
+    assert get_strategy("pharmacy") is get_strategy("pharmacy")
+    assert get_strategy("unknown") is None
+
+
+@pytest.mark.parametrize("name", ["pharmacy", "audit", "lab_result"])
+def test_plan_update_fields(name):
+    strategy_cls = STRATEGY_REGISTRY[name]
+    fields = {*strategy_cls.schema_class.model_fields, *strategy_cls.derived_fields}
+    expected = fields - set(strategy_cls.unique_fields)
+
+    plan = strategy_cls.plan
+    assert plan.unique_fields == tuple(strategy_cls.unique_fields)
+    assert plan.update_fields[-2:] == ("artifact", "updated_at")
+    assert set(plan.update_fields[:-2]) == expected
+    assert get_update_fields(get_strategy(name)) == list(plan.update_fields)
+    assert plan.field_order == tuple(field.attname for field in plan.model_class._meta.concrete_fields)
+
+
+def test_builder_matches_model_init():
+    build = get_strategy("pharmacy").plan.instance_builder()
+
+    instance = build(CLAIM, artifact_id=7)
+    expected = PharmacyClaim(**CLAIM, artifact_id=7)
+
+    assert type(instance) is PharmacyClaim
+    assert _fields(instance) == _fields(expected)
+    assert (instance._state.adding, instance._state.db) == (True, None)
+
+
+@pytest.mark.django_db
+def test_builder_falls_back_to_init_for_relations_and_unknown_keys():
+    build = get_strategy("pharmacy").plan.instance_builder()
+    artifact = Artifact.objects.create(file="pharmacy/a.csv", content_type="pharmacy")
+
+    assert build(CLAIM, artifact=artifact).artifact_id == artifact.id
+    with pytest.raises(TypeError, match="unexpected keyword"):
+        build({**CLAIM, "unknown": 1})
+
+
+def test_builder_uses_init_while_receivers_are_connected():
+    seen = []
+
+    def receiver(sender, instance, **kwargs):
+        seen.append(instance)
+
+    post_init.connect(receiver, sender=PharmacyClaim)
+    try:
+        instance = get_strategy("pharmacy").plan.instance_builder()(CLAIM)
+    finally:
+        post_init.disconnect(receiver, sender=PharmacyClaim)
+
+    assert seen == [instance]
+
+
+def test_plan_callable_defaults_and_no_identity_columns():
+    class UserSchema(BaseModel):
+        username: str
+
+    class UserStrategy(IngestionStrategy):
+        model_class = User
+        schema_class = UserSchema
+        unique_fields = []
+
+    plan = compile_plan(UserStrategy)
+
+    assert plan.update_fields == ()
+    assert "date_joined" in dict(plan.default_factories)
+    user = plan.instance_builder()({"username": "u"})
+    assert user.username == "u"
+    assert user.date_joined is not None
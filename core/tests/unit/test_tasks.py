@@ -34,4 +34,4 @@ def test_process_artifact_task_success():
         result = process_artifact_task.apply(args=[artifact_id]).get()
 
         assert result == {"success": 5, "failed": 0}
-        mock_service.assert_called_once_with(artifact_id)
+        mock_service.assert_called_once_with(artifact_id, follow_ingestion=False)
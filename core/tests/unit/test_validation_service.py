@@ -0,0 +1,50 @@
+"""
+Unit tests for the validate-only (dry run) service.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from core.services.validation_service import validate_csv_file
+
+CLAIM_HEADER = "claim_id,ncpdp_id,bin_number,service_date,total_amount_paid,transaction_code\n"
+
+
+def test_validate_csv_file_reports_throughput_and_histogram(tmp_path):
+    csv_file = tmp_path / "claims.csv"
+    csv_file.write_text(
+        CLAIM_HEADER
+        + "C1,N1,B1,2025-01-01,10.00,T1\n"
+        + "C2,N1,B1,not-a-date,10.00,T1\n"
+        + "C3,N1,B1,also-bad,10.00,T1\n"
+        + "C4,N1,B1,2025-01-01,-5.00,T1\n"
+    )
+
+    with patch("core.models.PharmacyClaim.save") as mock_save:
+        report = validate_csv_file(str(csv_file), "pharmacy")
+
+    mock_save.assert_not_called()
+    assert (report["rows"], report["valid"], report["invalid"]) == (4, 1, 3)
+    assert report["failures"] == [
+        {"field": "service_date", "error_type": "date_from_datetime_parsing", "count": 2},
+        {"field": "total_amount_paid", "error_type": "value_error", "count": 1},
+    ]
+    assert report["rows_per_second"] > 0
+    assert report["peak_memory_mb"] > 0
+
+
+def test_validate_csv_file_counts_malformed_rows(tmp_path):
+    """Test that errors outside schema validation (here a short row) are grouped per exception type."""
+    csv_file = tmp_path / "claims.csv"
+    csv_file.write_text(CLAIM_HEADER + "C1,N1\n")
+
+    report = validate_csv_file(str(csv_file), "pharmacy")
+
+    assert report["invalid"] == 1
+    assert report["failures"] == [{"field": "__row__", "error_type": "AttributeError", "count": 1}]
+
+
+def test_validate_csv_file_unknown_type(tmp_path):
+    with pytest.raises(ValueError, match="Unknown data type"):
+        validate_csv_file(str(tmp_path / "x.csv"), "unknown")
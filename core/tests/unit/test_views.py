@@ -1,9 +1,11 @@
+import json
 from unittest.mock import MagicMock, patch
 
 import pytest
 from django.test import RequestFactory
 
-from core.views import health_check
+from core.health import readiness
+from core.views import health_check, liveness
 
 HTTP_OK = 200
 HTTP_SERVICE_UNAVAILABLE = 503
@@ -14,12 +16,19 @@ def rf():
     return RequestFactory()
 
 
+@pytest.fixture(autouse=True)
+def fresh_readiness():
+    readiness.reset()
+    yield
+    readiness.reset()
+
+
 def test_health_check_success(rf):
     request = rf.get("/health/")
 
     with (
-        patch("core.views.connection.ensure_connection"),
-        patch("core.views.current_app.connection_or_acquire") as mock_celery,
+        patch("core.health.connection.ensure_connection"),
+        patch("core.health.current_app.connection_or_acquire") as mock_celery,
     ):
         mock_conn = MagicMock()
         mock_celery.return_value.__enter__.return_value = mock_conn
@@ -35,8 +44,8 @@ def test_health_check_db_failure(rf):
     request = rf.get("/health/")
 
     with (
-        patch("core.views.connection.ensure_connection", side_effect=Exception("DB Down")),
-        patch("core.views.current_app.connection_or_acquire") as mock_celery,
+        patch("core.health.connection.ensure_connection", side_effect=Exception("DB Down")),
+        patch("core.health.current_app.connection_or_acquire") as mock_celery,
     ):
         mock_conn = MagicMock()
         mock_celery.return_value.__enter__.return_value = mock_conn
@@ -53,8 +62,8 @@ def test_health_check_celery_failure(rf):
     request = rf.get("/health/")
 
     with (
-        patch("core.views.connection.ensure_connection"),
-        patch("core.views.current_app.connection_or_acquire", side_effect=Exception("Celery Down")),
+        patch("core.health.connection.ensure_connection"),
+        patch("core.health.current_app.connection_or_acquire", side_effect=Exception("Celery Down")),
     ):
         response = health_check(request)
 
@@ -62,3 +71,24 @@ def test_health_check_celery_failure(rf):
         data = response.content.decode()
         assert '"status": "unhealthy"' in data
         assert "Celery Down" in data
+
+
+def test_health_check_reports_component_latency(rf):
+    with (
+        patch("core.health.connection.ensure_connection"),
+        patch("core.health.current_app.connection_or_acquire"),
+    ):
+        data = json.loads(health_check(rf.get("/health/ready")).content)
+
+    assert data["components"]["database"]["status"] == "ok"
+    assert data["components"]["database"]["latency_ms"] >= 0
+    assert data["age_seconds"] >= 0
+
+
+def test_liveness_checks_no_dependencies(rf):
+    with patch("core.health.connection.ensure_connection") as mock_db:
+        response = liveness(rf.get("/health/live"))
+
+    assert response.status_code == HTTP_OK
+    assert json.loads(response.content) == {"status": "alive"}
+    mock_db.assert_not_called()
@@ -1,9 +1,15 @@
 import http
+from datetime import date
 from typing import TYPE_CHECKING
 
-from celery import current_app
-from django.db import connection
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from core import health
+from core.metrics import get_registry
+from core.models import LatestLabResult
+from core.services.export_service import FORMATS, build_export_queryset, stream_export
+from core.services.latest_lab_result_service import get_latest_results
 
 if TYPE_CHECKING:
     from django.http import HttpRequest
@@ -11,31 +17,96 @@ if TYPE_CHECKING:
 
 def health_check(request: "HttpRequest") -> JsonResponse:
     """
-    Health check endpoint returning status of Database and Celery.
+    Readiness endpoint returning the cached status and check latency of Database and Celery.
     """
-    # 1. Database Check
-    try:
-        connection.ensure_connection()
-        db_status = "ok"
-    except Exception as e:
-        db_status = f"error: {str(e)}"
+    readiness = health.readiness.status()
+    status_code = http.HTTPStatus.OK if readiness["healthy"] else http.HTTPStatus.SERVICE_UNAVAILABLE
+
+    return JsonResponse(
+        {
+            "status": "healthy" if readiness["healthy"] else "unhealthy",
+            "components": readiness["components"],
+            "age_seconds": readiness["age_seconds"],
+        },
+        status=status_code,
+    )
+
+
+def liveness(request: "HttpRequest") -> JsonResponse:
+    """
+    Liveness endpoint: the process serves requests. Checks no dependencies.
+    """
+    return JsonResponse({"status": "alive"})
+
+
+def metrics(request: "HttpRequest") -> HttpResponse:
+    """
+    Prometheus scrape endpoint for the pipeline metrics defined in core.metrics.
+    """
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
+
+
+EXPORT_CONTENT_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def export(request: "HttpRequest", content_type: str) -> StreamingHttpResponse | JsonResponse:
+    """
+    Streams the domain records of one data type as CSV or NDJSON.
+
+    Query parameters: format (csv|ndjson), start and end (inclusive ISO dates), artifact (id of
+    the artifact that last wrote the records) and gzip (1 to compress the stream on the fly).
+    Requires the view permission of the exported model.
+    """
+    fmt = request.GET.get("format", "csv")
+    compress = request.GET.get("gzip") in ("1", "true")
 
-    # 2. Celery Check
     try:
-        # Check connection to the broker (SQS)
-        with current_app.connection_or_acquire() as conn:
-            conn.ensure_connection(max_retries=1)
-        celery_status = "ok"
-    except Exception as e:
-        celery_status = f"error: {str(e)}"
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        start = date.fromisoformat(request.GET["start"]) if request.GET.get("start") else None
+        end = date.fromisoformat(request.GET["end"]) if request.GET.get("end") else None
+        artifact_id = int(request.GET["artifact"]) if request.GET.get("artifact") else None
+        queryset = build_export_queryset(content_type, start=start, end=end, artifact_id=artifact_id)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=http.HTTPStatus.BAD_REQUEST)
 
-    is_healthy = db_status == "ok" and celery_status == "ok"
-    status_code = http.HTTPStatus.OK if is_healthy else http.HTTPStatus.SERVICE_UNAVAILABLE
+    opts = queryset.model._meta
+    if not request.user.has_perm(f"{opts.app_label}.view_{opts.model_name}"):
+        return JsonResponse({"error": "Permission denied"}, status=http.HTTPStatus.FORBIDDEN)
 
+    filename = f"{content_type}.{fmt}.gz" if compress else f"{content_type}.{fmt}"
+    response = StreamingHttpResponse(
+        stream_export(queryset, fmt=fmt, compress=compress),
+        content_type="application/gzip" if compress else EXPORT_CONTENT_TYPES[fmt],
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def latest_lab_results(request: "HttpRequest", patient_id: str) -> JsonResponse:
+    """
+    Latest result of each test for one patient, read from the LatestLabResult index.
+    An optional, repeatable test_code query parameter restricts the tests returned.
+    """
+    opts = LatestLabResult._meta
+    if not request.user.has_perm(f"{opts.app_label}.view_{opts.model_name}"):
+        return JsonResponse({"error": "Permission denied"}, status=http.HTTPStatus.FORBIDDEN)
+
+    results = get_latest_results(patient_id, request.GET.getlist("test_code"))
     return JsonResponse(
         {
-            "status": "healthy" if is_healthy else "unhealthy",
-            "components": {"database": db_status, "celery": celery_status},
-        },
-        status=status_code,
+            "patient_id": patient_id,
+            "results": [
+                {
+                    "test_code": result.test_code,
+                    "test_name": result.test_name,
+                    "result_value": result.result_value,
+                    "result_unit": result.result_unit,
+                    "reference_range": result.reference_range,
+                    "performed_at": result.performed_at,
+                    "abnormal_flag": result.abnormal_flag,
+                }
+                for result in results
+            ],
+        }
     )
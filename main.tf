@@ -36,6 +36,11 @@ resource "aws_sqs_queue" "ingestion_queue" {
   name = "healthcare-ingestion-queue"
 }
 
+# 3. Celery Task Queue for large files (dedicated workers)
+resource "aws_sqs_queue" "ingestion_large_queue" {
+  name = "healthcare-ingestion-large-queue"
+}
+
 # Configure S3 to notify the Event Queue
 resource "aws_s3_bucket_notification" "bucket_notification" {
   bucket = aws_s3_bucket.ingestion_drop_zone.id